@@ -9,9 +9,34 @@ import numpy as np
 # Random Seed for reproducibility
 RANDOM_SEED = 42
 
+# Common Random Numbers: every request draws its service time on the client, from a
+# per-client stream, so runs that differ only in strategy see the same workload
+COMMON_RANDOM_NUMBERS = False
+
 # Total simulation time (in seconds)
 SIMULATION_TIME = 1_00_000
 
+# Stopping Rule: 'fixed' runs for SIMULATION_TIME, 'batch_means' stops as soon as the
+# mean client latency and drop rate reach the target precision (SIMULATION_TIME is the upper bound)
+STOPPING_RULE = 'fixed'  # Options: 'fixed', 'batch_means'
+TARGET_RELATIVE_PRECISION = 0.05  # Target relative confidence interval half width
+STOPPING_CHECK_INTERVAL = 1000  # Time in seconds between precision checks
+STOPPING_BATCH_COUNT = 20  # Minimum number of batch means the confidence intervals are built from
+
+# Simulation Engine: 'simpy' simulates every message; 'fast' solves gateway runs with the
+# round_robin or random strategy and no client termination as chains of FIFO queues with
+# vectorized NumPy passes. Runs the fast engine does not support use SimPy.
+ENGINE = 'simpy'  # Options: 'simpy', 'fast'
+FAST_ENGINE_WINDOW = 50  # Initial length in seconds of the windows the fast engine solves at once
+
+# Confidence level of reported confidence intervals
+CONFIDENCE_LEVEL = 0.95
+
+# Warm-up Detection: the transient at the start of a run is located with MSER on batch
+# means of the client latencies and server queue sizes and left out of steady-state metrics
+MSER_BATCH_SIZE = 5  # Observations per batch (5 gives MSER-5)
+MSER_MAX_BATCHES = 100_000  # Batch means kept before neighbouring batches are merged
+
 
 # Number of Servers in the simulation
 NUMBER_OF_SERVERS = 5
@@ -23,12 +48,35 @@ LOAD_BALANCER_TYPE = 'gateway'  # Options: 'gateway', 'dns'
 # Load Balancing Strategy
 LOAD_BALANCING_STRATEGY = 'round_robin'  # Options: 'round_robin', 'least_connections', random etc.
 
+# Power-of-d-choices: 'power_of_two_choices' samples 2 servers per request and 'jsq_d' samples
+# JSQ_D, and the request goes to the one with the fewest connections. With a positive
+# LOAD_REFRESH_INTERVAL they compare loads snapshotted every that many seconds instead of live ones.
+JSQ_D = 3
+LOAD_REFRESH_INTERVAL = 0  # Time in seconds between load snapshots (0 = live loads)
+
+# Peak-EWMA: 'peak_ewma' sends each request to the server with the lowest product of its
+# response time EWMA and its connections + 1. The EWMA jumps up to a slower response at
+# once and decays towards faster ones with this time constant.
+PEAK_EWMA_DECAY_TIME = 10  # Time constant in seconds
+
+# Hashing: 'consistent_hash' (a ring with virtual nodes) and 'maglev' send every request of a
+# client to the same server, and move few clients when servers are added or removed
+HASH_KEY = 'client_ip'  # Request field hashed. Options: 'client_ip', 'client_id'
+CONSISTENT_HASH_VIRTUAL_NODES = 100  # Points on the ring per server
+MAGLEV_TABLE_SIZE = 65537  # Lookup table entries; a prime well above 100 x the number of servers
+
 # 6 combinations 
 
 LOAD_BALANCING_STRATEGY_PROCESSING_TIME = {
     'round_robin': {'mean': 0, 'std': 0.001},
     'least_connections': {'mean': 0.04, 'std': 0.005},
     'random': {'mean': 0, 'std': 0.001},
+    'power_of_two_choices': {'mean': 0.005, 'std': 0.001},
+    'jsq_d': {'mean': 0.0075, 'std': 0.001},
+    'peak_ewma': {'mean': 0.04, 'std': 0.005},
+    'weighted_round_robin': {'mean': 0.005, 'std': 0.001},
+    'consistent_hash': {'mean': 0.005, 'std': 0.001},
+    'maglev': {'mean': 0.005, 'std': 0.001},
 }
 # Load Balancer IP Address
 LOAD_BALANCER_IP = '192.168.0.2'
@@ -40,12 +88,22 @@ LOAD_BALANCER_IP = '192.168.0.2'
 # Number of Clients in the simulation
 NUMBER_OF_CLIENTS = 500
 
+# Client Model: 'individual' runs one SimPy process per client; 'population' drives all clients
+# from one process with per-client state in arrays, for populations of 10^5 clients and more
+CLIENT_MODEL = 'individual'  # Options: 'individual', 'population'
+CLIENT_SUBNET = '10.0.0.0/8'  # Client IP addresses are taken in order from this subnet
+
 # Client Termination Probability
 CLIENT_TERMINATION_PROBABILITY = 0 # Probability that a client terminates after a request
 
 # Cache Settings
 CACHE_INVALIDATION_TIME = 320  # Time in seconds before DNS cache is invalidated 1, 100, 200, 300
 
+# Request Keys: with the edge cache enabled, every request asks for one of REQUEST_KEY_COUNT
+# keys; key k (1 = most popular) is drawn with probability proportional to 1 / k**REQUEST_KEY_ZIPF_EXPONENT
+REQUEST_KEY_COUNT = 10000
+REQUEST_KEY_ZIPF_EXPONENT = 1.0
+
 # Client Interarrival time.
 CLIENT_ARRIVAL_INTERVAL = 1 # Time in seconds between client arrivals into the system.
 
@@ -78,6 +136,32 @@ DNS_SERVER_BUFFER_SIZE = 1000  # Maximum number of DNS requests in the queue
 # DNS Server IP Address
 DNS_SERVER_IP = '192.168.0.1'
 
+# DNS Answers: in 'dns' mode an answer carries DNS_ANSWER_COUNT server addresses, the strategy's
+# choice followed by the next servers of the pool. Each address has a TTL of DNS_TTL seconds
+# (None: no limit), shortened to DNS_OVERLOAD_TTL for servers with DNS_OVERLOAD_CONNECTIONS or
+# more queued and in-service requests. Clients use an address for the shorter of its TTL and
+# CACHE_INVALIDATION_TIME, try the 'first', a 'random' or the 'lowest_rtt' fresh address, and
+# after a drop by a server retry the next address of the answer.
+DNS_ANSWER_COUNT = 1
+DNS_TTL = None  # Seconds; None leaves the caching to CACHE_INVALIDATION_TIME
+DNS_CLIENT_SELECTION = 'first'  # Options: 'first', 'random', 'lowest_rtt'
+DNS_OVERLOAD_CONNECTIONS = 0  # 0 never shortens TTLs
+DNS_OVERLOAD_TTL = 5  # Seconds
+
+# ===============================
+# Resolver Settings
+# ===============================
+
+# Recursive Resolvers: with NUMBER_OF_RESOLVERS > 0, client n sends its DNS requests to resolver
+# (n - 1) mod NUMBER_OF_RESOLVERS instead of the DNS server. A resolver answers from its cache
+# for RESOLVER_CACHE_TTL seconds after the DNS server's last answer, and asks the DNS server
+# only once for all the clients waiting on the same name.
+NUMBER_OF_RESOLVERS = 0
+RESOLVER_IPS = [f'192.168.2.{i+1}' for i in range(NUMBER_OF_RESOLVERS)]
+RESOLVER_CACHE_TTL = 300  # Seconds a resolver keeps an answer
+RESOLVER_SERVICE_TIME_MEAN = 0.001  # Mean (exponential) time to handle a request, in seconds
+RESOLVER_BUFFER_SIZE = 1000  # Maximum number of DNS requests in a resolver's queue
+
 
 # ===============================
 # Server Settings
@@ -91,6 +175,20 @@ SERVER_SERVICE_TIME_STD = 0.05   # Standard deviation of the underlying normal d
 # Server Queue Capacity (B in x/G/1/B queue)
 SERVER_BUFFER_SIZE = 100  # Maximum number of requests in the server queue
 
+# Server Workers (c in x/G/c/B queue): requests are served by c workers in parallel and
+# wait in the shared buffer of SERVER_BUFFER_SIZE while all of them are busy
+SERVER_WORKERS = 1
+SERVER_WORKER_COUNTS = {}  # Server IP -> workers, for servers that differ from SERVER_WORKERS
+
+# Heterogeneous Servers: a server with speed factor s serves a request in 1/s of the drawn
+# service time; weights are used by the weighted_round_robin strategy. Servers not listed get 1.
+SERVER_SPEED_FACTORS = {}  # Server IP -> speed factor, e.g. {'192.168.1.3': 0.5} for a slow node
+SERVER_WEIGHTS = {}  # Server IP -> integer weight
+
+# Server Pool Changes: (time in seconds, 'remove' or 'add', server IP) entries taking a server out
+# of the load-balancing pool or putting it back mid-run; a removed server still finishes its queue
+SERVER_POOL_CHANGES = ()  # e.g. ((1000, 'remove', '192.168.1.3'), (2000, 'add', '192.168.1.3'))
+
 # ===============================
 # Load Balancer Settings
 # ===============================
@@ -102,6 +200,20 @@ LOAD_BALANCER_PROCESSING_TIME_STD = 0.01  # Standard deviation
 # Load Balancer Queue Capacity (if applicable)
 LOAD_BALANCER_BUFFER_SIZE = 100000  # Maximum number of requests in the load balancer queue
 
+# Load Balancer Workers: with 'separate' pools, LOAD_BALANCER_WORKERS workers process requests
+# and as many process responses, each from their own queue; with a 'shared' pool,
+# LOAD_BALANCER_WORKERS workers process both in arrival order
+LOAD_BALANCER_WORKERS = 1  # Workers per pool
+LOAD_BALANCER_WORKER_POOL = 'separate'  # Options: 'separate', 'shared'
+
+# Edge Cache: with a positive EDGE_CACHE_CAPACITY, the gateway load balancer caches the response
+# for a request key for EDGE_CACHE_TTL seconds when it passes back to the client, and answers
+# later requests for the key itself, without a server round trip. A full cache evicts the least
+# recently ('lru') or least frequently ('lfu') used key.
+EDGE_CACHE_CAPACITY = 0  # Keys held; 0 disables the cache
+EDGE_CACHE_TTL = 60  # Seconds a cached response stays fresh
+EDGE_CACHE_POLICY = 'lru'  # Options: 'lru', 'lfu'
+
 # ===============================
 # Network Transport Delays
 # ===============================
@@ -116,8 +228,23 @@ TRANSPORT_DELAYS = {
     'server_to_client': 0.06,
     'client_to_dns_server': 0.02,  # Used if DNS request is sent
     'dns_server_to_client': 0.02,  # Used if DNS request is sent
+    'client_to_resolver': 0.005,  # Used with resolvers
+    'resolver_to_client': 0.005,
+    'resolver_to_dns_server': 0.02,
+    'dns_server_to_resolver': 0.02,
 }
 
+# Recycle message objects through free lists instead of allocating new ones for every message
+MESSAGE_POOLING = False
+
+# ===============================
+# Random Variate Settings
+# ===============================
+
+# Variates are drawn in blocks with one vectorized NumPy call and handed out one at a time
+VARIATE_BLOCK_SIZE = 65536  # Block size for the DNS server, load balancer and server streams
+CLIENT_VARIATE_BLOCK_SIZE = 1024  # Block size for per-client streams (one pool per client)
+
 # ===============================
 # Miscellaneous Settings
 # ===============================
@@ -127,4 +254,20 @@ LOGGING_ENABLED = False  # Enable or disable logging
 LOG_FILE_PATH = 'data/logs/simulation.log'
 
 # Output Settings
-OUTPUT_METRICS_FILE = 'data/outputs/performance_metrics.csv'
\ No newline at end of file
+OUTPUT_METRICS_FILE = 'data/outputs/performance_metrics.csv'
+
+# Statistics Mode: 'aggregate' keeps constant-memory summaries only,
+# 'full' also records every time series (needed for graphs and save_statistics)
+STATISTICS_MODE = 'aggregate'  # Options: 'aggregate', 'full'
+
+# Progress Reporting: print the simulated time, wall time, events per second and completed
+# requests of running simulations, at most every PROGRESS_INTERVAL wall-clock seconds; a
+# parallel sweep prints one line combining its workers. Off by default (--progress turns it on).
+PROGRESS_REPORTING = False
+PROGRESS_INTERVAL = 1.0  # Minimum wall-clock seconds between progress lines
+PROGRESS_CHECK_INTERVAL = 10  # Simulated seconds between checks whether a progress line is due
+
+# Sweep Settings
+SWEEP_WORKERS = None  # Worker processes for the main.py sweep (None = all CPUs, 1 = run serially)
+RESULT_CACHE_DIR = 'data/cache'  # On-disk store of finished sweep points, keyed by configuration and code version
+CRN_REPLICATIONS = 5  # Replications per strategy when comparing strategies with common random numbers (--crn)
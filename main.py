@@ -1,139 +1,502 @@
 # main.py
 
-import simpy
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-import random
-import numpy as np
+import simpy
 
 from config import settings
 
 from sim.network import Network
-from sim.client import Client
+from sim.client import Client, get_client_ip
+from sim.client_population import ClientPopulation
 from sim.server import Server
 from sim.dns_server import DNSServer
+from sim.resolver import Resolver
+from sim.dns_answer import DNS_CLIENT_SELECTIONS
 from sim.load_balancer import LoadBalancer
 from sim.strategies.round_robin import RoundRobinStrategy
 from sim.strategies.least_connections import LeastConnectionsStrategy
 from sim.strategies.random import RandomStrategy
-from sim.statistics import Statistics
+from sim.strategies.power_of_d import PowerOfDChoicesStrategy
+from sim.strategies.peak_ewma import PeakEwmaStrategy
+from sim.strategies.weighted_round_robin import WeightedRoundRobinStrategy
+from sim.strategies.hashing import ConsistentHashStrategy, MaglevStrategy
+from sim.context import SimulationConfig, SimulationContext
+from sim.result_cache import ResultCache
+from sim.analysis import get_paired_difference
+from sim.stopping import stop_when_precise
+from sim.fast_engine import FastEngine, get_fast_engine_support
+from sim.utils import client_arrival_interval_sampler
+from sim.variates import VariatePool
+from sim.progress import (CountingEnvironment, ProgressAggregator, RunProgress, get_worker_sink,
+                          init_worker, print_progress, track_progress)
 
-def add_clients(env, network, clients, num_clients):
+def add_clients(env, network, clients, context):
     """Process to add clients one by one after random intervals."""
-    for i in range(num_clients):
+    config = context.config
+    arrival_intervals = VariatePool(
+        client_arrival_interval_sampler(config, context.streams.get_generator('client_arrival')),
+        config.variate_block_size)
+    for i in range(config.number_of_clients):
         # Random interval before adding the next client
-        interval = random.expovariate(1.0 / settings.CLIENT_ARRIVAL_INTERVAL)
+        interval = arrival_intervals.next()
         yield env.timeout(interval)
         
         # Create the client and add it to the list
-        client_ip = f'10.0.0.{i+1}'
-        client = Client(env, network, client_ip, client_id=i+1)
+        client_ip = get_client_ip(config.client_subnet, i+1)
+        client = Client(env, network, client_ip, i+1, context)
         clients.append(client)
         # print(f"Client {i+1} added at time {env.now}")
 
 
-import os
-
-def main():
-    os.system("rm output.csv")
-    with open("output.csv", "a") as f:
-        f.write("no_of_clients,strategy,type,service_time,cache_time,server_utilization,client_latency,server_queue_length,dropped_requests\n")
-
-    for num_clients in [350, 400, 450, 500, 550, 600]:
-        for strategy in ['round_robin', 'least_connections', 'random']:
-            for type in ['gateway', 'dns']:
-                for service_time in ['high', 'low']:
-                        for cache_time in ['high', 'low']:
-                            Statistics.clear_stats()
-                            settings.NUMBER_OF_CLIENTS = num_clients
-                            settings.LOAD_BALANCING_STRATEGY = strategy
-                            settings.LOAD_BALANCER_TYPE = type
-
-                            if service_time == 'high':
-                                settings.SERVER_SERVICE_TIME_MEAN = 1.2
-                            else:
-                                settings.SERVER_SERVICE_TIME_MEAN = 0.6
-
-                            if cache_time == 'high':
-                                settings.CACHE_INVALIDATION_TIME = 500
-                            else:
-                                settings.CACHE_INVALIDATION_TIME = 200
-
-                            # ===============================
-                            # Initialize the Simulation Environment
-                            # ===============================
-                            env = simpy.Environment()
-                            
-                            # Set random seeds for reproducibility
-                            random.seed(settings.RANDOM_SEED)
-                            np.random.seed(settings.RANDOM_SEED)
-                            
-                            # ===============================
-                            # Create the Network
-                            # ===============================
-                            network = Network(env)
-                            
-                            # ===============================
-                            # Configure the Load-Balancing Strategy
-                            # ===============================
-                            # Initialize the load-balancing strategy based on settings
-                            if settings.LOAD_BALANCING_STRATEGY == 'round_robin':
-                                lb_strategy = RoundRobinStrategy(server_ips=[])
-                            elif settings.LOAD_BALANCING_STRATEGY == 'least_connections':
-                                lb_strategy = LeastConnectionsStrategy(server_ips=[], network=network)
-                            elif settings.LOAD_BALANCING_STRATEGY == 'random':
-                                lb_strategy = RandomStrategy(server_ips=[])
-                            else:
-                                raise ValueError(f"Unsupported load balancing strategy: {settings.LOAD_BALANCING_STRATEGY}")
-                            
-                            # ===============================
-                            # Create and Register DNS Server
-                            # ===============================
-                            dns_server = DNSServer(env, network, settings.DNS_SERVER_IP, lb_strategy)
-                            
-                            # ===============================
-                            # Create and Register Load Balancer (if using gateway load balancer)
-                            # ===============================
-                            if settings.LOAD_BALANCER_TYPE == 'gateway':
-                                load_balancer = LoadBalancer(env, network, settings.LOAD_BALANCER_IP, lb_strategy)
-                            else:
-                                load_balancer = None  # Not needed for DNS load balancing
-                            
-                            # ===============================
-                            # Create and Register Servers
-                            # ===============================
-                            servers = []
-                            for ip in settings.SERVER_IPS:
-                                server = Server(env, network, ip)
-                                servers.append(server)
-                                lb_strategy.register_server(ip)
-                            
-                            # ===============================
-                            # Create and Register Clients
-                            # ===============================
-                            clients = []
-                            env.process(add_clients(env, network, clients, settings.NUMBER_OF_CLIENTS))
-
-                            
-                            # ===============================
-                            # Run the Simulation
-                            # ===============================
-                            # Start the simulation and run until SIMULATION_TIME
-                            env.run(until=settings.SIMULATION_TIME)
-                            
-                            # ===============================
-                            # Collect and Output Performance Metrics
-                            # ===============================
-                            # Statistics.generate_graphs()
-                            # Statistics.print_summary_metrics(network)
-
-                            with open("output.csv", "a") as f:
-                                utilization = Statistics.get_avg_server_utilization(network)
-                                latency = Statistics.get_avg_client_latencies()
-                                queue_length = Statistics.get_average_server_queue_lengths(network)
-                                dropped_requests = Statistics.get_dropped_requests()
-                                f.write(f"{num_clients},{strategy},{type},{service_time},{cache_time},{utilization},{latency},{queue_length},{dropped_requests}\n")
-                            print(f"{num_clients},{strategy},{type},{service_time},{cache_time},{utilization},{latency},{queue_length},{dropped_requests}\n")
+def change_server_pool(env, lb_strategy, context):
+    """Process removing servers from the strategy's pool and adding them back at the configured times."""
+    for time, action, server_ip in sorted(context.config.server_pool_changes):
+        yield env.timeout(time - env.now)
+        if action == 'remove':
+            lb_strategy.remove_server(server_ip)
+        else:
+            lb_strategy.register_server(server_ip)
+
+
+def point_config(num_clients, strategy, lb_type, service_time, cache_time, **overrides):
+    """
+    Build the configuration of a single point of the parameter sweep.
+
+    Args:
+        num_clients (int): Number of clients to add to the simulation.
+        strategy (str): Load-balancing strategy name.
+        lb_type (str): Load balancer type, 'gateway' or 'dns'.
+        service_time (str): 'high' or 'low' server service time.
+        cache_time (str): 'high' or 'low' DNS cache invalidation time.
+        **overrides: Further configuration fields to set.
+
+    Returns:
+        SimulationConfig: The configuration of the run.
+    """
+    return SimulationConfig.from_settings(
+        number_of_clients=num_clients,
+        load_balancing_strategy=strategy,
+        load_balancer_type=lb_type,
+        server_service_time_mean=1.2 if service_time == 'high' else 0.6,
+        cache_invalidation_time=500 if cache_time == 'high' else 200,
+        **overrides,
+    )
+
+
+def build_simulation(env, context):
+    """
+    Build the Network/DNSServer/LoadBalancer/Server/Client graph of a run.
+
+    Args:
+        env (simpy.Environment): The simulation environment.
+        context (SimulationContext): The run's configuration and statistics.
+
+    Returns:
+        Network: The network all entities are registered with.
+    """
+    config = context.config
+
+    # ===============================
+    # Create the Network
+    # ===============================
+    network = Network(env, context)
+    
+    # ===============================
+    # Configure the Load-Balancing Strategy
+    # ===============================
+    # Initialize the load-balancing strategy based on the configuration
+    if config.load_balancing_strategy == 'round_robin':
+        lb_strategy = RoundRobinStrategy(server_ips=[])
+    elif config.load_balancing_strategy == 'least_connections':
+        lb_strategy = LeastConnectionsStrategy(server_ips=[], network=network)
+    elif config.load_balancing_strategy == 'random':
+        lb_strategy = RandomStrategy(server_ips=[], rng=context.streams.get_generator('strategy'))
+    elif config.load_balancing_strategy in ('power_of_two_choices', 'jsq_d'):
+        lb_strategy = PowerOfDChoicesStrategy(
+            server_ips=[], network=network, rng=context.streams.get_generator('strategy'),
+            choices=2 if config.load_balancing_strategy == 'power_of_two_choices' else config.jsq_d,
+            refresh_interval=config.load_refresh_interval)
+    elif config.load_balancing_strategy == 'peak_ewma':
+        if config.load_balancer_type != 'gateway':
+            raise ValueError("The peak_ewma strategy needs the gateway load balancer to observe responses.")
+        lb_strategy = PeakEwmaStrategy(server_ips=[], network=network, decay_time=config.peak_ewma_decay_time)
+    elif config.load_balancing_strategy == 'weighted_round_robin':
+        lb_strategy = WeightedRoundRobinStrategy(server_ips=[], weights=config.server_weights)
+    elif config.load_balancing_strategy == 'consistent_hash':
+        lb_strategy = ConsistentHashStrategy(
+            server_ips=[], network=network, hash_key=config.hash_key,
+            virtual_nodes=config.consistent_hash_virtual_nodes)
+    elif config.load_balancing_strategy == 'maglev':
+        lb_strategy = MaglevStrategy(
+            server_ips=[], network=network, hash_key=config.hash_key, table_size=config.maglev_table_size)
+    else:
+        raise ValueError(f"Unsupported load balancing strategy: {config.load_balancing_strategy}")
+    
+    # ===============================
+    # Create and Register DNS Server
+    # ===============================
+    if config.dns_client_selection not in DNS_CLIENT_SELECTIONS:
+        raise ValueError(f"Unsupported DNS client selection: {config.dns_client_selection}")
+    dns_server = DNSServer(env, network, config.dns_server_ip, lb_strategy, context)
+
+    # ===============================
+    # Create and Register Resolvers
+    # ===============================
+    for ip in config.resolver_ips:
+        Resolver(env, network, ip, context)
+    
+    # ===============================
+    # Create and Register Load Balancer (if using gateway load balancer)
+    # ===============================
+    if config.load_balancer_type == 'gateway':
+        load_balancer = LoadBalancer(env, network, config.load_balancer_ip, lb_strategy, context)
+    else:
+        if config.edge_cache_capacity > 0:
+            raise ValueError("The edge cache needs the gateway load balancer.")
+        load_balancer = None  # Not needed for DNS load balancing
+    
+    # ===============================
+    # Create and Register Servers
+    # ===============================
+    servers = []
+    for ip in config.server_ips:
+        server = Server(env, network, ip, context)
+        servers.append(server)
+        lb_strategy.register_server(ip)
+
+    # ===============================
+    # Schedule Server Pool Changes
+    # ===============================
+    if config.server_pool_changes:
+        pool = set(config.server_ips)
+        for time, action, server_ip in sorted(config.server_pool_changes):
+            if time < 0:
+                raise ValueError(f"Server pool change times must not be negative: {time}")
+            if action == 'remove' and server_ip in pool and len(pool) > 1:
+                pool.remove(server_ip)
+            elif action == 'add' and server_ip in config.server_ips and server_ip not in pool:
+                pool.add(server_ip)
+            else:
+                raise ValueError(f"Invalid server pool change at {time} s: {action} {server_ip}")
+        env.process(change_server_pool(env, lb_strategy, context))
+    
+    # ===============================
+    # Create and Register Clients
+    # ===============================
+    if config.client_model == 'individual':
+        clients = []
+        env.process(add_clients(env, network, clients, context))
+    elif config.client_model == 'population':
+        ClientPopulation(env, network, context)
+    else:
+        raise ValueError(f"Unsupported client model: {config.client_model}")
+
+    return network
+
+
+def get_run_label(config):
+    """Return a short description of a run for progress reports."""
+    return (f"{config.number_of_clients} clients, {config.load_balancing_strategy}, "
+            f"{config.load_balancer_type}, service {config.server_service_time_mean:g} s, "
+            f"cache {config.cache_invalidation_time:g} s, replication {config.replication}")
+
+
+def run_simulation(config, progress=None):
+    """
+    Run a single simulation to completion.
+
+    Nothing is shared with other runs, so the function can be called from a
+    worker process or alongside other simulations in the same process.
+    With `engine` = 'fast', runs the fast engine supports are solved by it
+    and the others are simulated with SimPy.
+
+    Args:
+        config (SimulationConfig): The configuration of the run.
+        progress (callable): Sink of the run's ProgressSnapshots, at most one every
+            PROGRESS_INTERVAL seconds. None uses the sink of the sweep worker
+            process, if any, and otherwise reports nothing.
+
+    Returns:
+        tuple: Values of RESULT_COLUMNS: the metrics, the simulated horizon, the
+            relative confidence interval half widths of latency and drop rate, the
+            detected warm-up time, the steady-state metrics, the server load imbalance
+            and the edge cache and resolver hit ratios.
+    """
+    context = SimulationContext(config)
+    stats = context.stats
+
+    if config.engine not in ('simpy', 'fast'):
+        raise ValueError(f"Unsupported engine: {config.engine}")
+
+    if progress is None:
+        progress = get_worker_sink()
+    if progress is not None:
+        progress = RunProgress(get_run_label(config), config.simulation_time, progress, settings.PROGRESS_INTERVAL)
+
+    if config.engine == 'fast' and get_fast_engine_support(config) is None:
+        engine = FastEngine(context)
+        simulated_time = engine.run(progress)
+        events = engine.settled_requests
+        utilization = engine.get_avg_server_utilization()
+        load_imbalance = engine.get_server_load_imbalance()
+    else:
+        # ===============================
+        # Initialize the Simulation Environment
+        # ===============================
+        if progress is not None:
+            # Counts events for the progress reports, which are checked for every few simulated seconds
+            env = CountingEnvironment()
+            env.process(track_progress(env, progress, stats, settings.PROGRESS_CHECK_INTERVAL))
+        else:
+            env = simpy.Environment()
+
+        network = build_simulation(env, context)
+
+        # ===============================
+        # Run the Simulation
+        # ===============================
+        # Start the simulation and run until simulation_time, or until the
+        # stopping rule is satisfied
+        if config.stopping_rule == 'batch_means':
+            env.run(until=env.process(stop_when_precise(env, context)))
+        elif config.stopping_rule == 'fixed':
+            env.run(until=config.simulation_time)
+        else:
+            raise ValueError(f"Unsupported stopping rule: {config.stopping_rule}")
+        # stats.generate_graphs()
+        # stats.print_summary_metrics(network)
+        simulated_time = float(env.now)
+        utilization = stats.get_avg_server_utilization(network)
+        load_imbalance = stats.get_server_load_imbalance(network)
+        events = env.events_processed if progress is not None else 0
+
+    if progress is not None:
+        progress.update(simulated_time, events, stats.total_requests_processed, finished=True)
+
+    # ===============================
+    # Collect and Output Performance Metrics
+    # ===============================
+    latency = stats.get_avg_client_latencies()
+    queue_length = stats.get_average_server_queue_lengths()
+    dropped_requests = stats.get_dropped_requests()
+    latency_precision, drop_rate_precision = stats.request_batches.get_relative_half_widths(config.confidence_level)
+    warmup_time = stats.get_warmup_time()
+    steady_state_latency = stats.get_steady_state_client_latency()
+    steady_state_queue_length = stats.get_steady_state_server_queue_lengths()
+    edge_cache_hit_ratio = stats.get_edge_cache_hit_ratio()
+    resolver_hit_ratio = stats.get_resolver_hit_ratio()
+    return (utilization, latency, queue_length, dropped_requests,
+            simulated_time, latency_precision, drop_rate_precision,
+            warmup_time, steady_state_latency, steady_state_queue_length, load_imbalance,
+            edge_cache_hit_ratio, resolver_hit_ratio)
+
+
+# Values of every sweep parameter, in output column order
+SWEEP_VALUES = (
+    [350, 400, 450, 500, 550, 600],         # num_clients
+    ['round_robin', 'least_connections', 'random'],  # strategy
+    ['gateway', 'dns'],                     # type
+    ['high', 'low'],                        # service_time
+    ['high', 'low'],                        # cache_time
+)
+POINT_COLUMNS = ['no_of_clients', 'strategy', 'type', 'service_time', 'cache_time']
+RESULT_COLUMNS = [
+    'server_utilization', 'client_latency', 'server_queue_length', 'dropped_requests',
+    'simulated_time', 'latency_relative_precision', 'drop_rate_relative_precision',
+    'warmup_time', 'steady_state_client_latency', 'steady_state_server_queue_length',
+    'server_load_imbalance', 'edge_cache_hit_ratio', 'resolver_hit_ratio',
+]
+# Result columns compared between strategies in --crn mode
+METRIC_COLUMNS = [
+    'server_utilization', 'client_latency', 'server_queue_length', 'dropped_requests',
+    'steady_state_client_latency', 'steady_state_server_queue_length',
+]
+
+
+def sweep_points():
+    """Return the grid points of the parameter sweep in output order."""
+    return list(itertools.product(*SWEEP_VALUES))
+
+
+def run_sweep(configs, workers=None, progress=False):
+    """
+    Run simulations, fanning them out over a process pool.
+
+    Args:
+        configs (list): Configurations of the runs.
+        workers (int): Number of worker processes. None uses all CPUs,
+            1 runs every simulation in the current process.
+        progress (bool): Print the progress of the runs every PROGRESS_INTERVAL
+            seconds; the workers of a pool are combined into one line.
+
+    Yields:
+        tuple: (index into `configs`, result) in completion order.
+    """
+    if workers == 1:
+        for i, config in enumerate(configs):
+            yield i, run_simulation(config, print_progress if progress else None)
+        return
+
+    if not progress:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_simulation, config): i for i, config in enumerate(configs)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        return
+
+    # The workers put their snapshots on a queue, which a thread of this process reports from
+    progress_queue = multiprocessing.Queue()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(progress_queue,)) as executor, \
+            ProgressAggregator(progress_queue, len(configs), settings.PROGRESS_INTERVAL):
+        futures = {executor.submit(run_simulation, config): i for i, config in enumerate(configs)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def run_cached(configs, workers=None, cache=None, progress=False):
+    """
+    Get the result of every configuration, simulating only the ones not in the cache.
+
+    Args:
+        configs (list): Configurations of the runs.
+        workers (int): Number of worker processes, see `run_sweep`.
+        cache (ResultCache): Store of finished runs, or None to simulate everything.
+        progress (bool): Print the progress of the simulated runs, see `run_sweep`.
+
+    Yields:
+        tuple: (index into `configs`, result), cached results first.
+    """
+    missing = []
+    for i, config in enumerate(configs):
+        result = cache.get(config) if cache is not None else None
+        if result is None:
+            missing.append(i)
+        else:
+            yield i, result
+    print(f"{len(configs) - len(missing)} of {len(configs)} runs cached, simulating {len(missing)}")
+
+    for j, result in run_sweep([configs[i] for i in missing], workers, progress):
+        i = missing[j]
+        if cache is not None:
+            cache.put(configs[i], result)
+        yield i, result
+
+
+def write_sweep_output(workers=None, cache=None, progress=False, **overrides):
+    """
+    Run the parameter sweep and write one row per grid point to output.csv.
+
+    Args:
+        workers (int): Number of worker processes, see `run_sweep`.
+        cache (ResultCache): Store of finished runs, or None to simulate everything.
+        progress (bool): Print the progress of the simulated runs, see `run_sweep`.
+        **overrides: Configuration fields set for every point, e.g. `engine`.
+    """
+    points = sweep_points()
+    configs = [point_config(*point, **overrides) for point in points]
+
+    with open("output.csv", "w") as f:
+        f.write(",".join(POINT_COLUMNS + RESULT_COLUMNS) + "\n")
+
+    # Rows are written in grid order as soon as all the rows before them are known
+    results = {}
+    next_row = 0
+    for i, result in run_cached(configs, workers, cache, progress):
+        results[i] = result
+        while next_row in results:
+            line = ",".join(str(value) for value in points[next_row] + results[next_row])
+            with open("output.csv", "a") as f:
+                f.write(f"{line}\n")
+            print(f"{line}\n")
+            next_row += 1
+
+
+def write_strategy_comparison(replications, workers=None, cache=None, progress=False, **overrides):
+    """
+    Compare the load-balancing strategies under common random numbers.
+
+    Within a comparison group (every sweep parameter except the strategy),
+    replication r of every strategy uses the same seed with
+    `common_random_numbers` enabled, so all strategies see exactly the same
+    client arrivals, request intervals and service times. The paired
+    differences between strategies are written to crn_output.csv with their
+    confidence intervals.
+
+    Args:
+        replications (int): Number of replications per strategy.
+        workers (int): Number of worker processes, see `run_sweep`.
+        cache (ResultCache): Store of finished runs, or None to simulate everything.
+        progress (bool): Print the progress of the simulated runs, see `run_sweep`.
+        **overrides: Configuration fields set for every run, e.g. `engine`.
+    """
+    num_clients_values, strategies, lb_types, service_times, cache_times = SWEEP_VALUES
+    groups = list(itertools.product(num_clients_values, lb_types, service_times, cache_times))
+
+    runs = []
+    for num_clients, lb_type, service_time, cache_time in groups:
+        for replication in range(replications):
+            for strategy in strategies:
+                runs.append((num_clients, strategy, lb_type, service_time, cache_time, replication))
+    configs = [
+        point_config(*run[:5], common_random_numbers=True, replication=run[5], **overrides)
+        for run in runs
+    ]
+    results = dict(run_cached(configs, workers, cache, progress))
+    observations = {run: results[i] for i, run in enumerate(runs)}
+
+    confidence = settings.CONFIDENCE_LEVEL
+    with open("crn_output.csv", "w") as f:
+        f.write("no_of_clients,type,service_time,cache_time,strategy_a,strategy_b,metric,"
+                "mean_difference,ci_low,ci_high,replications\n")
+        for num_clients, lb_type, service_time, cache_time in groups:
+            for strategy_a, strategy_b in itertools.combinations(strategies, 2):
+                for metric in METRIC_COLUMNS:
+                    m = RESULT_COLUMNS.index(metric)
+                    values_a, values_b = [
+                        [observations[(num_clients, strategy, lb_type, service_time, cache_time, r)][m]
+                         for r in range(replications)]
+                        for strategy in (strategy_a, strategy_b)
+                    ]
+                    mean, half_width = get_paired_difference(values_a, values_b, confidence)
+                    line = (f"{num_clients},{lb_type},{service_time},{cache_time},{strategy_a},{strategy_b},"
+                            f"{metric},{mean},{mean - half_width},{mean + half_width},{replications}")
+                    f.write(f"{line}\n")
+                    print(line)
+
+
+def main(workers=None, use_cache=True, crn=False, replications=None, engine=None, progress=None):
+    if workers is None:
+        workers = settings.SWEEP_WORKERS
+    if progress is None:
+        progress = settings.PROGRESS_REPORTING
+    cache = ResultCache(settings.RESULT_CACHE_DIR) if use_cache else None
+    overrides = {'engine': engine} if engine is not None else {}
+
+    if crn:
+        write_strategy_comparison(replications or settings.CRN_REPLICATIONS, workers, cache, progress,
+                                  **overrides)
+    else:
+        write_sweep_output(workers, cache, progress, **overrides)
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Run the load-balancing parameter sweep.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: SWEEP_WORKERS, all CPUs if unset).")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Recompute every point instead of reusing results from RESULT_CACHE_DIR.")
+    parser.add_argument('--crn', action='store_true',
+                        help="Compare strategies with common random numbers and write crn_output.csv.")
+    parser.add_argument('--replications', type=int, default=None,
+                        help="Replications per strategy in --crn mode (default: CRN_REPLICATIONS).")
+    parser.add_argument('--engine', choices=['simpy', 'fast'], default=None,
+                        help="Simulation engine (default: ENGINE); 'fast' falls back to SimPy where unsupported.")
+    parser.add_argument('--progress', action='store_true', default=None,
+                        help="Print the progress of the runs every PROGRESS_INTERVAL seconds (default: PROGRESS_REPORTING).")
+    args = parser.parse_args()
+    main(workers=args.workers, use_cache=not args.no_cache, crn=args.crn, replications=args.replications,
+         engine=args.engine, progress=args.progress)
@@ -0,0 +1,358 @@
+# sim/aggregators.py
+
+import math
+
+import numpy as np
+
+from sim.analysis import get_confidence_interval, get_mser_truncation
+from sim.recorders import SeriesRecorder
+
+
+class RunningStats:
+    def __init__(self):
+        """
+        Online count, sum, mean, variance (Welford), min and max of a series.
+
+        Memory use is constant in the number of observations.
+        """
+        self.count = 0
+        self.total = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._welford_mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value):
+        """Add an observation."""
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        delta = value - self._welford_mean
+        self._welford_mean += delta / self.count
+        self._m2 += delta * (value - self._welford_mean)
+
+    def update_many(self, values):
+        """Add an array of observations, merging their moments with Chan's formula."""
+        n = len(values)
+        if n == 0:
+            return
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        count = self.count + n
+        delta = mean - self._welford_mean
+        self._welford_mean += delta * n / count
+        self._m2 += m2 + delta * delta * self.count * n / count
+        self.count = count
+
+    @property
+    def mean(self):
+        # total / count matches summing the raw series, which the summary getters rely on
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self):
+        """Sample variance of the observations."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class TimeWeightedAverage:
+    def __init__(self, start_time=0.0):
+        """
+        Time-weighted average of a piecewise-constant signal, such as a queue length.
+
+        Args:
+            start_time (float): Time from which the signal is observed.
+        """
+        self.start_time = start_time
+        self.last_time = start_time
+        self.last_value = 0
+        self.area = 0.0
+
+    def update(self, time, value):
+        """Record that the signal changed to `value` at `time`."""
+        self.area += self.last_value * (time - self.last_time)
+        self.last_time = time
+        self.last_value = value
+
+    def update_many(self, times, values):
+        """Record a time-ordered array of changes, as repeated calls to `update` would."""
+        if len(times) == 0:
+            return
+        self.area += self.last_value * (times[0] - self.last_time)
+        self.area += float((values[:-1] * np.diff(times)).sum())
+        self.last_time = float(times[-1])
+        self.last_value = values[-1].item()
+
+    def average(self, until=None):
+        """
+        Return the time-weighted average up to `until` (default: the last update).
+        """
+        if until is None:
+            until = self.last_time
+        elapsed = until - self.start_time
+        if elapsed <= 0:
+            return 0.0
+        area = self.area + self.last_value * (until - self.last_time)
+        return area / elapsed
+
+
+class P2Quantile:
+    def __init__(self, p):
+        """
+        Streaming quantile estimate using the P-square algorithm (Jain & Chlamtac, 1985).
+
+        Five markers are kept, so memory is constant in the number of observations.
+
+        Args:
+            p (float): The quantile to estimate, between 0 and 1.
+        """
+        self.p = p
+        self.count = 0
+        self._heights = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def update(self, value):
+        """Add an observation."""
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            q.append(value)
+            q.sort()
+            return
+
+        n = self._positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        # Adjust the three middle markers if they drifted from their desired positions
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q = self._heights
+        n = self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self):
+        """The current quantile estimate (exact while fewer than five observations were seen)."""
+        if not self._heights:
+            return 0.0
+        if self.count <= 5:
+            index = min(len(self._heights) - 1, int(round(self.p * (len(self._heights) - 1))))
+            return self._heights[index]
+        return self._heights[2]
+
+
+class RequestBatchMeans:
+    def __init__(self, batch_count=20, batch_size=64):
+        """
+        Batch means of client latency and drop rate over the sequence of request outcomes.
+
+        Every completed or dropped request is one observation. Observations
+        are grouped into batches of `batch_size`; when 2 * `batch_count`
+        batches are complete, neighbouring batches are merged and the batch
+        size doubles, so memory stays bounded while the batches grow long
+        enough to be roughly independent.
+
+        Args:
+            batch_count (int): Minimum number of batches used for an interval.
+            batch_size (int): Initial number of requests per batch.
+        """
+        self.batch_count = batch_count
+        self.batch_size = batch_size
+        self.batches = []  # [(completed, latency_sum, dropped), ...]
+        self._completed = 0
+        self._latency_sum = 0.0
+        self._dropped = 0
+
+    def add_completion(self, latency):
+        """Record a request that completed with the given latency."""
+        self._completed += 1
+        self._latency_sum += latency
+        if self._completed + self._dropped >= self.batch_size:
+            self._close_batch()
+
+    def add_drop(self):
+        """Record a dropped request."""
+        self._dropped += 1
+        if self._completed + self._dropped >= self.batch_size:
+            self._close_batch()
+
+    def add_outcomes(self, latencies, dropped):
+        """
+        Record a sequence of request outcomes in the order they happened.
+
+        Args:
+            latencies (numpy.ndarray): Latency of every request; ignored for dropped ones.
+            dropped (numpy.ndarray): Boolean array marking the dropped requests.
+        """
+        completed = np.concatenate([[0], np.cumsum(~dropped)])
+        latency_sums = np.concatenate([[0.0], np.cumsum(np.where(dropped, 0.0, latencies))])
+        i = 0
+        while i < len(dropped):
+            j = min(len(dropped), i + self.batch_size - self._completed - self._dropped)
+            self._completed += int(completed[j] - completed[i])
+            self._dropped += (j - i) - int(completed[j] - completed[i])
+            self._latency_sum += float(latency_sums[j] - latency_sums[i])
+            i = j
+            if self._completed + self._dropped >= self.batch_size:
+                self._close_batch()
+
+    def _close_batch(self):
+        self.batches.append((self._completed, self._latency_sum, self._dropped))
+        self._completed = 0
+        self._latency_sum = 0.0
+        self._dropped = 0
+        if len(self.batches) == 2 * self.batch_count:
+            self.batches = [
+                (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+                for a, b in zip(self.batches[::2], self.batches[1::2])
+            ]
+            self.batch_size *= 2
+
+    def get_latency_batch_means(self):
+        return [latency_sum / completed for completed, latency_sum, dropped in self.batches if completed]
+
+    def get_drop_rate_batch_means(self):
+        return [dropped / (completed + dropped) for completed, latency_sum, dropped in self.batches]
+
+    def get_relative_half_widths(self, confidence=0.95):
+        """
+        Relative confidence interval half widths of the mean latency and drop rate.
+
+        Returns:
+            tuple: (latency, drop_rate); infinite until `batch_count` batches are complete.
+                A metric whose batch means are all zero has a relative half width of 0.
+        """
+        return (
+            self._get_relative_half_width(self.get_latency_batch_means(), confidence),
+            self._get_relative_half_width(self.get_drop_rate_batch_means(), confidence),
+        )
+
+    def _get_relative_half_width(self, batch_means, confidence):
+        if len(batch_means) < self.batch_count:
+            return math.inf
+        mean, half_width = get_confidence_interval(batch_means, confidence)
+        if half_width == 0:
+            return 0.0
+        if mean == 0:
+            return math.inf
+        return half_width / abs(mean)
+
+
+class WarmupDetector:
+    def __init__(self, batch_size=5, max_batches=100_000):
+        """
+        Keep batch means of a series and locate the end of its warm-up with MSER.
+
+        Observations are averaged in batches of `batch_size` (five gives
+        MSER-5). To bound memory, once `max_batches` batch means are stored
+        neighbouring batches are merged and the batch size doubles.
+
+        Args:
+            batch_size (int): Initial number of observations per batch.
+            max_batches (int): Number of batch means kept before merging; must be even.
+        """
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.batch_means = SeriesRecorder(np.float64)  # (time of first observation, batch mean)
+        self._sum = 0.0
+        self._count = 0
+        self._start_time = 0.0
+
+    def update(self, time, value):
+        """Add an observation made at `time`."""
+        if self._count == 0:
+            self._start_time = time
+        self._sum += value
+        self._count += 1
+        if self._count == self.batch_size:
+            self.batch_means.append(self._start_time, self._sum / self._count)
+            self._sum = 0.0
+            self._count = 0
+            if len(self.batch_means) == self.max_batches:
+                self._merge_batches()
+
+    def update_many(self, times, values):
+        """Add time-ordered arrays of observations, as repeated calls to `update` would."""
+        i = 0
+        n = len(values)
+        while i < n:
+            batch_size = self.batch_size
+            if self._count == 0 and n - i >= batch_size:
+                # Whole batches at once, up to the next merge
+                k = min((n - i) // batch_size, self.max_batches - len(self.batch_means))
+                end = i + k * batch_size
+                self.batch_means.extend(times[i:end:batch_size], values[i:end].reshape(k, batch_size).mean(axis=1))
+                i = end
+                if len(self.batch_means) == self.max_batches:
+                    self._merge_batches()
+            else:
+                self.update(times[i], values[i])
+                i += 1
+
+    def _merge_batches(self):
+        times = self.batch_means.times
+        values = self.batch_means.values
+        merged = SeriesRecorder(np.float64, initial_capacity=self.max_batches)
+        merged.extend(times[::2], (values[::2] + values[1::2]) / 2)
+        self.batch_means = merged
+        self.batch_size *= 2
+
+    def get_truncation(self):
+        """
+        Locate the end of the warm-up period.
+
+        Returns:
+            tuple: (number of leading batches to discard, time of the first kept observation)
+        """
+        values = self.batch_means.values
+        if len(values) == 0:
+            return 0, 0.0
+        d = get_mser_truncation(values)
+        return d, float(self.batch_means.times[d])
+
+    def get_steady_state_mean(self):
+        """Return the mean of the complete batches after the warm-up period."""
+        values = self.batch_means.values
+        if len(values) == 0:
+            return 0.0
+        d, _ = self.get_truncation()
+        return float(values[d:].mean())
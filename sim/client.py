@@ -1,14 +1,36 @@
 # sim/client.py
 
-import simpy
-import random
-import numpy as np
-from config import settings
-from sim.utils import get_client_request_interval
-from sim.statistics import Statistics
+import ipaddress
+
+from sim.dns_answer import DnsAnswer, order_addresses, update_rtt
+from sim.resolver import get_client_dns_ip
+from sim.utils import (client_request_interval_sampler, request_key_sampler, server_service_time_sampler,
+                       uniform_sampler)
+from sim.variates import VariatePool
+
+
+def get_client_ip(subnet, client_id):
+    """
+    Return the IP address of a client.
+
+    Client n gets the n-th host address of the subnet, so '10.0.0.0/8'
+    gives 10.0.0.1 to 10.0.0.254, then 10.0.0.255, 10.0.1.0 and so on.
+
+    Args:
+        subnet (str): The client subnet, e.g. '10.0.0.0/8'.
+        client_id (int): The client's id, starting at 1.
+
+    Returns:
+        str: The client's IP address.
+    """
+    network = ipaddress.ip_network(subnet)
+    if not 0 < client_id < network.num_addresses - 1:
+        raise ValueError(f"Client {client_id} does not fit in the client subnet {subnet}.")
+    return str(network.network_address + client_id)
+
 
 class Client:
-    def __init__(self, env, network, ip_address, client_id):
+    def __init__(self, env, network, ip_address, client_id, context):
         """
         Initialize a Client instance.
 
@@ -17,103 +39,149 @@ class Client:
             network (Network): The network instance.
             ip_address (str): The client's IP address.
             client_id (int): A unique identifier for the client.
+            context (SimulationContext): The run's configuration and statistics.
         """
         self.env = env
         self.network = network
         self.ip_address = ip_address
         self.client_id = client_id
+        self.config = context.config
+        self.stats = context.stats
+        self.messages = network.messages
         self.type = 'client'
+        # Types this entity exchanges messages with; DNS requests go to a resolver if there are any
+        self.peer_types = ('load_balancer', 'server', 'resolver' if self.config.resolver_ips else 'dns_server')
         self.network.register_entity(self.ip_address, self)
+        self.dns_ip = get_client_dns_ip(self.config, client_id)
         
-        # DNS cache variables
-        self.cached_ip = None
-        self.cache_timestamp = None
-        self.cache_valid = False
+        # DNS cache: the last answer, and the smoothed response time of each address used
+        self.dns_answer = None
+        self.rtts = {}
         
         # Events for synchronization
         self.dns_response_event = self.env.event()
         self.response_event = self.env.event()
         
         self.dropped = False
+        self.drop_server_ip = None  # Server that dropped the last request, None if the load balancer did
+        self.cache_hit = False  # Whether the edge cache answered the last request
+
+        # Pre-sampled random variates
+        block_size = self.config.client_variate_block_size
+        streams = context.streams
+        self.request_intervals = VariatePool(
+            client_request_interval_sampler(self.config, streams.get_generator('client_request_interval', client_id)),
+            block_size)
+        self.termination_draws = VariatePool(
+            uniform_sampler(streams.get_generator('client_termination', client_id)), block_size)
+        if self.config.common_random_numbers:
+            # The service time of each request is fixed by the client, whichever server handles it
+            self.request_service_times = VariatePool(
+                server_service_time_sampler(self.config, streams.get_generator('request_service', client_id)),
+                block_size)
+        if self.config.edge_cache_capacity > 0:
+            # The content each request asks for, the key of the load balancer's edge cache
+            self.request_keys = VariatePool(
+                request_key_sampler(self.config, streams.get_generator('request_key', client_id)), block_size)
+        if self.config.dns_client_selection == 'random':
+            self.selection_draws = VariatePool(
+                uniform_sampler(streams.get_generator('dns_selection', client_id)), block_size)
         
         # Start the client process
         self.env.process(self.run())
 
-        Statistics.increment_client_present(self.env.now)
+        self.stats.increment_client_present(self.env.now)
     
     def run(self):
         """Simulate the client's behavior."""
         while True:
-            if random.random() < settings.CLIENT_TERMINATION_PROBABILITY:
+            termination_probability = self.config.client_termination_probability
+            if termination_probability > 0 and self.termination_draws.next() < termination_probability:
                 break  # Client terminates
             
             request_start_time = self.env.now
 
-            if self.cache_valid and (self.env.now - self.cache_timestamp) < settings.CACHE_INVALIDATION_TIME:
-                resolved_ip = self.cached_ip
-            else:
+            addresses = self.dns_answer.get_fresh_ips(self.env.now) if self.dns_answer is not None else None
+            if not addresses:
                 # Send DNS request
                 self.dns_response_event = self.env.event()  # Reset the event
-                dns_request_message = {
-                    'type': 'dns_request',
-                    'domain': 'example.com',
-                    'client_id': self.client_id,
-                    'start_timestamp': request_start_time,
-                    'client_ip': self.ip_address
-                }
-                self.network.send(self.ip_address, settings.DNS_SERVER_IP, dns_request_message)
+                dns_request_message = self.messages.dns_requests.acquire(
+                    'example.com', self.client_id, self.ip_address, request_start_time)
+                self.network.send(self, self.dns_ip, dns_request_message)
                 # Wait for DNS response
                 yield self.dns_response_event
-                resolved_ip = self.cached_ip  # Updated in receive_message
+                # A new answer is used once even if its TTL is 0; updated in receive_message
+                addresses = list(self.dns_answer.ips) if not self.dropped else None
                 
-            # Send request to resolved IP
-            self.response_event = self.env.event()  # Reset the event
-            request_message = {
-                'type': 'request',
-                'data': '...',
-                'client_id': self.client_id,
-                'start_timestamp': self.env.now,
-                'client_ip': self.ip_address,
-                'src_entity': self.network.get_entity_by_ip(self.ip_address),
-            }
-            self.network.send(self.ip_address, resolved_ip, request_message)
-            # Wait for response
-            yield self.response_event
+            # Send the request to the selected address, unless the DNS request was dropped;
+            # after a drop by a server, fail over to the next address of the answer
+            if not self.dropped:
+                addresses = self.order_addresses(addresses)
+                for attempt, resolved_ip in enumerate(addresses):
+                    self.response_event = self.env.event()  # Reset the event
+                    service_time = self.request_service_times.next() if self.config.common_random_numbers else None
+                    content_key = self.request_keys.next() if self.config.edge_cache_capacity > 0 else None
+                    request_message = self.messages.requests.acquire(
+                        self.client_id, self.ip_address, self.env.now, service_time, content_key)
+                    self.network.send(self, resolved_ip, request_message)
+                    # Wait for response
+                    yield self.response_event
+                    if not self.dropped and self.config.dns_client_selection == 'lowest_rtt':
+                        update_rtt(self.rtts, resolved_ip, self.env.now - request_message.start_timestamp)
+                    # Nothing refers to the request once its response or drop has arrived
+                    self.messages.requests.release(request_message)
+                    if not self.dropped or self.drop_server_ip is None or attempt == len(addresses) - 1:
+                        break
+                    self.stats.increment_dns_failovers(self.env.now)
+                    self.dropped = False
             
             if not self.dropped:
-                Statistics.increment_total_requests_processed(self.env.now)
+                self.stats.increment_total_requests_processed(self.env.now)
                 
                 # Calculate latency and log metrics
                 response_time = self.env.now
                 
                 latency = response_time - request_start_time
-                Statistics.record_client_latency(request_start_time, latency)
+                self.stats.record_client_latency(request_start_time, latency)
+                if self.config.edge_cache_capacity > 0:
+                    self.stats.record_edge_cache_latency(self.cache_hit, latency)
 
             self.dropped = False
 
             # Wait for time q before next request
-            q = get_client_request_interval()
+            q = self.request_intervals.next()
             yield self.env.timeout(q)
-        Statistics.decrement_client_present(self.env.now)
+        self.stats.decrement_client_present(self.env.now)
 
+    def order_addresses(self, addresses):
+        """Order the addresses of a DNS answer as the client tries them, by `dns_client_selection`."""
+        selection = self.config.dns_client_selection
+        if selection == 'random':
+            return order_addresses(addresses, selection, draw=self.selection_draws.next)
+        return order_addresses(addresses, selection, rtts=self.rtts)
     
     def receive_message(self, src_entity, message):
         """Handle incoming messages."""
-        if message['type'] == 'dns_response':
+        message_type = message.type
+        if message_type == 'dns_response':
             # Update cache
-            self.cached_ip = message['ip']
-            self.cache_timestamp = self.env.now
-            self.cache_valid = True
+            self.dns_answer = DnsAnswer(message.ips, message.ttls, self.env.now, self.config.cache_invalidation_time)
+            self.messages.dns_responses.release(message)
             # Signal that DNS response has been received
             self.dns_response_event.succeed()
-        elif message['type'] == 'response':
+        elif message_type == 'response':
+            self.cache_hit = message.cache_hit
+            self.messages.responses.release(message)
             # Signal that the response has been received
             self.response_event.succeed()
-        elif message['type'] == 'drop_server':
+        elif message_type == 'drop_server':
             self.dropped = True
+            self.drop_server_ip = message.server_ip
+            self.messages.server_drops.release(message)
             self.response_event.succeed()
-        elif message['type'] == 'drop_dns':
+        elif message_type == 'drop_dns':
             self.dropped = True
+            self.messages.dns_drops.release(message)
             self.dns_response_event.succeed()
         else:
-            pass
\ No newline at end of file
+            pass
@@ -0,0 +1,259 @@
+# sim/client_population.py
+
+import heapq
+import ipaddress
+import math
+import socket
+
+import numpy as np
+import simpy
+from sim.client import get_client_ip
+from sim.dns_answer import DnsAnswer, order_addresses, update_rtt
+from sim.resolver import get_client_dns_ip
+from sim.utils import (client_arrival_interval_sampler, client_request_interval_sampler,
+                       request_key_sampler, server_service_time_sampler, uniform_sampler)
+from sim.variates import VariatePool, VariateStream
+
+# Stream key of the population-wide streams; client ids start at 1, so key 0
+# is not used by any individual client
+POPULATION_STREAM_KEY = 0
+
+
+class ClientVariates:
+    __slots__ = ('request_intervals', 'termination_draws', 'request_service_times', 'request_keys',
+                 'selection_draws')
+
+    def __init__(self, config, streams, key, block_size):
+        """
+        The random variates of one client, or of the whole population.
+
+        Args:
+            config (SimulationConfig): The configuration of the run.
+            streams (RandomStreams): The run's random number streams.
+            key (int): Stream key: a client id, or POPULATION_STREAM_KEY for streams shared by all clients.
+            block_size (int): Number of variates pre-sampled per refill.
+        """
+        self.request_intervals = VariatePool(
+            client_request_interval_sampler(config, streams.get_generator('client_request_interval', key)),
+            block_size)
+        self.termination_draws = VariatePool(
+            uniform_sampler(streams.get_generator('client_termination', key)), block_size)
+        self.request_service_times = None
+        if config.common_random_numbers:
+            self.request_service_times = VariatePool(
+                server_service_time_sampler(config, streams.get_generator('request_service', key)), block_size)
+        self.request_keys = None
+        if config.edge_cache_capacity > 0:
+            self.request_keys = VariatePool(
+                request_key_sampler(config, streams.get_generator('request_key', key)), block_size)
+        self.selection_draws = None
+        if config.dns_client_selection == 'random':
+            self.selection_draws = VariatePool(
+                uniform_sampler(streams.get_generator('dns_selection', key)), block_size)
+
+
+class ClientPopulation:
+    def __init__(self, env, network, context):
+        """
+        All clients of a run, driven by a single process.
+
+        The clients behave like `Client` instances, but instead of one SimPy
+        process and two events per client, one process pops the next request
+        times from a heap, and the per-client state - DNS cache, request in
+        flight - is kept in NumPy arrays. Messages for any client address are
+        routed to the population through its subnet. Client n gets the same
+        IP address and arrives at the same time as in the individual model.
+
+        Request intervals, termination draws, request keys and DNS address
+        selections come from population-wide streams rather than one stream
+        per client, so runs are not sample-for-sample identical to the
+        individual model, but the clients' behaviour and metrics are. Under
+        common random numbers every client gets its own streams instead,
+        created when it arrives, so that a client's n-th request has the same
+        variates whichever strategy is simulated; this costs a generator and
+        its pre-sampled blocks per client, as in the individual model.
+
+        Args:
+            env (simpy.Environment): The simulation environment.
+            network (Network): The network instance.
+            context (SimulationContext): The run's configuration and statistics.
+        """
+        self.env = env
+        self.network = network
+        self.config = context.config
+        self.stats = context.stats
+        self.messages = network.messages
+        self.type = 'client'
+        # Types this entity exchanges messages with; DNS requests go to a resolver if there are any
+        self.peer_types = ('load_balancer', 'server', 'resolver' if self.config.resolver_ips else 'dns_server')
+
+        self.size = self.config.number_of_clients
+        self.network_address = int(ipaddress.ip_network(self.config.client_subnet).network_address)
+        if self.size:
+            get_client_ip(self.config.client_subnet, self.size)  # Check that every client fits
+        self.network.register_subnet(self.config.client_subnet, self)
+
+        # Per-client state, indexed by client id - 1
+        self.dns_answers = np.empty(self.size, dtype=object)  # Last DNS answer (DnsAnswer)
+        self.request_start_times = np.zeros(self.size)  # Start of the request in flight
+        self.requests = np.empty(self.size, dtype=object)  # Request message in flight, if sent
+        self.request_addresses = np.empty(self.size, dtype=object)  # Address the request in flight went to
+        self.failover_addresses = np.empty(self.size, dtype=object)  # Addresses left to retry after a drop
+        if self.config.dns_client_selection == 'lowest_rtt':
+            self.rtts = [{} for _ in range(self.size)]  # Smoothed response time of each address
+
+        # Client arrival times, drawn like the individual model's arrival process
+        arrival_intervals = VariateStream(
+            client_arrival_interval_sampler(self.config, context.streams.get_generator('client_arrival')),
+            self.config.variate_block_size)
+        self.arrival_times = np.cumsum(arrival_intervals.take(0, self.size)).tolist()
+        self.arrived = 0  # Clients that have arrived so far
+
+        # Pre-sampled random variates of each client: shared by the whole population,
+        # or under common random numbers the client's own, created when it arrives
+        self.streams = context.streams
+        if self.config.common_random_numbers:
+            self.client_variates = np.empty(self.size, dtype=object)
+        else:
+            self.client_variates = np.full(self.size, ClientVariates(
+                self.config, self.streams, POPULATION_STREAM_KEY, self.config.variate_block_size), dtype=object)
+
+        # (time, client id) of the next request of every thinking client
+        self.next_requests = []
+        self.wakeup_time = math.inf  # Time the process is waiting for
+
+        # Start the population process
+        self.process = self.env.process(self.run())
+
+    def get_client_ip(self, client_id):
+        """Return the IP address of a client of the population."""
+        return socket.inet_ntoa((self.network_address + client_id).to_bytes(4, 'big'))
+
+    def run(self):
+        """Start the clients' requests in time order."""
+        next_requests = self.next_requests
+        while True:
+            next_arrival = self.arrival_times[self.arrived] if self.arrived < self.size else math.inf
+            next_request = next_requests[0][0] if next_requests else math.inf
+            self.wakeup_time = min(next_arrival, next_request)
+            if self.wakeup_time > self.env.now:
+                # Sleep until then; receive_message interrupts if a client needs to start earlier
+                wait = self.env.event() if self.wakeup_time == math.inf else self.env.timeout(
+                    self.wakeup_time - self.env.now)
+                try:
+                    yield wait
+                except simpy.Interrupt:
+                    pass
+                continue
+
+            if next_arrival <= next_request:
+                self.arrived += 1
+                client_id = self.arrived
+                if self.config.common_random_numbers:
+                    self.client_variates[client_id - 1] = ClientVariates(
+                        self.config, self.streams, client_id, self.config.client_variate_block_size)
+                self.stats.increment_client_present(self.env.now)
+            else:
+                _, client_id = heapq.heappop(next_requests)
+            self.start_request(client_id)
+
+    def start_request(self, client_id):
+        """Start a client's next request, looking the address up first if its cache has expired."""
+        termination_probability = self.config.client_termination_probability
+        if (termination_probability > 0
+                and self.client_variates[client_id - 1].termination_draws.next() < termination_probability):
+            self.stats.decrement_client_present(self.env.now)  # Client terminates
+            return
+
+        now = self.env.now
+        index = client_id - 1
+        self.request_start_times[index] = now
+        answer = self.dns_answers[index]
+        addresses = answer.get_fresh_ips(now) if answer is not None else None
+        if addresses:
+            self.send_to_answer(client_id, addresses)
+        else:
+            dns_request_message = self.messages.dns_requests.acquire(
+                'example.com', client_id, self.get_client_ip(client_id), now)
+            self.network.send(self, get_client_dns_ip(self.config, client_id), dns_request_message)
+
+    def send_to_answer(self, client_id, addresses):
+        """Send a client's request to the address it selects from a DNS answer, keeping the others for failover."""
+        index = client_id - 1
+        selection = self.config.dns_client_selection
+        if selection == 'random':
+            addresses = order_addresses(addresses, selection, draw=self.client_variates[index].selection_draws.next)
+        elif selection == 'lowest_rtt':
+            addresses = order_addresses(addresses, selection, rtts=self.rtts[index])
+        self.failover_addresses[index] = addresses[1:]
+        self.send_request(client_id, addresses[0])
+
+    def send_request(self, client_id, resolved_ip):
+        """Send a client's request to the resolved address."""
+        variates = self.client_variates[client_id - 1]
+        service_time = variates.request_service_times.next() if self.config.common_random_numbers else None
+        content_key = variates.request_keys.next() if self.config.edge_cache_capacity > 0 else None
+        request_message = self.messages.requests.acquire(
+            client_id, self.get_client_ip(client_id), self.env.now, service_time, content_key)
+        self.requests[client_id - 1] = request_message
+        self.request_addresses[client_id - 1] = resolved_ip
+        self.network.send(self, resolved_ip, request_message)
+
+    def finish_request(self, client_id, dropped, cache_hit=False):
+        """Record the outcome of a client's request and schedule its next one after a think time."""
+        now = self.env.now
+        index = client_id - 1
+        request_message = self.requests[index]
+        if request_message is not None:
+            # Nothing refers to the request once its response or drop has arrived
+            self.messages.requests.release(request_message)
+            self.requests[index] = None
+
+        if not dropped:
+            self.stats.increment_total_requests_processed(now)
+            request_start_time = float(self.request_start_times[index])
+            self.stats.record_client_latency(request_start_time, now - request_start_time)
+            if self.config.edge_cache_capacity > 0:
+                self.stats.record_edge_cache_latency(cache_hit, now - request_start_time)
+
+        # Wait for time q before next request
+        next_time = now + self.client_variates[index].request_intervals.next()
+        heapq.heappush(self.next_requests, (next_time, client_id))
+        if next_time < self.wakeup_time:
+            self.wakeup_time = next_time
+            self.process.interrupt()
+
+    def receive_message(self, src_entity, message):
+        """Handle incoming messages."""
+        message_type = message.type
+        client_id = message.client_id
+        if message_type == 'dns_response':
+            # Update cache and send the request; a new answer is used once even if its TTL is 0
+            self.dns_answers[client_id - 1] = DnsAnswer(
+                message.ips, message.ttls, self.env.now, self.config.cache_invalidation_time)
+            addresses = list(message.ips)
+            self.messages.dns_responses.release(message)
+            self.send_to_answer(client_id, addresses)
+        elif message_type == 'response':
+            cache_hit = message.cache_hit
+            self.messages.responses.release(message)
+            if self.config.dns_client_selection == 'lowest_rtt':
+                index = client_id - 1
+                update_rtt(self.rtts[index], self.request_addresses[index],
+                           self.env.now - self.requests[index].start_timestamp)
+            self.finish_request(client_id, dropped=False, cache_hit=cache_hit)
+        elif message_type == 'drop_server':
+            server_ip = message.server_ip
+            self.messages.server_drops.release(message)
+            failover_addresses = self.failover_addresses[client_id - 1]
+            if server_ip is not None and failover_addresses:
+                # A server dropped the request; retry the next address of the DNS answer
+                self.stats.increment_dns_failovers(self.env.now)
+                self.messages.requests.release(self.requests[client_id - 1])
+                self.failover_addresses[client_id - 1] = failover_addresses[1:]
+                self.send_request(client_id, failover_addresses[0])
+            else:
+                self.finish_request(client_id, dropped=True)
+        elif message_type == 'drop_dns':
+            self.messages.dns_drops.release(message)
+            self.finish_request(client_id, dropped=True)
@@ -0,0 +1,184 @@
+# sim/context.py
+
+from dataclasses import dataclass, field, fields, replace
+
+from config import settings
+from sim.statistics import Statistics
+from sim.streams import RandomStreams
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict used for the mapping fields of a SimulationConfig.
+
+    Unlike `types.MappingProxyType` it pickles and deep-copies, so configurations
+    can still be sent to sweep workers and hashed through `dataclasses.asdict`.
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("SimulationConfig mappings are read-only; use config.replace instead.")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value):
+    """
+    Return a read-only copy of a setting value.
+
+    Dicts become FrozenDicts and lists become tuples, recursively; other values are returned as they are.
+
+    Args:
+        value: The setting value.
+
+    Returns:
+        The frozen value.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """
+    Immutable snapshot of the settings a single simulation run uses.
+
+    Field names are the lowercase versions of the names in `config/settings.py`.
+    Dict and list values are frozen into FrozenDicts and tuples when the
+    configuration is built, so no run can change the settings of another.
+    """
+    random_seed: int
+    simulation_time: float
+    stopping_rule: str
+    engine: str
+    fast_engine_window: float
+    target_relative_precision: float
+    stopping_check_interval: float
+    stopping_batch_count: int
+    confidence_level: float
+    mser_batch_size: int
+    mser_max_batches: int
+    number_of_servers: int
+    server_ips: tuple
+    load_balancer_type: str
+    load_balancing_strategy: str
+    load_balancing_strategy_processing_time: dict
+    jsq_d: int
+    load_refresh_interval: float
+    peak_ewma_decay_time: float
+    hash_key: str
+    consistent_hash_virtual_nodes: int
+    maglev_table_size: int
+    load_balancer_ip: str
+    number_of_clients: int
+    client_model: str
+    client_subnet: str
+    client_termination_probability: float
+    cache_invalidation_time: float
+    client_arrival_interval: float
+    q_distributions: dict
+    client_interarrival_time_mean: float
+    client_interarrival_time_std: float
+    request_key_count: int
+    request_key_zipf_exponent: float
+    dns_service_time_mean: float
+    dns_service_time_std: float
+    dns_server_buffer_size: int
+    dns_server_ip: str
+    dns_answer_count: int
+    dns_ttl: float
+    dns_client_selection: str
+    dns_overload_connections: int
+    dns_overload_ttl: float
+    resolver_ips: tuple
+    resolver_cache_ttl: float
+    resolver_service_time_mean: float
+    resolver_buffer_size: int
+    server_service_time_mean: float
+    server_service_time_std: float
+    server_buffer_size: int
+    server_workers: int
+    server_worker_counts: dict
+    server_speed_factors: dict
+    server_weights: dict
+    server_pool_changes: tuple
+    load_balancer_processing_time_mean: float
+    load_balancer_processing_time_std: float
+    load_balancer_buffer_size: int
+    load_balancer_workers: int
+    load_balancer_worker_pool: str
+    edge_cache_capacity: int
+    edge_cache_ttl: float
+    edge_cache_policy: str
+    transport_delays: dict
+    logging_enabled: bool
+    log_file_path: str
+    output_metrics_file: str
+    statistics_mode: str
+    variate_block_size: int
+    client_variate_block_size: int
+    common_random_numbers: bool
+    message_pooling: bool
+    replication: int = 0
+
+    def __post_init__(self):
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, (dict, list, tuple)):
+                object.__setattr__(self, f.name, freeze(value))
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        """
+        Build a configuration from `config/settings.py`.
+
+        Fields that have a default and no matching setting, such as
+        `replication`, keep their default.
+
+        Args:
+            **overrides: Field values replacing the ones read from settings.
+
+        Returns:
+            SimulationConfig: The configuration.
+        """
+        values = {
+            f.name: getattr(settings, f.name.upper())
+            for f in fields(cls)
+            if hasattr(settings, f.name.upper())
+        }
+        values.update(overrides)
+        return cls(**values)
+
+    def replace(self, **changes):
+        """Return a copy of the configuration with some fields changed."""
+        return replace(self, **changes)
+
+
+@dataclass
+class SimulationContext:
+    """
+    Everything a single simulation run shares between its components.
+
+    Attributes:
+        config (SimulationConfig): The immutable configuration of the run.
+        stats (Statistics): The metrics collected during the run.
+        streams (RandomStreams): The per-entity random number streams of the run.
+    """
+    config: SimulationConfig
+    stats: Statistics = field(default=None)
+    streams: RandomStreams = field(default=None)
+
+    def __post_init__(self):
+        if self.stats is None:
+            self.stats = Statistics(self.config)
+        if self.streams is None:
+            self.streams = RandomStreams(self.config.random_seed, self.config.replication)
@@ -0,0 +1,65 @@
+# sim/dns_answer.py
+
+# Ways a client picks the address it sends a request to from a DNS answer
+DNS_CLIENT_SELECTIONS = ('first', 'random', 'lowest_rtt')
+
+# Weight of a new sample in a client's smoothed response time of an address (TCP's SRTT uses 1/8)
+RTT_SMOOTHING = 1 / 8
+
+
+class DnsAnswer:
+    __slots__ = ('ips', 'ttls', 'timestamp')
+
+    def __init__(self, ips, ttls, timestamp, max_ttl):
+        """
+        A DNS answer cached by a client.
+
+        Args:
+            ips (tuple): The addresses of the answer, in the DNS server's order.
+            ttls (tuple): Seconds each address may be used for.
+            timestamp (float): Time the answer was received.
+            max_ttl (float): Longest the client keeps any address, its cache invalidation time.
+        """
+        self.ips = ips
+        self.ttls = [min(ttl, max_ttl) for ttl in ttls]
+        self.timestamp = timestamp
+
+    def get_fresh_ips(self, now):
+        """Return the addresses whose TTL has not run out, in answer order."""
+        age = now - self.timestamp
+        return [ip for ip, ttl in zip(self.ips, self.ttls) if age < ttl]
+
+
+def order_addresses(addresses, selection, draw=None, rtts=None):
+    """
+    Order the addresses of a DNS answer in the order a client tries them.
+
+    The selected address comes first and the others follow in answer
+    order, so a client failing over after a drop moves down the answer.
+
+    Args:
+        addresses (list): Fresh addresses of the answer, in answer order.
+        selection (str): 'first' keeps the answer order, 'random' picks one uniformly and
+            'lowest_rtt' the one with the lowest smoothed response time; addresses the
+            client has not measured yet count as 0, so they are tried first.
+        draw (callable): Returns a uniform variate in [0, 1); needed for 'random'.
+        rtts (dict): Smoothed response time of each measured address; needed for 'lowest_rtt'.
+
+    Returns:
+        list: The addresses, the selected one first.
+    """
+    if selection == 'first' or len(addresses) == 1:
+        return addresses
+    if selection == 'random':
+        chosen = int(draw() * len(addresses))
+    elif selection == 'lowest_rtt':
+        chosen = min(range(len(addresses)), key=lambda i: rtts.get(addresses[i], 0.0))
+    else:
+        raise ValueError(f"Unsupported DNS client selection: {selection}")
+    return [addresses[chosen]] + addresses[:chosen] + addresses[chosen + 1:]
+
+
+def update_rtt(rtts, ip, rtt):
+    """Fold a measured response time of an address into the client's smoothed response time."""
+    previous = rtts.get(ip)
+    rtts[ip] = rtt if previous is None else previous + (rtt - previous) * RTT_SMOOTHING
@@ -1,13 +1,13 @@
 # sim/dns_server.py
 
+import math
+
 import simpy
-import random
-from config import settings
-from sim.utils import get_dns_service_time
-from sim.statistics import Statistics
+from sim.utils import dns_service_time_sampler
+from sim.variates import VariatePool
 
 class DNSServer:
-    def __init__(self, env, network, ip_address, lb_strategy):
+    def __init__(self, env, network, ip_address, lb_strategy, context):
         """
         Initialize a DNSServer instance.
 
@@ -16,24 +16,42 @@ class DNSServer:
             network (Network): The network instance.
             ip_address (str): The DNS server's IP address.
             lb_strategy: The load-balancing strategy object.
+            context (SimulationContext): The run's configuration and statistics.
         """
         self.env = env
         self.network = network
         self.ip_address = ip_address
+        self.config = context.config
+        self.stats = context.stats
+        self.messages = network.messages
         self.type = 'dns_server'
+        # Types this entity exchanges messages with; with resolvers, clients ask them instead
+        self.peer_types = ('resolver',) if self.config.resolver_ips else ('client',)
         self.network.register_entity(self.ip_address, self)
         
         # Initialize the request queue with capacity B
-        self.queue = simpy.Store(env, capacity=settings.DNS_SERVER_BUFFER_SIZE)
+        self.queue = simpy.Store(env, capacity=self.config.dns_server_buffer_size)
+
+        # Pre-sampled service times
+        self.service_times = VariatePool(
+            dns_service_time_sampler(self.config, context.streams.get_generator('dns_service')),
+            self.config.variate_block_size)
         
         # Start the DNS server process
         self.env.process(self.run())
         
         # Load balancer type
-        self.load_balancer_type = settings.LOAD_BALANCER_TYPE
+        self.load_balancer_type = self.config.load_balancer_type
         
         # Load balancing strategy
         self.lb_strategy = lb_strategy
+
+        # Answers: in dns mode up to dns_answer_count servers, with a TTL that is shortened
+        # to dns_overload_ttl for servers with dns_overload_connections or more connections
+        if self.config.dns_answer_count < 1:
+            raise ValueError("A DNS answer needs at least one address.")
+        self.answer_count = min(self.config.dns_answer_count, len(self.config.server_ips))
+        self.ttl = self.config.dns_ttl if self.config.dns_ttl is not None else math.inf
         
     def run(self):
         """Process incoming DNS requests."""
@@ -41,56 +59,73 @@ class DNSServer:
             # Wait for the next DNS request
             request = yield self.queue.get()
 
-            Statistics.record_dns_queue_size(self.env.now, len(self.queue.items))
+            self.stats.record_dns_queue_size(self.env.now, len(self.queue.items))
 
             # Process the request
             yield self.env.process(self.process_request(request))
+            self.messages.dns_requests.release(request.message)
+            self.messages.envelopes.release(request)
 
     def receive_message(self, src_entity, message):
         """Handle incoming messages."""
-        if message['type'] == 'dns_request':
+        if message.type == 'dns_request':
+            self.stats.increment_dns_requests(self.env.now)
             # Check if there's space in the queue
             if len(self.queue.items) < self.queue.capacity:
                 # Enqueue the request
-                self.queue.put({
-                    'src_entity': src_entity,
-                    'message': message,
-                    'arrival_time': self.env.now
-                })
+                self.queue.put(self.messages.envelopes.acquire(src_entity, message, self.env.now))
             else:
                 # Queue is full; drop the request
-                print(f"DNS server queue full. Dropping request from Client {message['client_id']} at time {self.env.now}")
-                self.network.send(self.ip_address, self.network.get_ip_by_entity(src_entity), {
-                    'type': 'drop_dns',
-                    'data': 'queue full',
-                    'client_id': message['client_id']
-                })
-            Statistics.record_dns_queue_size(self.env.now, len(self.queue.items))
+                self.stats.increment_dns_dropped_requests(self.env.now)
+                self.network.send(self, message.client_ip, self.messages.dns_drops.acquire(
+                    'queue full', message.client_id, self.env.now))
+                self.messages.dns_requests.release(message)
+            self.stats.record_dns_queue_size(self.env.now, len(self.queue.items))
         else:
             print(f"DNS Server received unknown message type at time {self.env.now}")
     
     def process_request(self, request):
         """Process a DNS request and send a response after a service time."""
         # Simulate service time
-        service_time = get_dns_service_time()
+        service_time = self.service_times.next()
         yield self.env.timeout(service_time)
         
-        src_entity = request['src_entity']
-        message = request['message']
+        message = request.message
         
-        # Determine the resolved IP based on load balancer type
+        # Determine the resolved IPs based on load balancer type
         if self.load_balancer_type == 'dns':
-            resolved_ip = self.lb_strategy.get_next_server()
+            ips = self.get_server_answer(message)
+            ttls = tuple(self.get_server_ttl(ip) for ip in ips)
         else:
-            resolved_ip = settings.LOAD_BALANCER_IP  # Gateway load balancer IP
+            ips = (self.config.load_balancer_ip,)  # Gateway load balancer IP
+            ttls = (self.ttl,)
         
         # Create DNS response message
-        response_message = {
-            'type': 'dns_response',
-            'ip': resolved_ip,
-            'client_id': message['client_id'],
-            'timestamp': self.env.now
-        }
+        response_message = self.messages.dns_responses.acquire(ips, ttls, message.client_id, self.env.now)
         
         # Send the response back to the client
-        self.network.send(self.ip_address, self.network.get_ip_by_entity(src_entity), response_message)
+        self.network.send(self, message.client_ip, response_message)
+
+    def get_server_answer(self, message):
+        """
+        Return the server addresses answering a DNS request in dns mode.
+
+        The strategy's choice comes first, followed by the servers after it in
+        the pool, so a strategy is asked once per request however many
+        addresses the answer carries.
+        """
+        first = self.lb_strategy.get_next_server(message)
+        if self.answer_count == 1:
+            return (first,)
+        server_ips = self.lb_strategy.server_ips  # The current pool, which server pool changes can shrink
+        start = server_ips.index(first)
+        count = min(self.answer_count, len(server_ips))
+        return tuple(server_ips[(start + i) % len(server_ips)] for i in range(count))
+
+    def get_server_ttl(self, server_ip):
+        """Return the TTL of a server's address: shortened if the server is overloaded."""
+        threshold = self.config.dns_overload_connections
+        if threshold > 0 and self.network.get_entity_by_ip(server_ip).get_connections() >= threshold:
+            self.stats.increment_dns_shortened_ttls()
+            return min(self.ttl, self.config.dns_overload_ttl)
+        return self.ttl
@@ -0,0 +1,174 @@
+# sim/edge_cache.py
+
+from collections import OrderedDict
+
+
+class EdgeCache:
+    def __init__(self, capacity, ttl):
+        """
+        Base class of the response caches of the gateway load balancer.
+
+        The cache holds the keys of cached responses with the time they
+        expire. Every operation is O(1). An expired entry is not removed
+        when it is looked up: the lookup is a miss, and the response that
+        the miss leads to refreshes the entry in place. Expired entries
+        therefore keep their slot until they are refreshed or evicted.
+
+        Args:
+            capacity (int): Maximum number of keys held.
+            ttl (float): Seconds a cached response stays fresh.
+        """
+        if capacity < 1:
+            raise ValueError("The edge cache needs a capacity of at least one key.")
+        if ttl <= 0:
+            raise ValueError("The edge cache TTL must be positive.")
+        self.capacity = capacity
+        self.ttl = ttl
+        self.expiry_times = {}  # Time each cached key expires
+        self.expirations = 0  # Lookups of a key whose response had expired
+        self.evictions = 0  # Keys evicted to make room for another
+
+    def get(self, key, now):
+        """
+        Look up a key.
+
+        Args:
+            key: The request key.
+            now (float): The current time.
+
+        Returns:
+            bool: Whether a fresh response is cached for the key.
+        """
+        expiry_time = self.expiry_times.get(key)
+        if expiry_time is None:
+            return False
+        self.touch(key)
+        if expiry_time <= now:
+            self.expirations += 1
+            return False
+        return True
+
+    def put(self, key, now):
+        """
+        Cache the response for a key until `now + ttl`, evicting another key if the cache is full.
+
+        Args:
+            key: The request key.
+            now (float): The current time.
+        """
+        if key not in self.expiry_times:
+            if len(self.expiry_times) >= self.capacity:
+                del self.expiry_times[self.evict()]
+                self.evictions += 1
+            self.insert(key)
+        self.expiry_times[key] = now + self.ttl
+
+    def __len__(self):
+        return len(self.expiry_times)
+
+    def touch(self, key):
+        """Record a lookup of a cached key."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def insert(self, key):
+        """Start tracking a newly cached key."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def evict(self):
+        """Stop tracking the key to evict and return it."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+
+class LruCache(EdgeCache):
+    def __init__(self, capacity, ttl):
+        """
+        Edge cache evicting the least recently used key.
+
+        Keys are kept in an OrderedDict from least to most recently used.
+
+        Args:
+            capacity (int): Maximum number of keys held.
+            ttl (float): Seconds a cached response stays fresh.
+        """
+        super().__init__(capacity, ttl)
+        self.order = OrderedDict()
+
+    def touch(self, key):
+        self.order.move_to_end(key)
+
+    def insert(self, key):
+        self.order[key] = None
+
+    def evict(self):
+        key, _ = self.order.popitem(last=False)
+        return key
+
+
+class LfuCache(EdgeCache):
+    def __init__(self, capacity, ttl):
+        """
+        Edge cache evicting the least frequently used key.
+
+        Keys are grouped in buckets by their number of lookups, each bucket
+        ordered from least to most recently used, and the lowest non-empty
+        frequency is tracked (Shah, Mitra and Matani, "An O(1) algorithm
+        for implementing the LFU cache eviction scheme", 2010). Ties go to
+        the least recently used key.
+
+        Args:
+            capacity (int): Maximum number of keys held.
+            ttl (float): Seconds a cached response stays fresh.
+        """
+        super().__init__(capacity, ttl)
+        self.frequencies = {}  # Lookups of each key since it was cached, starting at 1
+        self.buckets = {}  # Frequency -> OrderedDict of the keys with that frequency
+        self.min_frequency = 0
+
+    def touch(self, key):
+        frequency = self.frequencies[key]
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
+            if self.min_frequency == frequency:
+                self.min_frequency = frequency + 1
+        self.frequencies[key] = frequency + 1
+        self.buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def insert(self, key):
+        self.frequencies[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_frequency = 1
+
+    def evict(self):
+        # Only called when the cache is full, so the lowest frequency's bucket is not empty
+        bucket = self.buckets[self.min_frequency]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self.buckets[self.min_frequency]
+        del self.frequencies[key]
+        return key
+
+
+# Eviction policies of the edge cache, by name
+EDGE_CACHE_POLICIES = {
+    'lru': LruCache,
+    'lfu': LfuCache,
+}
+
+
+def create_edge_cache(policy, capacity, ttl):
+    """
+    Create an edge cache.
+
+    Args:
+        policy (str): Eviction policy, 'lru' or 'lfu'.
+        capacity (int): Maximum number of keys held.
+        ttl (float): Seconds a cached response stays fresh.
+
+    Returns:
+        EdgeCache: The cache.
+    """
+    if policy not in EDGE_CACHE_POLICIES:
+        raise ValueError(f"Unsupported edge cache policy: {policy}")
+    return EDGE_CACHE_POLICIES[policy](capacity, ttl)
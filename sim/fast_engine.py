@@ -0,0 +1,599 @@
+# sim/fast_engine.py
+
+import collections
+import math
+
+import numpy as np
+
+from sim.statistics import get_load_imbalance
+from sim.streams import get_address_key
+from sim.utils import (
+    client_arrival_interval_sampler,
+    client_request_interval_sampler,
+    dns_service_time_sampler,
+    load_balancer_processing_time_sampler,
+    load_balancer_response_processing_time_sampler,
+    server_service_time_sampler,
+    uniform_sampler,
+)
+from sim.variates import VariateMatrix, VariateStream
+
+# Strategies whose choice of server does not depend on the state of the servers
+FAST_ENGINE_STRATEGIES = ('round_robin', 'random')
+
+# Fields of a request cycle (see FastEngine._new_cycles)
+CYCLE_FIELDS = ('client', 'cycle_no', 't0', 'cache', 'd_dns', 'lb_ok', 'd_lb',
+                'server', 'srv_ok', 'd_srv', 'res_ok', 'd_res')
+
+
+def get_fast_engine_support(config):
+    """
+    Check whether the fast engine can run a configuration.
+
+    Args:
+        config (SimulationConfig): The configuration of the run.
+
+    Returns:
+        str: Why the fast engine cannot run it, or None if it can.
+    """
+    if config.load_balancer_type != 'gateway':
+        return "only the gateway load balancer is supported"
+    if config.load_balancing_strategy not in FAST_ENGINE_STRATEGIES:
+        return f"the {config.load_balancing_strategy} strategy depends on the state of the servers"
+    if any(config.server_worker_counts.get(ip, config.server_workers) != 1 for ip in config.server_ips):
+        return "only single-worker servers are supported"
+    if config.server_pool_changes:
+        return "server pool changes are not supported"
+    if config.load_balancer_workers != 1 or config.load_balancer_worker_pool != 'separate':
+        return "only a single-worker load balancer with separate request and response queues is supported"
+    if config.edge_cache_capacity > 0:
+        return "the edge cache is not supported"
+    if config.resolver_ips:
+        return "resolvers are not supported"
+    if config.dns_ttl is not None and config.dns_ttl < config.cache_invalidation_time:
+        return "DNS TTLs shorter than the client cache time are not supported"
+    if config.client_model != 'individual':
+        return "only individual clients are supported"
+    if config.client_termination_probability > 0:
+        return "clients must not terminate"
+    if config.dns_server_buffer_size < config.number_of_clients:
+        return "DNS requests could be dropped"
+    if get_minimum_cycle_time(config.transport_delays) <= 0:
+        return "every round trip through the network must take time"
+    return None
+
+
+def _scaled_sampler(draw, speed_factor):
+    # Service times of a server with a speed factor, divided like Server divides them
+    if speed_factor == 1:
+        return draw
+    return lambda size: draw(size) / speed_factor
+
+
+def get_minimum_cycle_time(transport_delays):
+    """Return the shortest time from a client sending a request to it learning the outcome."""
+    to_load_balancer = transport_delays['client_to_load_balancer']
+    to_server = to_load_balancer + transport_delays['load_balancer_to_server']
+    return min(
+        to_load_balancer + transport_delays['load_balancer_to_client'],
+        to_server + transport_delays['server_to_client'],
+        to_server + transport_delays['server_to_load_balancer'] + transport_delays['load_balancer_to_client'],
+    )
+
+
+class FifoStation:
+    def __init__(self, service_times, capacity):
+        """
+        A single-server FIFO queue with a finite waiting room.
+
+        Arrivals are handed over a window at a time. Without drops the
+        departures follow from the Lindley recursion in closed form,
+        D_i = C_i + max(D_0, max_{j <= i} (A_j - C_{j-1})) with C the cumulative
+        service times, which NumPy evaluates with one cumsum and one
+        maximum.accumulate. If an arrival finds the waiting room full, the
+        window is solved sequentially instead.
+
+        Args:
+            service_times (VariateStream): The k-th service time is used by the k-th
+                accepted arrival; None if every arrival brings its own.
+            capacity (int): Maximum number of arrivals waiting (not in service).
+        """
+        self.service_times = service_times
+        self.capacity = capacity
+        self.served = 0
+        self.free_at = -math.inf  # Departure of the last accepted arrival
+        self.waiting_starts = np.empty(0)  # Start times of accepted arrivals that may still be waiting
+
+    def serve(self, arrivals, service_times=None):
+        """
+        Compute the fate of sorted arrivals following the committed ones, without committing them.
+
+        Args:
+            arrivals (numpy.ndarray): Sorted arrival times.
+            service_times (numpy.ndarray): Service time of each arrival, if they bring their own.
+
+        Returns:
+            StationPass: The arrivals with their outcome.
+        """
+        n = len(arrivals)
+        per_arrival = service_times is not None
+        if not per_arrival:
+            service_times = self.service_times.take(self.served, n)
+        cumulative = np.cumsum(service_times)
+        departures = cumulative + np.maximum.accumulate(
+            np.maximum(arrivals - (cumulative - service_times), self.free_at))
+        starts = np.maximum(arrivals, np.concatenate([[self.free_at], departures[:-1]]))
+
+        # Arrivals waiting when each arrival comes: earlier ones that have not started yet
+        index = np.arange(n)
+        waiting = (len(self.waiting_starts) - np.searchsorted(self.waiting_starts, arrivals, 'right')
+                   + index - np.minimum(index, np.searchsorted(starts, arrivals, 'right')))
+        if n and waiting.max() >= self.capacity:
+            return self._serve_sequentially(arrivals, service_times, per_arrival)
+        return StationPass(arrivals, np.ones(n, dtype=bool), starts, departures, waiting + 1)
+
+    def _serve_sequentially(self, arrivals, service_times, per_arrival):
+        n = len(arrivals)
+        accepted = np.zeros(n, dtype=bool)
+        starts = np.full(n, math.inf)
+        departures = np.full(n, math.inf)
+        queue_sizes = np.empty(n, dtype=np.int64)
+        waiting = collections.deque(self.waiting_starts.tolist())
+        service_times = service_times.tolist()
+        free_at = self.free_at
+        k = 0
+        for i, arrival in enumerate(arrivals.tolist()):
+            while waiting and waiting[0] <= arrival:
+                waiting.popleft()
+            if len(waiting) >= self.capacity:
+                queue_sizes[i] = len(waiting)
+                continue
+            queue_sizes[i] = len(waiting) + 1
+            service_time = service_times[i] if per_arrival else service_times[k]
+            k += 1
+            start = arrival if arrival > free_at else free_at
+            free_at = start + service_time
+            if start > arrival:
+                waiting.append(start)
+            accepted[i] = True
+            starts[i] = start
+            departures[i] = free_at
+        return StationPass(arrivals, accepted, starts, departures, queue_sizes)
+
+    def commit(self, station_pass, horizon):
+        """
+        Make the outcome of a window's arrivals final.
+
+        Args:
+            station_pass (StationPass): Result of `serve` for the window.
+            horizon (float): End of the window; later arrivals come after it.
+        """
+        accepted = station_pass.accepted
+        if self.service_times is not None:
+            self.served += int(accepted.sum())
+            self.service_times.discard(self.served)
+        departures = station_pass.departures[accepted]
+        if len(departures):
+            self.free_at = departures[-1]
+        starts = np.concatenate([self.waiting_starts, station_pass.starts[accepted]])
+        self.waiting_starts = starts[starts > horizon]
+
+
+class StationPass:
+    __slots__ = ('arrivals', 'accepted', 'starts', 'departures', 'queue_sizes', 'index')
+
+    def __init__(self, arrivals, accepted, starts, departures, queue_sizes):
+        """
+        Outcome of the arrivals of one window at a FifoStation.
+
+        Args:
+            arrivals (numpy.ndarray): Sorted arrival times.
+            accepted (numpy.ndarray): False for arrivals dropped because the waiting room was full.
+            starts (numpy.ndarray): Service start times, infinite for dropped arrivals.
+            departures (numpy.ndarray): Departure times, infinite for dropped arrivals.
+            queue_sizes (numpy.ndarray): Queue length right after each arrival: the arrivals
+                waiting before it, plus itself if accepted (a Store holds an item until its
+                put event is processed, even when the server is idle).
+        """
+        self.arrivals = arrivals
+        self.accepted = accepted
+        self.starts = starts
+        self.departures = departures
+        self.queue_sizes = queue_sizes
+        self.index = None  # Cycle of each arrival, set by FastEngine
+
+
+class FastEngine:
+    # Bounds of the adaptive window length, in seconds
+    MIN_WINDOW = 1.0
+    MAX_WINDOW = 1000.0
+
+    def __init__(self, context):
+        """
+        Vectorized engine for gateway runs with a state-independent strategy.
+
+        With round robin or random server choice and no client termination,
+        the gateway topology is a chain of FIFO queues - DNS server, load
+        balancer requests, servers, load balancer responses - closed by the
+        clients, which send their next request a think time after the
+        previous one ends. Time is cut into windows. Within a window every
+        queue is solved for all of its arrivals at once with FifoStation,
+        and the clients' next requests are derived from the outcomes; this
+        is repeated until the requests sent in the window stop changing.
+        Each repetition settles at least one more request per client, since
+        every round trip takes at least `get_minimum_cycle_time`.
+
+        The variates come from the same streams, in the same order, as the
+        SimPy entities use them, so both engines simulate the same sample
+        path up to floating-point rounding and the ordering of simultaneous
+        events. Only the server queue sizes, drops and request outcomes are
+        recorded; the load balancer and DNS queue sizes and the streaming
+        latency quantiles are not.
+
+        Args:
+            context (SimulationContext): The run's configuration and statistics.
+        """
+        config = context.config
+        reason = get_fast_engine_support(config)
+        if reason is not None:
+            raise ValueError(f"The fast engine cannot run this configuration: {reason}.")
+        self.config = config
+        self.stats = context.stats
+        streams = context.streams
+
+        delays = config.transport_delays
+        self.client_to_dns_server = delays['client_to_dns_server']
+        self.dns_server_to_client = delays['dns_server_to_client']
+        self.client_to_load_balancer = delays['client_to_load_balancer']
+        self.load_balancer_to_server = delays['load_balancer_to_server']
+        self.server_to_load_balancer = delays['server_to_load_balancer']
+        self.load_balancer_to_client = delays['load_balancer_to_client']
+        self.server_to_client = delays['server_to_client']
+        self.minimum_cycle_time = get_minimum_cycle_time(delays)
+
+        # ===============================
+        # Queues
+        # ===============================
+        block_size = config.variate_block_size
+        self.dns_server = FifoStation(
+            VariateStream(dns_service_time_sampler(config, streams.get_generator('dns_service')), block_size),
+            config.dns_server_buffer_size)
+        self.lb_requests = FifoStation(
+            VariateStream(load_balancer_processing_time_sampler(
+                config, streams.get_generator('load_balancer_processing')), block_size),
+            config.load_balancer_buffer_size)
+        self.lb_responses = FifoStation(
+            VariateStream(load_balancer_response_processing_time_sampler(
+                config, streams.get_generator('load_balancer_response_processing')), block_size),
+            config.load_balancer_buffer_size)
+        self.servers = []
+        self.speed_factors = [config.server_speed_factors.get(ip, 1) for ip in config.server_ips]
+        for ip, speed_factor in zip(config.server_ips, self.speed_factors):
+            if config.common_random_numbers:
+                service_times = None  # Drawn by the clients
+            else:
+                service_times = VariateStream(_scaled_sampler(server_service_time_sampler(
+                    config, streams.get_generator('server_service', get_address_key(ip))), speed_factor),
+                    block_size)
+            self.servers.append(FifoStation(service_times, config.server_buffer_size))
+
+        # Random server choices, drawn like RandomStrategy draws them
+        if config.load_balancing_strategy == 'random':
+            self.server_choices = VariateStream(uniform_sampler(streams.get_generator('strategy')), 1024)
+        else:
+            self.server_choices = None
+        self.forwarded = 0  # Requests forwarded by the load balancer so far
+        self.settled_requests = 0  # Requests completed or dropped in committed windows
+
+        # ===============================
+        # Clients
+        # ===============================
+        n = config.number_of_clients
+        arrival_intervals = VariateStream(
+            client_arrival_interval_sampler(config, streams.get_generator('client_arrival')), block_size)
+        self.client_creation_times = np.cumsum(arrival_intervals.take(0, n))
+        client_block_size = config.client_variate_block_size
+        self.request_intervals = VariateMatrix(
+            [client_request_interval_sampler(config, streams.get_generator('client_request_interval', client_id))
+             for client_id in range(1, n + 1)],
+            client_block_size)
+        if config.common_random_numbers:
+            self.request_service_times = VariateMatrix(
+                [server_service_time_sampler(config, streams.get_generator('request_service', client_id))
+                 for client_id in range(1, n + 1)],
+                client_block_size)
+        else:
+            self.request_service_times = None
+
+        # The request cycle each client is in: the first one starts when the client is created
+        self.open_cycles = self._new_cycles(
+            np.arange(n), np.zeros(n, dtype=np.int64), self.client_creation_times.copy(), np.full(n, -math.inf))
+
+        # Per-server records that depend on arrivals after the current window
+        self.pending_starts = [(np.empty(0), np.empty(0, dtype=np.int64)) for _ in self.servers]
+        self.pending_completions = [(np.empty(0), np.empty(0)) for _ in self.servers]
+        self.accepted_counts = [0] * len(self.servers)
+        self.received_counts = [0] * len(self.servers)
+        self.busy_times = [0.0] * len(self.servers)
+
+        self.window = config.fast_engine_window
+
+    def _new_cycles(self, clients, cycle_nos, start_times, cache_times):
+        """
+        Create request cycles that have not reached any queue yet.
+
+        A cycle is one request of a client, from its start (`t0`) until the
+        client learns the outcome. `cache` is the time of the DNS response
+        the client holds when the cycle starts. The remaining fields are the
+        departures from each queue (`d_*`), whether the request was accepted
+        there (`*_ok`) and the index of the server it was sent to; they stay
+        infinite, True and -1 until the request gets there.
+        """
+        n = len(clients)
+        return {
+            'client': clients,
+            'cycle_no': cycle_nos,
+            't0': start_times,
+            'cache': cache_times,
+            'd_dns': np.full(n, math.inf),
+            'lb_ok': np.ones(n, dtype=bool),
+            'd_lb': np.full(n, math.inf),
+            'server': np.full(n, -1, dtype=np.int64),
+            'srv_ok': np.ones(n, dtype=bool),
+            'd_srv': np.full(n, math.inf),
+            'res_ok': np.ones(n, dtype=bool),
+            'd_res': np.full(n, math.inf),
+        }
+
+    def run(self, progress=None):
+        """
+        Simulate until `simulation_time`, or until the stopping rule is satisfied.
+
+        Args:
+            progress (RunProgress): Progress reports of the run, updated after every
+                window with the requests settled so far as events; None reports nothing.
+
+        Returns:
+            float: The simulated time.
+        """
+        config = self.config
+        until = float(config.simulation_time)
+        if config.stopping_rule == 'batch_means':
+            next_check = config.stopping_check_interval
+            if next_check >= until:
+                next_check = math.inf
+        elif config.stopping_rule == 'fixed':
+            next_check = math.inf
+        else:
+            raise ValueError(f"Unsupported stopping rule: {config.stopping_rule}")
+
+        start = 0.0
+        while start < until:
+            end = min(start + self.window, until, next_check)
+            sweeps = self._run_window(start, end)
+            start = end
+            if progress is not None:
+                progress.update(start, self.settled_requests, self.stats.total_requests_processed)
+
+            # Windows that settle in a few sweeps can grow, slow ones shrink
+            if sweeps <= 3:
+                self.window = min(2 * self.window, self.MAX_WINDOW)
+            elif sweeps > 8:
+                self.window = max(self.window / 2, self.MIN_WINDOW)
+
+            # Same checks as sim.stopping.stop_when_precise
+            if end == next_check:
+                half_widths = self.stats.request_batches.get_relative_half_widths(config.confidence_level)
+                if max(half_widths) <= config.target_relative_precision:
+                    break
+                next_check += config.stopping_check_interval
+                if next_check >= until:
+                    next_check = math.inf
+        self.now = start
+        return start
+
+    def _run_window(self, start, end):
+        """Simulate the window [start, end) and commit it. Returns the number of sweeps it took."""
+        carried = self.open_cycles
+        spawned = self._new_cycles(*(np.empty(0, dtype=dtype) for dtype in (np.int64, np.int64, float, float)))
+        max_sweeps = int((end - start) / self.minimum_cycle_time) + 3
+        for sweep in range(1, max_sweeps + 1):
+            cycles = {key: np.concatenate([carried[key], spawned[key]]) for key in CYCLE_FIELDS}
+            result = self._sweep(cycles, start, end)
+            children = result['children']
+            in_window = children['t0'] < end
+            next_spawned = {key: values[in_window] for key, values in children.items()}
+            if all(np.array_equal(next_spawned[key], spawned[key]) for key in ('client', 't0', 'cache')):
+                self._commit(result, start, end)
+                return sweep
+            spawned = next_spawned
+        raise RuntimeError(f"Window [{start}, {end}) did not settle in {max_sweeps} sweeps.")
+
+    def _pass(self, station, arrivals, ok, departures, start, end, service_times=None):
+        """
+        Serve the cycles arriving at a station during the window.
+
+        Cycles that arrived before the window keep their committed outcome;
+        cycles arriving after it are reset to not having been served yet.
+        """
+        index = np.flatnonzero((arrivals >= start) & (arrivals < end))
+        index = index[np.argsort(arrivals[index], kind='stable')]
+        station_pass = station.serve(
+            arrivals[index], None if service_times is None else service_times[index])
+        station_pass.index = index
+
+        later = arrivals >= end
+        ok = np.where(later, True, ok)
+        ok[index] = station_pass.accepted
+        departures = np.where(later, math.inf, departures)
+        departures[index] = station_pass.departures
+        return ok, departures, station_pass
+
+    def _choose_servers(self, count):
+        """Return the servers of the next `count` forwarded requests, without committing them."""
+        if self.server_choices is None:
+            return (self.forwarded + np.arange(count)) % len(self.servers)
+        return (self.server_choices.take(self.forwarded, count) * len(self.servers)).astype(np.int64)
+
+    def _sweep(self, cycles, start, end):
+        """Compute every queue's outcome in the window for the given cycles, and the cycles they lead to."""
+        c = dict(cycles)
+        passes = {}
+
+        # DNS lookup when the cached answer has expired
+        dns = c['t0'] - c['cache'] >= self.config.cache_invalidation_time
+        dns_arrivals = np.where(dns, c['t0'] + self.client_to_dns_server, math.inf)
+        _, c['d_dns'], passes['dns'] = self._pass(
+            self.dns_server, dns_arrivals, np.ones(len(dns), dtype=bool), c['d_dns'], start, end)
+        dns_received = c['d_dns'] + self.dns_server_to_client
+
+        # Load balancer request queue; servers are chosen in forwarding order
+        lb_arrivals = np.where(dns, dns_received, c['t0']) + self.client_to_load_balancer
+        c['lb_ok'], c['d_lb'], lb_pass = self._pass(
+            self.lb_requests, lb_arrivals, c['lb_ok'], c['d_lb'], start, end)
+        passes['lb_requests'] = lb_pass
+        forwarded = lb_pass.index[lb_pass.accepted]
+        c['server'] = np.where(lb_arrivals >= end, -1, c['server'])
+        c['server'][forwarded] = self._choose_servers(len(forwarded))
+
+        # Servers
+        server_arrivals = np.where(c['lb_ok'], c['d_lb'] + self.load_balancer_to_server, math.inf)
+        service_times = None
+        if self.request_service_times is not None:
+            service_times = self.request_service_times.take(c['client'], c['cycle_no'])
+        passes['servers'] = []
+        for s, station in enumerate(self.servers):
+            on_server = c['server'] == s
+            station_service_times = service_times
+            if service_times is not None and self.speed_factors[s] != 1:
+                station_service_times = service_times / self.speed_factors[s]
+            ok, departures, station_pass = self._pass(
+                station, np.where(on_server, server_arrivals, math.inf), c['srv_ok'], c['d_srv'],
+                start, end, station_service_times)
+            c['srv_ok'] = np.where(on_server, ok, c['srv_ok'])
+            c['d_srv'] = np.where(on_server, departures, c['d_srv'])
+            passes['servers'].append(station_pass)
+
+        # Load balancer response queue
+        response_arrivals = np.where(c['srv_ok'], c['d_srv'] + self.server_to_load_balancer, math.inf)
+        c['res_ok'], c['d_res'], passes['lb_responses'] = self._pass(
+            self.lb_responses, response_arrivals, c['res_ok'], c['d_res'], start, end)
+
+        # The client learns the outcome from the response or from whoever dropped the request
+        received = c['d_res'] + self.load_balancer_to_client
+        received = np.where(c['res_ok'], received, response_arrivals + self.load_balancer_to_client)
+        received = np.where(c['srv_ok'], received, server_arrivals + self.server_to_client)
+        received = np.where(c['lb_ok'], received, lb_arrivals + self.load_balancer_to_client)
+
+        # Cycles that end in the window lead to the client's next request after a think time
+        parents = np.flatnonzero(received < end)
+        clients = c['client'][parents]
+        cycle_nos = c['cycle_no'][parents]
+        children = self._new_cycles(
+            clients,
+            cycle_nos + 1,
+            received[parents] + self.request_intervals.take(clients, cycle_nos),
+            np.where(dns, dns_received, c['cache'])[parents],
+        )
+        return {'cycles': c, 'passes': passes, 'received': received, 'children': children}
+
+    def _commit(self, result, start, end):
+        """Make a settled window final and record its statistics."""
+        stats = self.stats
+        c = result['cycles']
+        passes = result['passes']
+        received = result['received']
+
+        self.dns_server.commit(passes['dns'], end)
+        lb_pass = passes['lb_requests']
+        self.lb_requests.commit(lb_pass, end)
+        self.forwarded += int(lb_pass.accepted.sum())
+        if self.server_choices is not None:
+            self.server_choices.discard(self.forwarded)
+        response_pass = passes['lb_responses']
+        self.lb_responses.commit(response_pass, end)
+
+        # Drops and the cycles they end, as (drop time, cycle index)
+        drop_times = [lb_pass.arrivals[~lb_pass.accepted], response_pass.arrivals[~response_pass.accepted]]
+        drop_cycles = [lb_pass.index[~lb_pass.accepted], response_pass.index[~response_pass.accepted]]
+        stats.add_load_balancer_req_dropped_requests(drop_times[0])
+        stats.add_load_balancer_res_dropped_requests(drop_times[1])
+
+        for s, (station, station_pass) in enumerate(zip(self.servers, passes['servers'])):
+            server_ip = self.config.server_ips[s]
+            station.commit(station_pass, end)
+            self.received_counts[s] += len(station_pass.arrivals)
+            accepted = station_pass.accepted
+            dropped = station_pass.arrivals[~accepted]
+            stats.add_server_dropped_requests(server_ip, dropped)
+            drop_times.append(dropped)
+            drop_cycles.append(station_pass.index[~accepted])
+            self._record_server(s, station_pass, end)
+
+        # Request outcomes in the order they happened: completions and drops
+        completed = np.flatnonzero((received < end) & c['lb_ok'] & c['srv_ok'] & c['res_ok'])
+        dropped = np.concatenate(drop_cycles)
+        times = np.concatenate([received[completed]] + drop_times)
+        start_times = c['t0'][np.concatenate([completed, dropped])]
+        latencies = np.concatenate([received[completed] - c['t0'][completed], np.full(len(dropped), math.nan)])
+        order = np.argsort(times, kind='stable')
+        self.settled_requests += len(times)
+        stats.record_request_outcomes(times[order], start_times[order], latencies[order])
+
+        created = self.client_creation_times[(self.client_creation_times >= start) & (self.client_creation_times < end)]
+        for time in created.tolist():
+            stats.increment_client_present(time)
+
+        # Every client continues with its unfinished cycle or with the next one, starting after the window
+        children = result['children']
+        unfinished = received >= end
+        later = children['t0'] >= end
+        open_cycles = {
+            key: np.concatenate([c[key][unfinished], children[key][later]]) for key in CYCLE_FIELDS}
+        order = np.argsort(open_cycles['client'])
+        self.open_cycles = {key: values[order] for key, values in open_cycles.items()}
+
+    def _record_server(self, s, station_pass, end):
+        """Record a server's queue sizes and busy time up to the end of the window."""
+        accepted = station_pass.accepted
+        arrivals = station_pass.arrivals[accepted]
+        first = self.accepted_counts[s]
+        self.accepted_counts[s] += len(arrivals)
+
+        # The queue size after a request starts service counts the arrivals until then,
+        # so it is recorded once the window containing the start is settled
+        start_times, indices = self.pending_starts[s]
+        start_times = np.concatenate([start_times, station_pass.starts[accepted]])
+        indices = np.concatenate([indices, first + np.arange(len(arrivals))])
+        ready = start_times < end
+        self.pending_starts[s] = (start_times[~ready], indices[~ready])
+        start_times = start_times[ready]
+        start_sizes = first + np.searchsorted(arrivals, start_times, 'right') - indices[ready] - 1
+
+        times = np.concatenate([station_pass.arrivals, start_times])
+        sizes = np.concatenate([station_pass.queue_sizes, start_sizes])
+        kinds = np.concatenate([np.zeros(len(station_pass.arrivals)), np.ones(len(start_times))])
+        order = np.lexsort((kinds, times))  # An arrival is recorded before a start at the same time
+        self.stats.record_server_queue_sizes(self.config.server_ips[s], times[order], sizes[order])
+
+        # Busy time counts the requests completed by now, like Server.busy_time
+        departures, service_times = self.pending_completions[s]
+        departures = np.concatenate([departures, station_pass.departures[accepted]])
+        service_times = np.concatenate(
+            [service_times, station_pass.departures[accepted] - station_pass.starts[accepted]])
+        ready = departures < end
+        self.busy_times[s] += float(service_times[ready].sum())
+        self.pending_completions[s] = (departures[~ready], service_times[~ready])
+
+    def get_server_load_imbalance(self):
+        """Return the server load imbalance, like Statistics.get_server_load_imbalance."""
+        return get_load_imbalance(self.received_counts)
+
+    def get_avg_server_utilization(self):
+        """Return the server utilization in percent, averaged like Statistics.get_avg_server_utilization."""
+        utilizations = [
+            self.busy_times[s] / self.now * 100 if self.now > 0 else 0
+            for s, server_ip in enumerate(self.config.server_ips)
+            if server_ip in self.stats.server_queue_stats
+        ]
+        return sum(utilizations) / len(utilizations)
@@ -1,12 +1,34 @@
 # sim/load_balancer.py
 
 import simpy
-from config import settings
-from sim.utils import get_load_balancer_processing_time, get_load_balancer_response_processing_time
-from sim.statistics import Statistics
+from sim.edge_cache import create_edge_cache
+from sim.utils import load_balancer_processing_time_sampler, load_balancer_response_processing_time_sampler
+from sim.variates import VariatePool
+
+
+class MessageQueue(simpy.Store):
+    def __init__(self, env):
+        """
+        An unbounded Store of envelopes that counts the items of each message type it holds.
+
+        The counts change exactly when items enter and leave the Store, so
+        they stay equal to what a separate Store per type would hold.
+        """
+        super().__init__(env)
+        self.counts = {'request': 0, 'response': 0}
+
+    def _do_put(self, event):
+        self.counts[event.item.message.type] += 1
+        return super()._do_put(event)
+
+    def _do_get(self, event):
+        if self.items:
+            self.counts[self.items[0].message.type] -= 1
+        return super()._do_get(event)
+
 
 class LoadBalancer:
-    def __init__(self, env, network, ip_address, lb_strategy):
+    def __init__(self, env, network, ip_address, lb_strategy, context):
         """
         Initialize a LoadBalancer instance.
 
@@ -15,113 +37,210 @@ class LoadBalancer:
             network (Network): The network instance.
             ip_address (str): The load balancer's IP address.
             lb_strategy: The load-balancing strategy object.
+            context (SimulationContext): The run's configuration and statistics.
         """
         self.env = env
         self.network = network
         self.ip_address = ip_address
+        self.config = context.config
+        self.stats = context.stats
+        self.messages = network.messages
         self.type = 'load_balancer'
+        self.peer_types = ('client', 'server')  # Types this entity exchanges messages with
         self.network.register_entity(self.ip_address, self)
         
-        # Initialize the request queue with capacity B
-        self.request_queue = simpy.Store(env, capacity=settings.LOAD_BALANCER_BUFFER_SIZE)
-        
-        # Initialize the response queue for responses coming back from servers
-        self.response_queue = simpy.Store(env, capacity=settings.LOAD_BALANCER_BUFFER_SIZE)
+        # Worker pools: with 'separate' pools, requests and responses each have their own queue
+        # and workers; with a 'shared' pool, all workers take both from one queue in arrival order
+        self.worker_pool = self.config.load_balancer_worker_pool
+        workers = self.config.load_balancer_workers
+        if workers < 1:
+            raise ValueError("The load balancer needs at least one worker.")
+        if self.worker_pool == 'separate':
+            # Initialize the request queue with capacity B
+            self.request_queue = simpy.Store(env, capacity=self.config.load_balancer_buffer_size)
+
+            # Initialize the response queue for responses coming back from servers
+            self.response_queue = simpy.Store(env, capacity=self.config.load_balancer_buffer_size)
+        elif self.worker_pool == 'shared':
+            self.work_queue = MessageQueue(env)
+        else:
+            raise ValueError(f"Unsupported load balancer worker pool: {self.worker_pool}")
 
-        # Start the load balancer process for requests and responses
-        self.env.process(self.run_request_processor())
-        self.env.process(self.run_response_processor())
+        # Pre-sampled processing times
+        block_size = self.config.variate_block_size
+        streams = context.streams
+        self.processing_times = VariatePool(
+            load_balancer_processing_time_sampler(
+                self.config, streams.get_generator('load_balancer_processing')),
+            block_size)
+        self.response_processing_times = VariatePool(
+            load_balancer_response_processing_time_sampler(
+                self.config, streams.get_generator('load_balancer_response_processing')),
+            block_size)
+
+        # Start the load balancer worker processes for requests and responses
+        if self.worker_pool == 'separate':
+            self.worker_busy_times = [0.0] * (2 * workers)
+            for worker in range(workers):
+                self.env.process(self.run_request_processor(worker))
+            for worker in range(workers, 2 * workers):
+                self.env.process(self.run_response_processor(worker))
+        else:
+            self.worker_busy_times = [0.0] * workers
+            for worker in range(workers):
+                self.env.process(self.run_shared_processor(worker))
+        self.start_time = self.env.now
         
         # Load balancing strategy
         self.lb_strategy = lb_strategy
-        self.cnt = 0
 
-    def run_request_processor(self):
-        """Process incoming client requests and forward them to a server."""
+        # Edge cache of responses by request key, or None if disabled
+        self.edge_cache = None
+        if self.config.edge_cache_capacity > 0:
+            self.edge_cache = create_edge_cache(
+                self.config.edge_cache_policy, self.config.edge_cache_capacity, self.config.edge_cache_ttl)
+
+    def run_request_processor(self, worker):
+        """Process incoming client requests and forward them to a server; run by every request worker."""
         while True:
             # Wait for the next request
             request = yield self.request_queue.get()
 
-            Statistics.record_load_balancer_req_queue_size(self.env.now, len(self.request_queue.items))
+            self.stats.record_load_balancer_req_queue_size(self.env.now, self.get_queue_size('request'))
 
             # Process the request
+            started = self.env.now
             yield self.env.process(self.process_request(request))
+            self.worker_busy_times[worker] += self.env.now - started
+            self.messages.envelopes.release(request)
 
-    def run_response_processor(self):
-        """Process server responses and forward them to clients."""
+    def run_response_processor(self, worker):
+        """Process server responses and forward them to clients; run by every response worker."""
         while True:
             # Wait for the next response from a server
             response = yield self.response_queue.get()
 
-            Statistics.record_load_balancer_res_queue_size(self.env.now, len(self.response_queue.items))
+            self.stats.record_load_balancer_res_queue_size(self.env.now, self.get_queue_size('response'))
             # Process the response
+            started = self.env.now
             yield self.env.process(self.process_response(response))
+            self.worker_busy_times[worker] += self.env.now - started
+            self.messages.envelopes.release(response)
+
+    def run_shared_processor(self, worker):
+        """Process requests and responses in arrival order; run by every worker of a shared pool."""
+        while True:
+            item = yield self.work_queue.get()
+
+            started = self.env.now
+            if item.message.type == 'request':
+                self.stats.record_load_balancer_req_queue_size(self.env.now, self.get_queue_size('request'))
+                yield self.env.process(self.process_request(item))
+            else:
+                self.stats.record_load_balancer_res_queue_size(self.env.now, self.get_queue_size('response'))
+                yield self.env.process(self.process_response(item))
+            self.worker_busy_times[worker] += self.env.now - started
+            self.messages.envelopes.release(item)
+
+    def get_queue_size(self, message_type):
+        """Return the number of messages of a type ('request' or 'response') waiting for a worker."""
+        if self.worker_pool == 'shared':
+            return self.work_queue.counts[message_type]
+        queue = self.request_queue if message_type == 'request' else self.response_queue
+        return len(queue.items)
+
+    def enqueue(self, message_type, envelope):
+        """Queue a received message for the workers."""
+        if self.worker_pool == 'shared':
+            self.work_queue.put(envelope)
+        elif message_type == 'request':
+            self.request_queue.put(envelope)
+        else:
+            self.response_queue.put(envelope)
+
+    def get_worker_utilizations(self):
+        """Return the percentage of time each worker spent processing; request workers come first."""
+        elapsed = self.env.now - self.start_time
+        return [busy_time / elapsed * 100 if elapsed > 0 else 0 for busy_time in self.worker_busy_times]
+
+    def get_utilization(self):
+        """Return the utilization of the load balancer's workers in percent, averaged over the workers."""
+        utilizations = self.get_worker_utilizations()
+        return sum(utilizations) / len(utilizations)
     
     def receive_message(self, src_entity, message):
         """Handle incoming messages."""
-        if message['type'] == 'request':
+        message_type = message.type
+        if message_type == 'request':
             # Check if there's space in the request queue
-            if len(self.request_queue.items) < self.request_queue.capacity:
+            if self.get_queue_size('request') < self.config.load_balancer_buffer_size:
                 # Enqueue the request
-                self.request_queue.put({
-                    'src_entity': src_entity,
-                    'message': message,
-                    'arrival_time': self.env.now
-                })
+                self.enqueue('request', self.messages.envelopes.acquire(src_entity, message, self.env.now))
             else:
                 # TODO: the message should be dropped, the cliend must be notified about the drop.
                 # Queue is full; drop the request
-                Statistics.increment_load_balancer_req_dropped_requests(self.env.now)
-                self.network.send(self.ip_address, message['client_ip'], {"type": 'drop_server', 'data': 'queue full'})
+                self.stats.increment_load_balancer_req_dropped_requests(self.env.now)
+                self.network.send(self, message.client_ip, self.messages.server_drops.acquire(
+                    'queue full', message.client_id, None, self.env.now))
                 # Optionally, send an error message back to the client
-            Statistics.record_load_balancer_req_queue_size(self.env.now, len(self.request_queue.items))
-        elif message['type'] == 'response':
+            self.stats.record_load_balancer_req_queue_size(self.env.now, self.get_queue_size('request'))
+        elif message_type == 'response':
             # Check if there's space in the response queue
-            if len(self.response_queue.items) < self.response_queue.capacity:
+            if self.get_queue_size('response') < self.config.load_balancer_buffer_size:
                 # Enqueue the response
-                self.response_queue.put({
-                    'src_entity': src_entity,
-                    'message': message,
-                    'arrival_time': self.env.now
-                })
+                self.enqueue('response', self.messages.envelopes.acquire(src_entity, message, self.env.now))
             else:
                 # Queue is full; drop the response
-                Statistics.increment_load_balancer_res_dropped_requests(self.env.now)
-                self.network.send(self.ip_address, message['client_ip'], {"type": 'drop_server', 'data': 'queue full'})
+                self.stats.increment_load_balancer_res_dropped_requests(self.env.now)
+                self.network.send(self, message.client_ip, self.messages.server_drops.acquire(
+                    'queue full', message.client_id, None, self.env.now))
+                self.messages.responses.release(message)
                 # Optionally, log the dropped response
-            Statistics.record_load_balancer_res_queue_size(self.env.now, len(self.response_queue.items))
+            self.stats.record_load_balancer_res_queue_size(self.env.now, self.get_queue_size('response'))
         else:
             pass
     
     def process_request(self, request):
-        self.cnt += 1
-        print(self.cnt, end='\r')
         """Process a client request and forward it to a server after a processing time."""
         # Simulate processing time for the load balancer to forward the request
-        processing_time = get_load_balancer_processing_time()
+        processing_time = self.processing_times.next()
         yield self.env.timeout(processing_time)
         
-        src_entity = request['src_entity']
-        message = request['message']
+        message = request.message
+
+        # Answer from the edge cache if it holds a fresh response, without a server round trip
+        if self.edge_cache is not None and message.content_key is not None:
+            hit = self.edge_cache.get(message.content_key, self.env.now)
+            self.stats.record_edge_cache_lookup(hit)
+            if hit:
+                self.network.send(self, message.client_ip, self.messages.responses.acquire(
+                    None, message.client_id, message.client_ip, self.env.now, None, message.content_key, True))
+                return
         
         # Select a server IP using the load-balancing strategy
-        server_ip = self.lb_strategy.get_next_server()
+        server_ip = self.lb_strategy.get_next_server(message)
         
-        # Modify the message to include the client IP so the server can send the response back
-        message['client_ip'] = self.network.get_ip_by_entity(src_entity)
-        message['through_lb'] = True
+        # Mark the message so the server sends the response back through the load balancer
+        message.through_lb = True
+        message.forwarded_timestamp = self.env.now
         
         # Send the request to the selected server
-        self.network.send(self.ip_address, server_ip, message)
+        self.network.send(self, server_ip, message)
 
     def process_response(self, response):
         """Process a server response and forward it to the client after a processing time."""
+        message = response.message
+
+        # Report the server's response time, from forwarding the request to the response's arrival
+        self.lb_strategy.observe_response(message.server_ip, response.arrival_time - message.forwarded_timestamp)
+
+        # Cache the response for the requests that follow
+        if self.edge_cache is not None and message.content_key is not None:
+            self.edge_cache.put(message.content_key, self.env.now)
+
         # Simulate processing time for the load balancer to forward the response
-        processing_time = get_load_balancer_response_processing_time()
+        processing_time = self.response_processing_times.next()
         yield self.env.timeout(processing_time)
         
-        message = response['message']
-        
         # Forward the response to the client
-        client_ip = message['client_ip']
-        self.network.send(self.ip_address, client_ip, message)
+        self.network.send(self, message.client_ip, message)
@@ -1,17 +1,16 @@
 # sim/logger.py
 
 import logging
-from config import settings
 
-def setup_logger(name):
+def setup_logger(name, config):
     """Set up and return a logger."""
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG if settings.LOGGING_ENABLED else logging.CRITICAL)
+    logger.setLevel(logging.DEBUG if config.logging_enabled else logging.CRITICAL)
 
     # Create handlers
-    if settings.LOGGING_ENABLED:
+    if config.logging_enabled:
         # File handler
-        fh = logging.FileHandler(settings.LOG_FILE_PATH)
+        fh = logging.FileHandler(config.log_file_path)
         fh.setLevel(logging.DEBUG)
         
         # Console handler (optional)
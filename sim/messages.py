@@ -0,0 +1,201 @@
+# sim/messages.py
+
+
+class Message:
+    """
+    Base class of the messages exchanged over the network.
+
+    Messages use `__slots__`: an instance holds only its fields, without a
+    per-instance dict, and attribute access is cheaper than a dict lookup.
+    The message type is a class attribute, so it costs nothing per message.
+    """
+    __slots__ = ()
+    type = None
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{self.__class__.__name__}({fields})'
+
+
+class Request(Message):
+    __slots__ = ('client_id', 'client_ip', 'start_timestamp', 'service_time', 'content_key', 'through_lb',
+                 'forwarded_timestamp')
+    type = 'request'
+
+    def __init__(self, client_id, client_ip, start_timestamp, service_time=None, content_key=None):
+        """
+        A client request for a server.
+
+        Args:
+            client_id (int): Id of the requesting client.
+            client_ip (str): IP address the response is sent to.
+            start_timestamp (float): Time the request was sent.
+            service_time (float): Service time fixed by the client under common
+                random numbers, or None to let the server draw it.
+            content_key (int): Key of the requested content, the edge cache key;
+                None if the edge cache is disabled.
+        """
+        self.client_id = client_id
+        self.client_ip = client_ip
+        self.start_timestamp = start_timestamp
+        self.service_time = service_time
+        self.content_key = content_key
+        self.through_lb = False  # Set by the load balancer when it forwards the request
+        self.forwarded_timestamp = None  # Time the load balancer forwarded the request
+
+
+class Response(Message):
+    __slots__ = ('server_ip', 'client_id', 'client_ip', 'timestamp', 'forwarded_timestamp', 'content_key',
+                 'cache_hit')
+    type = 'response'
+
+    def __init__(self, server_ip, client_id, client_ip, timestamp, forwarded_timestamp=None, content_key=None,
+                 cache_hit=False):
+        """
+        A server's response to a request.
+
+        Args:
+            server_ip (str): The server that handled the request, or None if the edge cache answered it.
+            client_id (int): Id of the requesting client.
+            client_ip (str): IP address of the requesting client.
+            timestamp (float): Time the response was sent.
+            forwarded_timestamp (float): Time the load balancer forwarded the request,
+                or None if it came directly from the client.
+            content_key (int): Key of the requested content, copied from the request.
+            cache_hit (bool): Whether the load balancer's edge cache answered the request.
+        """
+        self.server_ip = server_ip
+        self.client_id = client_id
+        self.client_ip = client_ip
+        self.timestamp = timestamp
+        self.forwarded_timestamp = forwarded_timestamp
+        self.content_key = content_key
+        self.cache_hit = cache_hit
+
+
+class DnsRequest(Message):
+    __slots__ = ('domain', 'client_id', 'client_ip', 'start_timestamp')
+    type = 'dns_request'
+
+    def __init__(self, domain, client_id, client_ip, start_timestamp):
+        """A client's request to resolve a domain."""
+        self.domain = domain
+        self.client_id = client_id
+        self.client_ip = client_ip
+        self.start_timestamp = start_timestamp
+
+
+class DnsResponse(Message):
+    __slots__ = ('ips', 'ttls', 'client_id', 'timestamp')
+    type = 'dns_response'
+
+    def __init__(self, ips, ttls, client_id, timestamp):
+        """
+        The DNS server's answer to a DnsRequest.
+
+        Args:
+            ips (tuple): The addresses (A records) of the answer, in preference order.
+            ttls (tuple): Seconds each address may be cached for; math.inf for no limit.
+            client_id (int): Id of the client, or query id of the resolver, that asked.
+            timestamp (float): Time the answer was sent.
+        """
+        self.ips = ips
+        self.ttls = ttls
+        self.client_id = client_id
+        self.timestamp = timestamp
+
+
+class ServerDrop(Message):
+    __slots__ = ('reason', 'client_id', 'server_ip', 'timestamp')
+    type = 'drop_server'
+
+    def __init__(self, reason, client_id, server_ip, timestamp):
+        """
+        Notification that a request was dropped by a server or the load balancer.
+
+        Args:
+            reason (str): Why the request was dropped, e.g. 'queue full'.
+            client_id (int): Id of the client whose request was dropped.
+            server_ip (str): The server that dropped the request, or None if the load balancer did.
+            timestamp (float): Time of the drop.
+        """
+        self.reason = reason
+        self.client_id = client_id
+        self.server_ip = server_ip
+        self.timestamp = timestamp
+
+
+class DnsDrop(Message):
+    __slots__ = ('reason', 'client_id', 'timestamp')
+    type = 'drop_dns'
+
+    def __init__(self, reason, client_id, timestamp):
+        """Notification that a DNS request was dropped by the DNS server."""
+        self.reason = reason
+        self.client_id = client_id
+        self.timestamp = timestamp
+
+
+class Envelope:
+    __slots__ = ('src_entity', 'message', 'arrival_time')
+
+    def __init__(self, src_entity, message, arrival_time):
+        """
+        A received message waiting in an entity's queue.
+
+        Args:
+            src_entity: The entity that sent the message.
+            message (Message): The message.
+            arrival_time (float): Time the message was enqueued.
+        """
+        self.src_entity = src_entity
+        self.message = message
+        self.arrival_time = arrival_time
+
+
+class FreeList:
+    def __init__(self, cls, enabled=True):
+        """
+        Recycles instances of one message class.
+
+        `acquire` re-initialises a released instance instead of allocating a
+        new one. An instance may be released only once nothing refers to it
+        any more.
+
+        Args:
+            cls (type): The class whose instances are recycled.
+            enabled (bool): If False, `acquire` always allocates and `release` does nothing.
+        """
+        self.cls = cls
+        self.enabled = enabled
+        self._free = []
+
+    def acquire(self, *args):
+        """Return an instance initialised with `args`."""
+        if self._free:
+            instance = self._free.pop()
+            instance.__init__(*args)
+            return instance
+        return self.cls(*args)
+
+    def release(self, instance):
+        """Hand an instance back for reuse."""
+        if self.enabled:
+            self._free.append(instance)
+
+
+class MessagePools:
+    def __init__(self, enabled=False):
+        """
+        Free lists of every message class of a run.
+
+        Args:
+            enabled (bool): Whether released messages are recycled.
+        """
+        self.requests = FreeList(Request, enabled)
+        self.responses = FreeList(Response, enabled)
+        self.dns_requests = FreeList(DnsRequest, enabled)
+        self.dns_responses = FreeList(DnsResponse, enabled)
+        self.server_drops = FreeList(ServerDrop, enabled)
+        self.dns_drops = FreeList(DnsDrop, enabled)
+        self.envelopes = FreeList(Envelope, enabled)
@@ -1,86 +1,153 @@
 # sim/network.py
 
-import simpy
-from config import settings
+import ipaddress
+import socket
+
+import numpy as np
 from sim.logger import setup_logger  # Import the logger
+from sim.messages import MessagePools
+
+# Entity types that can exchange messages. The position of a type is its type
+# code, which indexes the transport delay matrix.
+ENTITY_TYPES = ('client', 'load_balancer', 'server', 'dns_server', 'resolver')
+
 
 class Network:
-    def __init__(self, env):
+    def __init__(self, env, context):
         self.env = env
+        self.context = context
+        self.config = context.config
         # Mapping of IP addresses to entity objects
         self.entities = {}
         # Mapping of entity objects to IP addresses
         self.ip_addresses = {}
+        # Registered entities indexed by their dense network id
+        self.entity_ids = []
+        # (network address, netmask, entity) of entities receiving the messages for a whole
+        # address range, as integers so that an address is matched without building objects
+        self.subnets = []
+
+        # Transport delays indexed by [source type code][destination type code]
+        self.type_codes = {entity_type: code for code, entity_type in enumerate(ENTITY_TYPES)}
+        self.delay_matrix = self.build_delay_matrix(self.config.transport_delays)
+        self._delays = self.delay_matrix.tolist()  # Nested lists index faster than NumPy scalars
+
+        # Free lists of message objects, shared by all entities of the run
+        self.messages = MessagePools(self.config.message_pooling)
 
         # Set up the logger
-        self.logger = setup_logger('Network')
+        self.logger = setup_logger('Network', self.config)
+
+    def build_delay_matrix(self, transport_delays):
+        """
+        Build the type-by-type transport delay matrix from the configured delays.
+
+        Args:
+            transport_delays (dict): Delays keyed by '<source type>_to_<destination type>'.
+
+        Returns:
+            numpy.ndarray: Delays indexed by type codes; NaN where no delay is configured.
+        """
+        matrix = np.full((len(ENTITY_TYPES), len(ENTITY_TYPES)), np.nan)
+        for delay_key, delay in transport_delays.items():
+            src_type, _, dest_type = delay_key.partition('_to_')
+            if src_type not in self.type_codes or dest_type not in self.type_codes:
+                raise ValueError(f"Transport delay '{delay_key}' refers to an unknown entity type.")
+            matrix[self.type_codes[src_type], self.type_codes[dest_type]] = delay
+        return matrix
 
     def register_entity(self, ip_address, entity):
-        """Register an entity with its IP address."""
+        """
+        Register an entity with its IP address.
+
+        The entity is given a dense integer `network_id` and the `type_code`
+        of its type. Every type it lists in `peer_types` must have transport
+        delays configured in both directions.
+        """
+        type_code = self.type_codes.get(entity.type)
+        if type_code is None:
+            raise ValueError(f"Unknown entity type '{entity.type}'.")
+        for peer_type in entity.peer_types:
+            peer_code = self.type_codes.get(peer_type)
+            if (peer_code is None
+                    or np.isnan(self.delay_matrix[type_code, peer_code])
+                    or np.isnan(self.delay_matrix[peer_code, type_code])):
+                raise ValueError(
+                    f"No transport delay configured between {entity.type} and {peer_type}.")
+
+        entity.network_id = len(self.entity_ids)
+        entity.type_code = type_code
+        self.entity_ids.append(entity)
         self.entities[ip_address] = entity
         self.ip_addresses[entity] = ip_address
 
+    def register_subnet(self, subnet, entity):
+        """
+        Register an entity that receives the messages sent to any address of a subnet.
+
+        Addresses registered individually take precedence over the subnet.
+
+        Args:
+            subnet (str): The subnet, e.g. '10.0.0.0/8'.
+            entity: The entity; registered like any other, with the subnet as its address.
+        """
+        network = ipaddress.ip_network(subnet)
+        if network.version != 4:
+            raise ValueError(f"Only IPv4 subnets are supported: {subnet}")
+        self.register_entity(subnet, entity)
+        self.subnets.append((int(network.network_address), int(network.netmask), entity))
+
     def unregister_entity(self, entity):
         """Unregister an entity."""
         ip_address = self.ip_addresses.pop(entity)
         self.entities.pop(ip_address)
+        self.entity_ids[entity.network_id] = None
 
     def get_entity_by_ip(self, ip_address):
         """Retrieve the entity object associated with an IP address."""
-        return self.entities.get(ip_address)
+        entity = self.entities.get(ip_address)
+        if entity is None and self.subnets:
+            address = int.from_bytes(socket.inet_aton(ip_address), 'big')
+            for network_address, netmask, subnet_entity in self.subnets:
+                if address & netmask == network_address:
+                    return subnet_entity
+        return entity
 
     def get_ip_by_entity(self, entity):
         """Retrieve the IP address associated with an entity object."""
         return self.ip_addresses.get(entity)
 
-    def send(self, src, dest, message):
-        """Simulate sending a message from src to dest."""
-        # Determine if src and dest are IP addresses or entities
-        if isinstance(src, str):
-            src_entity = self.get_entity_by_ip(src)
-            src_ip = src
-        else:
-            src_entity = src
-            src_ip = self.get_ip_by_entity(src_entity)
-
-        if isinstance(dest, str):
-            dest_entity = self.get_entity_by_ip(dest)
-            dest_ip = dest
-        else:
-            dest_entity = dest
-            dest_ip = self.get_ip_by_entity(dest_entity)
+    def send(self, src_entity, dest_ip, message):
+        """
+        Simulate sending a message from a registered entity to an IP address.
 
-        if src_entity is None or dest_entity is None:
-            raise ValueError("Source or destination not registered in the network.")
+        Args:
+            src_entity: The sending entity.
+            dest_ip (str): IP address of the destination entity.
+            message (Message): The message.
+        """
+        dest_entity = self.entities.get(dest_ip)
+        if dest_entity is None:
+            dest_entity = self.get_entity_by_ip(dest_ip)
+        if dest_entity is None:
+            raise ValueError(f"Destination {dest_ip} not registered in the network.")
 
-        # Determine transport delay based on src and dest
-        delay = self.get_transport_delay(src_entity, dest_entity)
+        delay = self._delays[src_entity.type_code][dest_entity.type_code]
 
-        # Schedule the delivery of the message
-        self.env.process(self.deliver_message(src_entity, dest_entity, message, delay))
+        # Schedule the delivery as a timeout with a callback; a process per
+        # message would cost a generator and two extra events.
+        delivery = self.env.timeout(delay, value=(src_entity, dest_entity, message, delay))
+        delivery.callbacks.append(self.deliver_message)
 
     def get_transport_delay(self, src_entity, dest_entity):
-        """Calculate transport delay based on source and destination entities."""
-        src_type = src_entity.type
-        dest_type = dest_entity.type
-
-        # Construct delay key
-        if src_type == 'client' and dest_type == 'dns_server':
-            delay_key = 'client_to_dns_server'
-        elif src_type == 'dns_server' and dest_type == 'client':
-            delay_key = 'dns_server_to_client'
-        else:
-            delay_key = f'{src_type}_to_{dest_type}'
-        
-        # Get the delay from settings
-        delay = settings.TRANSPORT_DELAYS.get(delay_key)
-        return delay
-
-    def deliver_message(self, src_entity, dest_entity, message, delay):
-        """Deliver the message to the destination entity after the delay."""
-        yield self.env.timeout(delay)
+        """Return the transport delay between two registered entities."""
+        return self._delays[src_entity.type_code][dest_entity.type_code]
+
+    def deliver_message(self, event):
+        """Deliver the message carried by a delivery timeout to its destination entity."""
+        src_entity, dest_entity, message, delay = event.value
         # Log the message delivery
-        if settings.LOGGING_ENABLED:
+        if self.config.logging_enabled:
             src_ip = self.get_ip_by_entity(src_entity)
             dest_ip = self.get_ip_by_entity(dest_entity)
             self.logger.debug(
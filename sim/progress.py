@@ -0,0 +1,179 @@
+# sim/progress.py
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+import simpy
+
+# Progress sink of a sweep worker process, set by init_worker
+_worker_sink = None
+
+
+class CountingEnvironment(simpy.Environment):
+    """A simpy.Environment that counts the events it processes, for progress reports."""
+
+    def __init__(self, initial_time=0):
+        super().__init__(initial_time)
+        self.events_processed = 0
+
+    def step(self):
+        super().step()
+        self.events_processed += 1
+
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    """
+    Progress of one simulation run.
+
+    Attributes:
+        run (str): Label of the run.
+        sim_time (float): Simulated time reached.
+        horizon (float): Simulated time the run ends at, at the latest.
+        wall_time (float): Wall-clock seconds since the run started.
+        events (int): Events processed: SimPy events, or settled requests with the fast engine.
+        requests (int): Requests completed by the clients.
+        finished (bool): Whether the run has ended.
+    """
+    run: str
+    sim_time: float
+    horizon: float
+    wall_time: float
+    events: int
+    requests: int
+    finished: bool = False
+
+    def format(self):
+        """Return the snapshot as one line of text."""
+        events_per_second = self.events / self.wall_time if self.wall_time > 0 else 0
+        state = 'done' if self.finished else f'{self.sim_time / self.horizon:.0%}'
+        return (f"[{self.run}] {state} | sim {self.sim_time:,.0f} s | wall {self.wall_time:,.1f} s | "
+                f"{events_per_second:,.0f} events/s | {self.requests:,} requests")
+
+
+def print_progress(snapshot):
+    """Progress sink printing every snapshot."""
+    print(snapshot.format(), flush=True)
+
+
+class RunProgress:
+    def __init__(self, run, horizon, sink, interval):
+        """
+        Rate-limited progress reports of one run.
+
+        `update` may be called as often as convenient; a snapshot is only
+        handed to the sink if `interval` wall-clock seconds have passed
+        since the last one, so reporting costs one clock read per call.
+
+        Args:
+            run (str): Label of the run.
+            horizon (float): Simulated time the run ends at, at the latest.
+            sink (callable): Called with each ProgressSnapshot.
+            interval (float): Minimum wall-clock seconds between snapshots.
+        """
+        self.run = run
+        self.horizon = horizon
+        self.sink = sink
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def update(self, sim_time, events, requests, finished=False):
+        """Report the run's progress if the interval has passed, or if it has finished."""
+        now = time.monotonic()
+        if finished or now - self.last_report >= self.interval:
+            self.last_report = now
+            self.sink(ProgressSnapshot(self.run, sim_time, self.horizon, now - self.started,
+                                       events, requests, finished))
+
+
+def track_progress(env, progress, stats, check_interval):
+    """
+    Process checking every `check_interval` simulated seconds whether progress is due.
+
+    Args:
+        env (CountingEnvironment): The simulation environment.
+        progress (RunProgress): The run's progress reports.
+        stats (Statistics): The run's statistics.
+        check_interval (float): Simulated seconds between checks of the wall clock.
+    """
+    while True:
+        yield env.timeout(check_interval)
+        progress.update(env.now, env.events_processed, stats.total_requests_processed)
+
+
+def init_worker(progress_queue):
+    """ProcessPoolExecutor initializer sending the worker's progress snapshots to a queue."""
+    global _worker_sink
+    _worker_sink = progress_queue.put
+
+
+def get_worker_sink():
+    """Return the progress sink of this sweep worker, or None if progress is not reported."""
+    return _worker_sink
+
+
+class ProgressAggregator:
+    def __init__(self, progress_queue, total_runs, interval):
+        """
+        Combine the progress snapshots of parallel sweep workers into one report line.
+
+        A thread takes snapshots off `progress_queue` and prints, at most every
+        `interval` wall-clock seconds, the runs finished and running, the
+        simulated time and requests summed over the runs, and the combined
+        event rate.
+
+        Args:
+            progress_queue: multiprocessing queue the workers put ProgressSnapshots on.
+            total_runs (int): Number of runs in the sweep.
+            interval (float): Minimum wall-clock seconds between reports.
+        """
+        self.progress_queue = progress_queue
+        self.total_runs = total_runs
+        self.interval = interval
+        self.latest = {}  # Last snapshot of each run
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._collect, daemon=True)
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+        # Snapshots still in transit when the last run finished
+        while True:
+            try:
+                snapshot = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.latest[snapshot.run] = snapshot
+        self.report()
+
+    def _collect(self):
+        last_report = time.monotonic()
+        while not self._stopped.is_set():
+            try:
+                snapshot = self.progress_queue.get(timeout=self.interval)
+                self.latest[snapshot.run] = snapshot
+            except queue.Empty:
+                pass
+            if time.monotonic() - last_report >= self.interval:
+                last_report = time.monotonic()
+                self.report()
+
+    def report(self):
+        """Print the combined progress of the sweep."""
+        snapshots = list(self.latest.values())
+        finished = sum(snapshot.finished for snapshot in snapshots)
+        wall_time = time.monotonic() - self.started
+        events = sum(snapshot.events for snapshot in snapshots)
+        events_per_second = events / wall_time if wall_time > 0 else 0
+        print(f"[sweep] {finished}/{self.total_runs} runs done, {len(snapshots) - finished} running | "
+              f"sim {sum(snapshot.sim_time for snapshot in snapshots):,.0f} s | wall {wall_time:,.1f} s | "
+              f"{events_per_second:,.0f} events/s | "
+              f"{sum(snapshot.requests for snapshot in snapshots):,} requests", flush=True)
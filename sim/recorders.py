@@ -0,0 +1,68 @@
+# sim/recorders.py
+
+import numpy as np
+
+
+class SeriesRecorder:
+    def __init__(self, value_dtype=np.float64, initial_capacity=1024):
+        """
+        Growable columnar buffer for a (time, value) time series.
+
+        Times are stored as float64 and values with `value_dtype`, in two
+        NumPy arrays whose capacity doubles when full. A sample costs 12-16
+        bytes instead of a Python tuple per sample.
+
+        Args:
+            value_dtype: NumPy dtype of the values, e.g. np.int32 for queue sizes.
+            initial_capacity (int): Number of samples allocated up front.
+        """
+        self._times = np.empty(initial_capacity, dtype=np.float64)
+        self._values = np.empty(initial_capacity, dtype=value_dtype)
+        self._size = 0
+
+    def append(self, time, value):
+        """Record a sample."""
+        if self._size == len(self._times):
+            self._grow()
+        self._times[self._size] = time
+        self._values[self._size] = value
+        self._size += 1
+
+    def extend(self, times, values):
+        """Record many samples at once from two arrays of equal length."""
+        while self._size + len(times) > len(self._times):
+            self._grow()
+        self._times[self._size:self._size + len(times)] = times
+        self._values[self._size:self._size + len(values)] = values
+        self._size += len(times)
+
+    def _grow(self):
+        capacity = 2 * len(self._times)
+        times = np.empty(capacity, dtype=self._times.dtype)
+        values = np.empty(capacity, dtype=self._values.dtype)
+        times[:self._size] = self._times[:self._size]
+        values[:self._size] = self._values[:self._size]
+        self._times = times
+        self._values = values
+
+    @property
+    def times(self):
+        """Zero-copy view of the recorded sample times."""
+        return self._times[:self._size]
+
+    @property
+    def values(self):
+        """Zero-copy view of the recorded sample values."""
+        return self._values[:self._size]
+
+    @property
+    def nbytes(self):
+        """Memory allocated by the buffers, in bytes."""
+        return self._times.nbytes + self._values.nbytes
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        """Iterate over (time, value) tuples, like the list of tuples it replaces."""
+        return zip(self.times.tolist(), self.values.tolist())
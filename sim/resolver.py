@@ -0,0 +1,150 @@
+# sim/resolver.py
+
+import simpy
+from sim.utils import resolver_service_time_sampler
+from sim.variates import VariatePool
+from sim.streams import get_address_key
+
+
+def get_client_dns_ip(config, client_id):
+    """
+    Return the address a client sends its DNS requests to.
+
+    Client n uses resolver (n - 1) mod the number of resolvers, or the DNS
+    server itself if there are no resolvers.
+
+    Args:
+        config (SimulationConfig): The configuration of the run.
+        client_id (int): The client's id, starting at 1.
+
+    Returns:
+        str: The IP address of the client's resolver or of the DNS server.
+    """
+    resolver_ips = config.resolver_ips
+    if not resolver_ips:
+        return config.dns_server_ip
+    return resolver_ips[(client_id - 1) % len(resolver_ips)]
+
+
+class Resolver:
+    def __init__(self, env, network, ip_address, context):
+        """
+        Initialize a recursive Resolver instance.
+
+        The resolver sits between a share of the clients and the DNS server.
+        It answers a DNS request from its cache while the cached answer is
+        younger than `resolver_cache_ttl` and than the shortest TTL of its
+        addresses, and otherwise asks the DNS server. Cached answers are
+        passed on with their TTLs reduced by their age.
+        Requests for a name that is already being asked for wait for that
+        answer instead of sending another query (coalescing). All the clients
+        behind a resolver thus share one answer per TTL, which under DNS load
+        balancing sends them all to the same server.
+
+        Args:
+            env (simpy.Environment): The simulation environment.
+            network (Network): The network instance.
+            ip_address (str): The resolver's IP address.
+            context (SimulationContext): The run's configuration and statistics.
+        """
+        self.env = env
+        self.network = network
+        self.ip_address = ip_address
+        self.config = context.config
+        self.stats = context.stats
+        self.messages = network.messages
+        self.type = 'resolver'
+        self.peer_types = ('client', 'dns_server')  # Types this entity exchanges messages with
+        self.network.register_entity(self.ip_address, self)
+
+        # Initialize the request queue with capacity B
+        self.queue = simpy.Store(env, capacity=self.config.resolver_buffer_size)
+
+        # Pre-sampled service times
+        self.service_times = VariatePool(
+            resolver_service_time_sampler(
+                self.config, context.streams.get_generator('resolver_service', get_address_key(ip_address))),
+            self.config.variate_block_size)
+
+        self.cache = {}  # Domain -> (resolved IPs, their TTLs, time received, time the answer expires)
+        self.waiting_clients = {}  # Domain -> [(client id, client IP)] waiting for the DNS server's answer
+        self.pending_queries = {}  # Query id -> domain of the queries sent to the DNS server
+        self.next_query_id = 1
+
+        # Start the resolver process
+        self.env.process(self.run())
+
+    def run(self):
+        """Process incoming DNS requests."""
+        while True:
+            # Wait for the next DNS request
+            request = yield self.queue.get()
+
+            # Process the request
+            yield self.env.process(self.process_request(request))
+            self.messages.dns_requests.release(request.message)
+            self.messages.envelopes.release(request)
+
+    def receive_message(self, src_entity, message):
+        """Handle incoming messages."""
+        message_type = message.type
+        if message_type == 'dns_request':
+            # Check if there's space in the queue
+            if len(self.queue.items) < self.queue.capacity:
+                # Enqueue the request
+                self.queue.put(self.messages.envelopes.acquire(src_entity, message, self.env.now))
+            else:
+                # Queue is full; drop the request
+                self.stats.increment_resolver_dropped_requests(self.env.now)
+                self.network.send(self, message.client_ip, self.messages.dns_drops.acquire(
+                    'queue full', message.client_id, self.env.now))
+                self.messages.dns_requests.release(message)
+        elif message_type == 'dns_response':
+            domain = self.pending_queries.pop(message.client_id)
+            now = self.env.now
+            self.cache[domain] = (message.ips, message.ttls, now,
+                                  now + min(self.config.resolver_cache_ttl, min(message.ttls)))
+            for client_id, client_ip in self.waiting_clients.pop(domain):
+                self.network.send(self, client_ip, self.messages.dns_responses.acquire(
+                    message.ips, message.ttls, client_id, now))
+            self.messages.dns_responses.release(message)
+        elif message_type == 'drop_dns':
+            # The DNS server dropped the query; every client waiting for it learns of the drop
+            domain = self.pending_queries.pop(message.client_id)
+            for client_id, client_ip in self.waiting_clients.pop(domain):
+                self.network.send(self, client_ip, self.messages.dns_drops.acquire(
+                    message.reason, client_id, self.env.now))
+            self.messages.dns_drops.release(message)
+        else:
+            pass
+
+    def process_request(self, request):
+        """Answer a DNS request from the cache, or wait for the DNS server's answer, after a service time."""
+        # Simulate service time
+        service_time = self.service_times.next()
+        yield self.env.timeout(service_time)
+
+        message = request.message
+        domain = message.domain
+        cached = self.cache.get(domain)
+        if cached is not None and self.env.now < cached[3]:
+            self.stats.record_resolver_lookup('hit')
+            ips, ttls, received, _ = cached
+            age = self.env.now - received
+            self.network.send(self, message.client_ip, self.messages.dns_responses.acquire(
+                ips, tuple(ttl - age for ttl in ttls), message.client_id, self.env.now))
+            return
+
+        if domain in self.waiting_clients:
+            # A query for the domain is already on its way; share its answer
+            self.stats.record_resolver_lookup('coalesced')
+            self.waiting_clients[domain].append((message.client_id, message.client_ip))
+            return
+
+        self.stats.record_resolver_lookup('miss')
+        self.waiting_clients[domain] = [(message.client_id, message.client_ip)]
+        query_id = self.next_query_id
+        self.next_query_id += 1
+        self.pending_queries[query_id] = domain
+        self.network.send(self, self.config.dns_server_ip, self.messages.dns_requests.acquire(
+            domain, query_id, self.ip_address, self.env.now))
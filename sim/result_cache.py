@@ -0,0 +1,102 @@
+# sim/result_cache.py
+
+import dataclasses
+import functools
+import glob
+import hashlib
+import json
+import os
+
+# Root of the repository, used to find the source files that make up the code version
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@functools.lru_cache(maxsize=None)
+def get_code_version():
+    """
+    Hash the simulator's source code.
+
+    Any edit to `main.py` or a module under `sim/` changes the version and
+    therefore invalidates every cached result.
+
+    Returns:
+        str: Hex digest of the source files.
+    """
+    paths = [os.path.join(REPO_ROOT, 'main.py')]
+    paths += glob.glob(os.path.join(REPO_ROOT, 'sim', '**', '*.py'), recursive=True)
+
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, REPO_ROOT).encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def get_result_key(config):
+    """
+    Compute the content address of a run.
+
+    Args:
+        config (SimulationConfig): The full effective configuration of the run, seed included.
+
+    Returns:
+        str: Hex digest identifying the run.
+    """
+    payload = {
+        'config': dataclasses.asdict(config),
+        'code_version': get_code_version(),
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory):
+        """
+        Initialize an on-disk store of simulation results.
+
+        Every result lives in its own JSON file named after its key, so a sweep
+        that crashes part-way keeps everything it finished.
+
+        Args:
+            directory (str): Directory the results are stored in.
+        """
+        self.directory = directory
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def get(self, config):
+        """
+        Look up the result of a run.
+
+        Args:
+            config (SimulationConfig): The configuration of the run.
+
+        Returns:
+            tuple: The stored result, or None if the run has not been computed.
+        """
+        path = self._get_path(get_result_key(config))
+        try:
+            with open(path) as f:
+                return tuple(json.load(f)['result'])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, config, result):
+        """
+        Store the result of a run.
+
+        Args:
+            config (SimulationConfig): The configuration of the run.
+            result (tuple): The values returned by the run.
+        """
+        path = self._get_path(get_result_key(config))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so a crash never leaves a partial entry
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'config': dataclasses.asdict(config), 'result': list(result)}, f)
+        os.replace(tmp_path, path)
@@ -1,12 +1,12 @@
 # sim/server.py
 
 import simpy
-from config import settings
-from sim.utils import get_server_service_time
-from sim.statistics import Statistics
+from sim.utils import server_service_time_sampler
+from sim.variates import VariatePool
+from sim.streams import get_address_key
 
 class Server:
-    def __init__(self, env, network, ip_address):
+    def __init__(self, env, network, ip_address, context):
         """
         Initialize a Server instance.
 
@@ -14,97 +14,133 @@ class Server:
             env (simpy.Environment): The simulation environment.
             network (Network): The network instance.
             ip_address (str): The server's IP address.
+            context (SimulationContext): The run's configuration and statistics.
         """
         self.env = env
         self.network = network
         self.ip_address = ip_address
+        self.config = context.config
+        self.stats = context.stats
+        self.messages = network.messages
         self.type = 'server'
+        self.peer_types = ('load_balancer', 'client')  # Types this entity exchanges messages with
         self.network.register_entity(self.ip_address, self)
         
         # Initialize the request queue with capacity B
-        self.queue = simpy.Store(env, capacity=settings.SERVER_BUFFER_SIZE)
+        self.queue = simpy.Store(env, capacity=self.config.server_buffer_size)
+
+        # Relative speed; the drawn service times are divided by it
+        self.speed_factor = self.config.server_speed_factors.get(ip_address, 1)
+
+        # Pre-sampled service times
+        self.service_times = VariatePool(
+            server_service_time_sampler(
+                self.config, context.streams.get_generator('server_service', get_address_key(ip_address))),
+            self.config.variate_block_size)
         
-        # Start the server process
-        self.env.process(self.run())
+        # Start one process per worker; the workers share the queue
+        self.workers = self.config.server_worker_counts.get(ip_address, self.config.server_workers)
+        if self.workers < 1:
+            raise ValueError(f"Server {ip_address} needs at least one worker.")
+        for _ in range(self.workers):
+            self.env.process(self.run())
 
         self.busy_time = 0;
         self.start_time = self.env.now
+
+        self.received_requests = 0  # Requests routed to the server, including dropped ones
+
+        # Requests queued or in service, and the callbacks told whenever the count changes
+        self.connections = 0
+        self.connection_listeners = []
     
     def run(self):
-        """Process incoming requests."""
+        """Process incoming requests; run by every worker."""
         while True:
             # Wait for the next request
             request = yield self.queue.get()
 
             # record the queue size.
-            Statistics.record_server_queue_size(self.ip_address, self.env.now, len(self.queue.items))
+            self.stats.record_server_queue_size(self.ip_address, self.env.now, len(self.queue.items))
 
             # Process the request
             yield self.env.process(self.process_request(request))
+            self.messages.envelopes.release(request)
+            self.set_connections(self.connections - 1)
 
 
     def receive_message(self, src_entity, message):
         """Handle incoming messages."""
-        if message['type'] == 'request':
+        if message.type == 'request':
+            self.received_requests += 1
             # Check if there's space in the queue
             if len(self.queue.items) < self.queue.capacity:
                 # Enqueue the request
-                self.queue.put({
-                    'src_entity': src_entity,
-                    'message': message,
-                    'arrival_time': self.env.now
-                })
+                self.queue.put(self.messages.envelopes.acquire(src_entity, message, self.env.now))
+                self.set_connections(self.connections + 1)
             else:
                 # Queue is full; drop the request
-                self.network.send(self.ip_address, message['client_ip'], {
-                    'type': 'drop_server',
-                    'data': 'queue full',
-                    'server_ip': self.ip_address,
-                    'client_id': message['client_id'],
-                    'timestamp': self.env.now
-                })
+                self.network.send(self, message.client_ip, self.messages.server_drops.acquire(
+                    'queue full', message.client_id, self.ip_address, self.env.now))
                 # Optionally, send an error message back to the sender
-                Statistics.increment_server_dropped_requests(self.ip_address, self.env.now)
+                self.stats.increment_server_dropped_requests(self.ip_address, self.env.now)
             
-            Statistics.record_server_queue_size(self.ip_address, self.env.now, len(self.queue.items))
+            self.stats.record_server_queue_size(self.ip_address, self.env.now, len(self.queue.items))
         else:
             pass
     def process_request(self, request):
         """Process a client request and send a response after a processing time."""
-        # Simulate processing time
-        service_time = get_server_service_time()
+        message = request.message
+
+        # Simulate processing time (drawn by the client under common random numbers)
+        service_time = message.service_time
+        if service_time is None:
+            service_time = self.service_times.next()
+        if self.speed_factor != 1:
+            service_time = service_time / self.speed_factor
         yield self.env.timeout(service_time)
         
-        src_entity = request['src_entity']
-        message = request['message']
-        
         self.busy_time += service_time
 
         # Create response message
-        response_message = {
-            'type': 'response',
-            'data': 'response data',
-            'server_ip': self.ip_address,
-            'client_id': message['client_id'],
-            'client_ip': message['client_ip'],
-            'timestamp': self.env.now
-        }
+        client_ip = message.client_ip
+        response_message = self.messages.responses.acquire(
+            self.ip_address, message.client_id, client_ip, self.env.now, message.forwarded_timestamp,
+            message.content_key)
         
         # Determine where to send the response
-        client_ip = message.get('client_ip')
-        via_load_balancer = message.get('through_lb', False)
-        
-        if via_load_balancer:
+        if message.through_lb:
             # Send response back through the load balancer
-            self.network.send(self.ip_address, settings.LOAD_BALANCER_IP, response_message)
+            self.network.send(self, self.config.load_balancer_ip, response_message)
         else:
             # Send response directly to the client
-            self.network.send(self.ip_address, client_ip, response_message)
+            self.network.send(self, client_ip, response_message)
 
     def get_utilization(self):
+        """Return the percentage of the workers' time spent serving requests."""
         total_time = self.env.now
-        utilization = (self.busy_time / (total_time - self.start_time) * 100 if total_time > 0 else 0)
+        utilization = (self.busy_time / ((total_time - self.start_time) * self.workers) * 100 if total_time > 0 else 0)
         return utilization
 
     def get_connections(self):
-        return len(self.queue.items)
\ No newline at end of file
+        """Return the number of requests queued at or being served by the server."""
+        return self.connections
+
+    def set_connections(self, connections):
+        """Update the connection count and notify the listeners."""
+        self.connections = connections
+        for listener in self.connection_listeners:
+            listener(self.ip_address, connections)
+
+    def add_connection_listener(self, listener):
+        """
+        Call `listener(server_ip, connections)` whenever the connection count changes.
+
+        Args:
+            listener (callable): The callback.
+        """
+        self.connection_listeners.append(listener)
+
+    def remove_connection_listener(self, listener):
+        """Stop notifying a listener added with `add_connection_listener`."""
+        self.connection_listeners.remove(listener)
\ No newline at end of file
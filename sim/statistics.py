@@ -1,193 +1,391 @@
 # sim/statistics.py
 
-import csv
 import os
-from config import settings
 import matplotlib.pyplot as plt
 import numpy as np 
+from sim.aggregators import RunningStats, TimeWeightedAverage, P2Quantile, RequestBatchMeans, WarmupDetector
+from sim.recorders import SeriesRecorder
 
 class Statistics:
-    # Class attributes for storing metrics
-    server_queue_sizes = {}          # {server_ip: [(time, queue_size), ...]}
-    server_dropped_requests = {}     # {server_ip: [dropped_count]}
-    server_dropped_requests_time = {}     # {server_ip: [dropped_count]}
-    
-    load_balancer_req_queue_sizes = []   # [(time, queue_size)]
-    load_balancer_req_dropped_requests = 0
-    load_balancer_req_dropped_requests_time = []
-
-    load_balancer_res_queue_sizes = []   # [(time, queue_size)]
-    load_balancer_res_dropped_requests = 0
-    load_balancer_res_dropped_requests_time = 0
-
-    dns_queue_sizes = []             # [(time, queue_size)]
-    dns_dropped_requests = 0
-    dns_dropped_requests_time = []
-
-    
-    client_latencies = []            # [(start_time, latency), ...]
-    
-    total_requests_processed = 0
-    total_requests_processed_time = []
-
-    client_present = 0
-    client_present_time = []
-
-    @classmethod
-    def clear_stats(cls):
-        cls.server_queue_sizes = {}          # {server_ip: [(time, queue_size), ...]}
-        cls.server_dropped_requests = {}     # {server_ip: [dropped_count]}
-        cls.server_dropped_requests_time = {}     # {server_ip: [dropped_count]}
+    # Quantiles of the client latency tracked by the streaming estimators
+    LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, config):
+        """
+        Initialize a per-run Statistics instance.
+
+        Summary metrics are always kept in constant-memory aggregators. The raw
+        time series are only recorded when `config.statistics_mode` is 'full'.
+
+        Args:
+            config (SimulationConfig): The configuration of the run being measured.
+        """
+        self.config = config
+        self.record_series = config.statistics_mode == 'full'
+        self.clear_stats()
+
+    def clear_stats(self):
+        self.server_queue_sizes = {}          # {server_ip: SeriesRecorder(time, queue_size)}
+        self.server_dropped_requests = {}     # {server_ip: dropped_count}
+        self.server_dropped_requests_time = {}     # {server_ip: SeriesRecorder(time, dropped_count)}
         
-        cls.load_balancer_req_queue_sizes = []   # [(time, queue_size)]
-        cls.load_balancer_req_dropped_requests = 0
-        cls.load_balancer_req_dropped_requests_time = []
-
-        cls.load_balancer_res_queue_sizes = []   # [(time, queue_size)]
-        cls.load_balancer_res_dropped_requests = 0
-        cls.load_balancer_res_dropped_requests_time = 0
-
-        cls.dns_queue_sizes = []             # [(time, queue_size)]
-        cls.dns_dropped_requests = 0
-        cls.dns_dropped_requests_time = []
+        self.load_balancer_req_queue_sizes = SeriesRecorder(np.int32)   # (time, queue_size)
+        self.load_balancer_req_dropped_requests = 0
+        self.load_balancer_req_dropped_requests_time = SeriesRecorder(np.int64)
+
+        self.load_balancer_res_queue_sizes = SeriesRecorder(np.int32)   # (time, queue_size)
+        self.load_balancer_res_dropped_requests = 0
+        self.load_balancer_res_dropped_requests_time = SeriesRecorder(np.int64)
+
+        self.dns_queue_sizes = SeriesRecorder(np.int32)             # (time, queue_size)
+        self.dns_dropped_requests = 0
+        self.dns_dropped_requests_time = SeriesRecorder(np.int64)
+        self.dns_requests = 0  # DNS requests that reached the DNS server, including dropped ones
+        self.dns_requests_time = SeriesRecorder(np.int64)
+        self.dns_shortened_ttls = 0  # Server addresses answered with a TTL shortened for overload
+        self.dns_failovers = 0  # Requests retried at the next address of a DNS answer after a drop
+        self.dns_failovers_time = SeriesRecorder(np.int64)
+
+        # Resolver lookups: answered from the cache, sent on to the DNS server, or joined a query on its way
+        self.resolver_lookups = {'hit': 0, 'miss': 0, 'coalesced': 0}
+        self.resolver_dropped_requests = 0
+        self.resolver_dropped_requests_time = SeriesRecorder(np.int64)
 
         
-        cls.client_latencies = []            # [(start_time, latency), ...]
+        self.client_latencies = SeriesRecorder(np.float64)            # (start_time, latency)
         
-        cls.total_requests_processed = 0
-        cls.total_requests_processed_time = []
-
-        cls.client_present = 0
-        cls.client_present_time = []
-
-    @classmethod
-    def record_server_queue_size(cls, server_ip, time, queue_size):
-        if server_ip not in cls.server_queue_sizes:
-            cls.server_queue_sizes[server_ip] = []
-        cls.server_queue_sizes[server_ip].append((time, queue_size))
+        self.total_requests_processed = 0
+        self.total_requests_processed_time = SeriesRecorder(np.int64)
+
+        self.client_present = 0
+        self.client_present_time = SeriesRecorder(np.int32)
+
+        # Constant-memory aggregates backing the summary getters
+        self.server_queue_stats = {}          # {server_ip: RunningStats}
+        self.server_queue_time_averages = {}  # {server_ip: TimeWeightedAverage}
+        self.load_balancer_req_queue_stats = RunningStats()
+        self.load_balancer_req_queue_time_average = TimeWeightedAverage()
+        self.load_balancer_res_queue_stats = RunningStats()
+        self.load_balancer_res_queue_time_average = TimeWeightedAverage()
+        self.dns_queue_stats = RunningStats()
+        self.dns_queue_time_average = TimeWeightedAverage()
+        self.client_latency_stats = RunningStats()
+        self.client_latency_quantiles = [P2Quantile(p) for p in self.LATENCY_QUANTILES]
+        self.request_batches = RequestBatchMeans(self.config.stopping_batch_count)
+        self.client_latency_warmup = self._new_warmup_detector()
+        self.server_queue_warmups = {}        # {server_ip: WarmupDetector}
+
+        # Pool changes under a hashing strategy: (time, number of servers, fraction of keys remapped)
+        self.key_remaps = []
+
+        # Edge cache lookups at the load balancer, and the client latency of hits and misses
+        self.edge_cache_hits = 0
+        self.edge_cache_misses = 0
+        self.edge_cache_hit_latency_stats = RunningStats()
+        self.edge_cache_miss_latency_stats = RunningStats()
+
+    def _new_warmup_detector(self):
+        return WarmupDetector(self.config.mser_batch_size, self.config.mser_max_batches)
+
+    def record_server_queue_size(self, server_ip, time, queue_size):
+        if server_ip not in self.server_queue_stats:
+            self.server_queue_stats[server_ip] = RunningStats()
+            self.server_queue_time_averages[server_ip] = TimeWeightedAverage()
+            self.server_queue_warmups[server_ip] = self._new_warmup_detector()
+        self.server_queue_stats[server_ip].update(queue_size)
+        self.server_queue_time_averages[server_ip].update(time, queue_size)
+        self.server_queue_warmups[server_ip].update(time, queue_size)
+        if self.record_series:
+            if server_ip not in self.server_queue_sizes:
+                self.server_queue_sizes[server_ip] = SeriesRecorder(np.int32)
+            self.server_queue_sizes[server_ip].append(time, queue_size)
     
-    @classmethod
-    def increment_server_dropped_requests(cls, server_ip, time):
-        cls.server_dropped_requests[server_ip] = cls.server_dropped_requests.get(server_ip, 0) + 1
-        if(server_ip not in cls.server_dropped_requests_time):
-            cls.server_dropped_requests_time[server_ip] = list()
-        cls.server_dropped_requests_time.get(server_ip).append([time, cls.server_dropped_requests[server_ip]])
+    def increment_server_dropped_requests(self, server_ip, time):
+        self.server_dropped_requests[server_ip] = self.server_dropped_requests.get(server_ip, 0) + 1
+        self.request_batches.add_drop()
+        if self.record_series:
+            if(server_ip not in self.server_dropped_requests_time):
+                self.server_dropped_requests_time[server_ip] = SeriesRecorder(np.int64)
+            self.server_dropped_requests_time[server_ip].append(time, self.server_dropped_requests[server_ip])
     
-    @classmethod
-    def record_load_balancer_req_queue_size(cls, time, queue_size):
-        cls.load_balancer_req_queue_sizes.append((time, queue_size))
-
-    @classmethod
-    def increment_load_balancer_req_dropped_requests(cls, time):
-        cls.load_balancer_req_dropped_requests += 1
-        cls.load_balancer_req_dropped_requests_time.append([time, cls.load_balancer_req_dropped_requests])
-
-    @classmethod
-    def record_load_balancer_res_queue_size(cls, time, queue_size):
-        cls.load_balancer_res_queue_sizes.append((time, queue_size))
+    def record_load_balancer_req_queue_size(self, time, queue_size):
+        self.load_balancer_req_queue_stats.update(queue_size)
+        self.load_balancer_req_queue_time_average.update(time, queue_size)
+        if self.record_series:
+            self.load_balancer_req_queue_sizes.append(time, queue_size)
+
+    def increment_load_balancer_req_dropped_requests(self, time):
+        self.load_balancer_req_dropped_requests += 1
+        self.request_batches.add_drop()
+        if self.record_series:
+            self.load_balancer_req_dropped_requests_time.append(time, self.load_balancer_req_dropped_requests)
+
+    def record_load_balancer_res_queue_size(self, time, queue_size):
+        self.load_balancer_res_queue_stats.update(queue_size)
+        self.load_balancer_res_queue_time_average.update(time, queue_size)
+        if self.record_series:
+            self.load_balancer_res_queue_sizes.append(time, queue_size)
     
-    @classmethod
-    def increment_load_balancer_res_dropped_requests(cls, time):
-        cls.load_balancer_res_dropped_requests += 1
-        cls.load_balancer_res_dropped_requests_time.append([time, cls.load_balancer_res_dropped_requests])
-
-    @classmethod
-    def record_dns_queue_size(cls, time, queue_size):
-        cls.dns_queue_sizes.append((time, queue_size))
+    def increment_load_balancer_res_dropped_requests(self, time):
+        self.load_balancer_res_dropped_requests += 1
+        self.request_batches.add_drop()
+        if self.record_series:
+            self.load_balancer_res_dropped_requests_time.append(time, self.load_balancer_res_dropped_requests)
+
+    def record_dns_queue_size(self, time, queue_size):
+        self.dns_queue_stats.update(queue_size)
+        self.dns_queue_time_average.update(time, queue_size)
+        if self.record_series:
+            self.dns_queue_sizes.append(time, queue_size)
     
-    @classmethod
-    def increment_dns_dropped_requests(cls, time):
-        cls.dns_dropped_requests += 1
-        cls.dns_dropped_requests_time.append([time, cls.dns_dropped_requests])
+    def increment_dns_dropped_requests(self, time):
+        self.dns_dropped_requests += 1
+        self.request_batches.add_drop()
+        if self.record_series:
+            self.dns_dropped_requests_time.append(time, self.dns_dropped_requests)
     
-    @classmethod
-    def record_client_latency(cls, time, latency):
-        cls.client_latencies.append((time, latency))
+    def increment_dns_requests(self, time):
+        self.dns_requests += 1
+        if self.record_series:
+            self.dns_requests_time.append(time, self.dns_requests)
+
+    def increment_dns_shortened_ttls(self):
+        self.dns_shortened_ttls += 1
+
+    def increment_dns_failovers(self, time):
+        self.dns_failovers += 1
+        if self.record_series:
+            self.dns_failovers_time.append(time, self.dns_failovers)
+
+    def record_resolver_lookup(self, outcome):
+        """Count a resolver lookup by outcome: 'hit', 'miss' or 'coalesced'."""
+        self.resolver_lookups[outcome] += 1
+
+    def increment_resolver_dropped_requests(self, time):
+        self.resolver_dropped_requests += 1
+        self.request_batches.add_drop()
+        if self.record_series:
+            self.resolver_dropped_requests_time.append(time, self.resolver_dropped_requests)
+
+    def record_client_latency(self, time, latency):
+        self.client_latency_stats.update(latency)
+        self.request_batches.add_completion(latency)
+        self.client_latency_warmup.update(time, latency)
+        for estimator in self.client_latency_quantiles:
+            estimator.update(latency)
+        if self.record_series:
+            self.client_latencies.append(time, latency)
 
     
-    @classmethod
-    def increment_total_requests_processed(cls, time):
-        cls.total_requests_processed += 1
-        cls.total_requests_processed_time.append([time, cls.total_requests_processed])
+    def record_key_remap(self, time, server_count, fraction):
+        """Record the fraction of client keys a hashing strategy moved to another server after a pool change."""
+        self.key_remaps.append((time, server_count, fraction))
+
+    def record_edge_cache_lookup(self, hit):
+        """Count a lookup of the load balancer's edge cache."""
+        if hit:
+            self.edge_cache_hits += 1
+        else:
+            self.edge_cache_misses += 1
+
+    def record_edge_cache_latency(self, hit, latency):
+        """Record the client latency of a request answered by the edge cache (hit) or a server (miss)."""
+        if hit:
+            self.edge_cache_hit_latency_stats.update(latency)
+        else:
+            self.edge_cache_miss_latency_stats.update(latency)
+
+    def increment_total_requests_processed(self, time):
+        self.total_requests_processed += 1
+        if self.record_series:
+            self.total_requests_processed_time.append(time, self.total_requests_processed)
     
-    @classmethod
-    def increment_client_present(cls, time):
-        cls.client_present += 1
-        cls.client_present_time.append([time, cls.client_present])
+    def increment_client_present(self, time):
+        self.client_present += 1
+        if self.record_series:
+            self.client_present_time.append(time, self.client_present)
     
-    @classmethod
-    def decrement_client_present(cls, time):
-        cls.client_present -= 1
-        cls.client_present_time.append([time, cls.client_present])
-
-    @classmethod
-    def save_statistics(cls):
-        """Save collected statistics to CSV files."""
+    def decrement_client_present(self, time):
+        self.client_present -= 1
+        if self.record_series:
+            self.client_present_time.append(time, self.client_present)
+
+    # Bulk recording, for engines that produce whole arrays of observations at once.
+    # Drops recorded in bulk are not added to `request_batches`; report every request
+    # outcome, completed or dropped, in order with `record_request_outcomes`.
+
+    def record_server_queue_sizes(self, server_ip, times, queue_sizes):
+        """Bulk version of `record_server_queue_size` for time-ordered arrays."""
+        if len(times) == 0:
+            return
+        if server_ip not in self.server_queue_stats:
+            self.server_queue_stats[server_ip] = RunningStats()
+            self.server_queue_time_averages[server_ip] = TimeWeightedAverage()
+            self.server_queue_warmups[server_ip] = self._new_warmup_detector()
+        self.server_queue_stats[server_ip].update_many(queue_sizes)
+        self.server_queue_time_averages[server_ip].update_many(times, queue_sizes)
+        self.server_queue_warmups[server_ip].update_many(times, queue_sizes)
+        if self.record_series:
+            if server_ip not in self.server_queue_sizes:
+                self.server_queue_sizes[server_ip] = SeriesRecorder(np.int32)
+            self.server_queue_sizes[server_ip].extend(times, queue_sizes)
+
+    def add_server_dropped_requests(self, server_ip, times):
+        """Bulk version of `increment_server_dropped_requests`."""
+        if len(times) == 0:
+            return
+        previous = self.server_dropped_requests.get(server_ip, 0)
+        self.server_dropped_requests[server_ip] = previous + len(times)
+        if self.record_series:
+            if server_ip not in self.server_dropped_requests_time:
+                self.server_dropped_requests_time[server_ip] = SeriesRecorder(np.int64)
+            self.server_dropped_requests_time[server_ip].extend(times, previous + np.arange(1, len(times) + 1))
+
+    def add_load_balancer_req_dropped_requests(self, times):
+        """Bulk version of `increment_load_balancer_req_dropped_requests`."""
+        previous = self.load_balancer_req_dropped_requests
+        self.load_balancer_req_dropped_requests += len(times)
+        if self.record_series:
+            self.load_balancer_req_dropped_requests_time.extend(times, previous + np.arange(1, len(times) + 1))
+
+    def add_load_balancer_res_dropped_requests(self, times):
+        """Bulk version of `increment_load_balancer_res_dropped_requests`."""
+        previous = self.load_balancer_res_dropped_requests
+        self.load_balancer_res_dropped_requests += len(times)
+        if self.record_series:
+            self.load_balancer_res_dropped_requests_time.extend(times, previous + np.arange(1, len(times) + 1))
+
+    def record_request_outcomes(self, times, start_times, latencies):
+        """
+        Record time-ordered request outcomes: completions and drops.
+
+        Completed requests are recorded like `record_client_latency` and
+        `increment_total_requests_processed`; every outcome is added to
+        `request_batches`. The streaming latency quantiles are not updated.
+
+        Args:
+            times (numpy.ndarray): Time of each outcome (response received or request dropped).
+            start_times (numpy.ndarray): Time each request was started by its client.
+            latencies (numpy.ndarray): Latency of each request, NaN if it was dropped.
+        """
+        dropped = np.isnan(latencies)
+        self.request_batches.add_outcomes(latencies, dropped)
+        completed = ~dropped
+        start_times = start_times[completed]
+        latencies = latencies[completed]
+        self.client_latency_stats.update_many(latencies)
+        self.client_latency_warmup.update_many(start_times, latencies)
+        previous = self.total_requests_processed
+        self.total_requests_processed += len(latencies)
+        if self.record_series:
+            self.client_latencies.extend(start_times, latencies)
+            self.total_requests_processed_time.extend(
+                times[completed], previous + np.arange(1, len(latencies) + 1))
+
+    def _require_series(self):
+        if not self.record_series:
+            raise ValueError("Time series are only recorded with statistics_mode = 'full'.")
+
+    def get_series(self):
+        """
+        Return every recorded time series by name.
+
+        Returns:
+            dict: {name: SeriesRecorder}
+        """
+        series = {}
+        for server_ip, recorder in self.server_queue_sizes.items():
+            series[f'server_{server_ip}_queue_sizes'] = recorder
+        for server_ip, recorder in self.server_dropped_requests_time.items():
+            series[f'server_{server_ip}_dropped_requests'] = recorder
+        series['load_balancer_request_queue_sizes'] = self.load_balancer_req_queue_sizes
+        series['load_balancer_dropped_requests'] = self.load_balancer_req_dropped_requests_time
+        series['load_balancer_response_queue_sizes'] = self.load_balancer_res_queue_sizes
+        series['load_balancer_dropped_responses'] = self.load_balancer_res_dropped_requests_time
+        series['dns_queue_sizes'] = self.dns_queue_sizes
+        series['dns_dropped_requests'] = self.dns_dropped_requests_time
+        series['dns_requests'] = self.dns_requests_time
+        series['dns_failovers'] = self.dns_failovers_time
+        series['resolver_dropped_requests'] = self.resolver_dropped_requests_time
+        series['client_latencies'] = self.client_latencies
+        series['total_requests_processed'] = self.total_requests_processed_time
+        series['client_present'] = self.client_present_time
+        return series
+
+    def save_statistics(self, file_format='npz'):
+        """
+        Save collected statistics to the directory of `output_metrics_file`.
+
+        Args:
+            file_format (str): 'npz' writes every series into one `statistics.npz`
+                (as `<name>_time` and `<name>_value` arrays), 'parquet' writes one
+                `<name>.parquet` per series (requires pyarrow), 'csv' writes one
+                `<name>.csv` per series.
+        """
+        self._require_series()
         # Create output directory if it doesn't exist
-        output_dir = os.path.dirname(settings.OUTPUT_METRICS_FILE)
+        output_dir = os.path.dirname(self.config.output_metrics_file)
         os.makedirs(output_dir, exist_ok=True)
-        
-        # Save client latencies
-        client_latency_file = os.path.join(output_dir, 'client_latencies.csv')
-        with open(client_latency_file, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['Latency'])
-            for latency in cls.client_latencies:
-                writer.writerow([latency])
-        
-        # Save server queue sizes
-        for server_ip, data in cls.server_queue_sizes.items():
-            filename = os.path.join(output_dir, f'server_{server_ip}_queue_sizes.csv')
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['Time', 'Queue Size'])
-                writer.writerows(data)
-        
-        # Save load balancer queue sizes
-        lb_queue_file = os.path.join(output_dir, 'load_balancer_queue_sizes.csv')
-        with open(lb_queue_file, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['Time', 'Queue Size'])
-            writer.writerows(cls.load_balancer_queue_sizes)
-        
-        # Save DNS queue sizes
-        dns_queue_file = os.path.join(output_dir, 'dns_queue_sizes.csv')
-        with open(dns_queue_file, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['Time', 'Queue Size'])
-            writer.writerows(cls.dns_queue_sizes)
+
+        series = self.get_series()
+        if file_format == 'npz':
+            arrays = {}
+            for name, recorder in series.items():
+                arrays[f'{name}_time'] = recorder.times
+                arrays[f'{name}_value'] = recorder.values
+            np.savez(os.path.join(output_dir, 'statistics.npz'), **arrays)
+        elif file_format == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Saving statistics as Parquet requires pyarrow.") from e
+            for name, recorder in series.items():
+                table = pa.table({'time': recorder.times, 'value': recorder.values})
+                pq.write_table(table, os.path.join(output_dir, f'{name}.parquet'))
+        elif file_format == 'csv':
+            for name, recorder in series.items():
+                np.savetxt(
+                    os.path.join(output_dir, f'{name}.csv'),
+                    np.column_stack((recorder.times, recorder.values)),
+                    delimiter=',', header='Time,Value', comments='', fmt=['%.17g', '%.17g'],
+                )
+        else:
+            raise ValueError(f"Unsupported statistics file format: {file_format}")
         
         # Save summary statistics
         summary_file = os.path.join(output_dir, 'summary_statistics.txt')
         with open(summary_file, 'w') as f:
-            f.write(f"Total Requests Processed: {cls.total_requests_processed}\n")
-            f.write(f"Average Client Latency: {cls.get_average_client_latency():.4f} seconds\n")
+            f.write(f"Total Requests Processed: {self.total_requests_processed}\n")
+            f.write(f"Average Client Latency: {self.get_average_client_latency():.4f} seconds\n")
             f.write(f"Total Dropped Requests:\n")
-            for server_ip, count in cls.server_dropped_requests.items():
+            for server_ip, count in self.server_dropped_requests.items():
                 f.write(f"  Server {server_ip}: {count}\n")
-            f.write(f"  Load Balancer: {cls.load_balancer_dropped_requests}\n")
-            f.write(f"  DNS Server: {cls.dns_dropped_requests}\n")
+            f.write(f"  Load Balancer Requests: {self.load_balancer_req_dropped_requests}\n")
+            f.write(f"  Load Balancer Responses: {self.load_balancer_res_dropped_requests}\n")
+            f.write(f"  DNS Server: {self.dns_dropped_requests}\n")
+            f.write(f"  Resolvers: {self.resolver_dropped_requests}\n")
     
-    @classmethod
-    def get_average_client_latency(cls):
-        if cls.client_latencies:
-            total_latency = sum(latency for time, latency in cls.client_latencies)
-            return total_latency / len(cls.client_latencies)
-        else:
-            return 0.0
+    def get_average_client_latency(self):
+        return self.client_latency_stats.mean
+
+    def get_client_latency_quantiles(self):
+        """Return the streaming estimates of the client latency quantiles as {p: latency}."""
+        return {estimator.p: estimator.value for estimator in self.client_latency_quantiles}
     
-    @classmethod
-    def generate_graphs(cls):
+    def generate_graphs(self):
         """Generate and save graphs for the collected statistics."""
-        output_dir = os.path.dirname(settings.OUTPUT_METRICS_FILE)
+        self._require_series()
+        output_dir = os.path.dirname(self.config.output_metrics_file)
+        os.makedirs(output_dir, exist_ok=True)
         # delete all graphs.
         for file in os.listdir(output_dir):
             if file.endswith('.png'):
                 os.remove(os.path.join(output_dir, file))
         # Generate graphs for server queue sizes
-        for server_ip, queue_data in cls.server_queue_sizes.items():
-            times, queue_sizes = zip(*queue_data)
-            cls._plot_graph(
+        for server_ip, queue_data in self.server_queue_sizes.items():
+            times, queue_sizes = queue_data.times, queue_data.values
+            self._plot_graph(
                 times, queue_sizes,
                 title=f"Server {server_ip} Queue Size Over Time",
                 xlabel="Time (s)",
@@ -196,9 +394,9 @@ class Statistics:
             )
 
         # Generate graphs for dropped requests at the server
-        for server_ip, drop_data in cls.server_dropped_requests_time.items():
-            times, dropped_counts = zip(*drop_data)
-            cls._plot_graph(
+        for server_ip, drop_data in self.server_dropped_requests_time.items():
+            times, dropped_counts = drop_data.times, drop_data.values
+            self._plot_graph(
                 times, dropped_counts,
                 title=f"Server {server_ip} Dropped Requests Over Time",
                 xlabel="Time (s)",
@@ -207,9 +405,9 @@ class Statistics:
             )
         
         # Generate load balancer request queue size graph
-        if cls.load_balancer_req_queue_sizes:
-            times, queue_sizes = zip(*cls.load_balancer_req_queue_sizes)
-            cls._plot_graph(
+        if self.load_balancer_req_queue_sizes:
+            times, queue_sizes = self.load_balancer_req_queue_sizes.times, self.load_balancer_req_queue_sizes.values
+            self._plot_graph(
                 times, queue_sizes,
                 title="Load Balancer Request Queue Size Over Time",
                 xlabel="Time (s)",
@@ -218,9 +416,9 @@ class Statistics:
             )
         
         # Generate load balancer dropped requests graph
-        if cls.load_balancer_req_dropped_requests_time:
-            times, dropped_counts = zip(*cls.load_balancer_req_dropped_requests_time)
-            cls._plot_graph(
+        if self.load_balancer_req_dropped_requests_time:
+            times, dropped_counts = self.load_balancer_req_dropped_requests_time.times, self.load_balancer_req_dropped_requests_time.values
+            self._plot_graph(
                 times, dropped_counts,
                 title="Load Balancer Dropped Requests Over Time",
                 xlabel="Time (s)",
@@ -229,9 +427,9 @@ class Statistics:
             )
         
                # Generate load balancer request queue size graph
-        if cls.load_balancer_res_queue_sizes:
-            times, queue_sizes = zip(*cls.load_balancer_res_queue_sizes)
-            cls._plot_graph(
+        if self.load_balancer_res_queue_sizes:
+            times, queue_sizes = self.load_balancer_res_queue_sizes.times, self.load_balancer_res_queue_sizes.values
+            self._plot_graph(
                 times, queue_sizes,
                 title="Load Balancer Response Queue Size Over Time",
                 xlabel="Time (s)",
@@ -240,9 +438,9 @@ class Statistics:
             )
         
         # Generate load balancer dropped requests graph
-        if cls.load_balancer_res_dropped_requests_time:
-            times, dropped_counts = zip(*cls.load_balancer_res_dropped_requests_time)
-            cls._plot_graph(
+        if self.load_balancer_res_dropped_requests_time:
+            times, dropped_counts = self.load_balancer_res_dropped_requests_time.times, self.load_balancer_res_dropped_requests_time.values
+            self._plot_graph(
                 times, dropped_counts,
                 title="Load Balancer Dropped Responses Over Time",
                 xlabel="Time (s)",
@@ -252,9 +450,9 @@ class Statistics:
         
         
         # Generate DNS server queue size graph
-        if cls.dns_queue_sizes:
-            times, queue_sizes = zip(*cls.dns_queue_sizes)
-            cls._plot_graph(
+        if self.dns_queue_sizes:
+            times, queue_sizes = self.dns_queue_sizes.times, self.dns_queue_sizes.values
+            self._plot_graph(
                 times, queue_sizes,
                 title="DNS Server Queue Size Over Time",
                 xlabel="Time (s)",
@@ -263,9 +461,9 @@ class Statistics:
             )
 
         # Generate DNS dropped requests graph
-        if cls.dns_dropped_requests_time:
-            times, dropped_counts = zip(*cls.dns_dropped_requests_time)
-            cls._plot_graph(
+        if self.dns_dropped_requests_time:
+            times, dropped_counts = self.dns_dropped_requests_time.times, self.dns_dropped_requests_time.values
+            self._plot_graph(
                 times, dropped_counts,
                 title="DNS Server Dropped Requests Over Time",
                 xlabel="Time (s)",
@@ -274,9 +472,9 @@ class Statistics:
             )
 
         # Generate client latency graph
-        if cls.client_latencies:
-            times, latencies = zip(*cls.client_latencies)
-            cls._plot_graph(
+        if self.client_latencies:
+            times, latencies = self.client_latencies.times, self.client_latencies.values
+            self._plot_graph(
                 times, latencies,
                 title="Client Latency Over Time",
                 xlabel="Time (s)",
@@ -285,9 +483,9 @@ class Statistics:
             )
 
         # Generate total requests processed graph
-        if cls.total_requests_processed_time:
-            times, request_counts = zip(*cls.total_requests_processed_time)
-            cls._plot_graph(
+        if self.total_requests_processed_time:
+            times, request_counts = self.total_requests_processed_time.times, self.total_requests_processed_time.values
+            self._plot_graph(
                 times, request_counts,
                 title="Total Requests Processed Over Time",
                 xlabel="Time (s)",
@@ -296,9 +494,9 @@ class Statistics:
             )
         
         # Generate total requests processed graph
-        if cls.client_present_time:
-            times, request_counts = zip(*cls.client_present_time)
-            cls._plot_graph(
+        if self.client_present_time:
+            times, request_counts = self.client_present_time.times, self.client_present_time.values
+            self._plot_graph(
                 times, request_counts,
                 title="No. of Clients Over Time",
                 xlabel="Time (s)",
@@ -306,19 +504,18 @@ class Statistics:
                 output_path=os.path.join(output_dir, 'client_presents_time.png')
             )
         
-    @classmethod
-    def _plot_graph(cls, x_data, y_data, title, xlabel, ylabel, output_path, window_size=10):
+    def _plot_graph(self, x_data, y_data, title, xlabel, ylabel, output_path, window_size=10):
         """Helper function to plot and save a smoothed graph with upper and lower bounds."""
         
-        # Convert to numpy arrays for efficient computation
-        x_data = np.array(x_data)
-        y_data = np.array(y_data)
+        # View as numpy arrays; recorder columns are used without copying
+        x_data = np.asarray(x_data)
+        y_data = np.asarray(y_data)
 
         # Compute the moving average (smoothing)
-        smoothed_y = cls._moving_average(y_data, window_size)
+        smoothed_y = self._moving_average(y_data, window_size)
         
         # Compute the upper and lower bounds (1 standard deviation around the mean)
-        std_dev = cls._moving_std_dev(y_data, window_size)
+        std_dev = self._moving_std_dev(y_data, window_size)
         
         # Trim std_dev to match smoothed_y length
         std_dev = std_dev[:len(smoothed_y)]
@@ -349,43 +546,75 @@ class Statistics:
         plt.savefig(output_path)
         plt.close()
 
-    @classmethod
-    def _moving_average(cls, data, window_size):
+    def _moving_average(self, data, window_size):
         """Compute the simple moving average (SMA) for smoothing."""
         return np.convolve(data, np.ones(window_size) / window_size, mode='valid')
 
-    @classmethod
-    def _moving_std_dev(cls, data, window_size):
+    def _moving_std_dev(self, data, window_size):
         """Compute the rolling standard deviation for variability."""
-        return np.array([np.std(data[max(0, i-window_size+1):i+1]) for i in range(len(data))])
-
-    @classmethod
-    def get_average_queue_size(cls, queue_sizes):
+        # Windows are truncated at the start of the series, as data[max(0, i-window_size+1):i+1]
+        data = np.asarray(data, dtype=np.float64)
+        counts = np.minimum(np.arange(1, len(data) + 1), window_size)
+        sums = np.cumsum(data)
+        squares = np.cumsum(data * data)
+        sums[window_size:] -= sums[:-window_size].copy()
+        squares[window_size:] -= squares[:-window_size].copy()
+        means = sums / counts
+        return np.sqrt(np.maximum(squares / counts - means * means, 0))
+
+    def get_average_queue_size(self, queue_sizes):
         """Compute the average queue size over time."""
-        if queue_sizes:
-            total_size = sum(queue_size for time, queue_size in queue_sizes)
-            return total_size / len(queue_sizes)
+        if len(queue_sizes):
+            return float(queue_sizes.values.mean())
         return 0.0
 
-    @classmethod
-    def print_summary_metrics(cls, network):
+    def get_warmup_time(self):
+        """Return the end of the warm-up period detected by MSER on the client latencies; 0 if nothing is truncated."""
+        batches, start_time = self.client_latency_warmup.get_truncation()
+        return start_time if batches else 0.0
+
+    def get_steady_state_client_latency(self):
+        """Return the mean client latency with the MSER warm-up period removed."""
+        return self.client_latency_warmup.get_steady_state_mean()
+
+    def get_steady_state_server_queue_lengths(self):
+        """Return the server queue length averaged over servers, each with its MSER warm-up period removed."""
+        total = 0
+        for server_ip, warmup in self.server_queue_warmups.items():
+            total += warmup.get_steady_state_mean()
+        return total / len(self.server_queue_warmups)
+
+    def get_time_weighted_server_queue_lengths(self, network):
+        """Return the time-weighted average queue length of each server as {server_ip: length}."""
+        return {
+            server_ip: time_average.average(network.env.now)
+            for server_ip, time_average in self.server_queue_time_averages.items()
+        }
+
+    def print_summary_metrics(self, network):
         """Prints summary statistics for the simulation."""
         print("\n===== Simulation Metrics Summary =====")
         
         # Total requests processed
-        print(f"Total Requests Processed: {cls.total_requests_processed}")
+        print(f"Total Requests Processed: {self.total_requests_processed}")
         
         # Average client latency
-        avg_latency = cls.get_average_client_latency()
+        avg_latency = self.get_average_client_latency()
         print(f"Average Client Latency: {avg_latency:.4f} seconds")
+        print(f"  - Steady-State Client Latency: {self.get_steady_state_client_latency():.4f} seconds "
+              f"(warm-up until {self.get_warmup_time():.1f} s)")
+        for p, latency in self.get_client_latency_quantiles().items():
+            print(f"  - p{p * 100:g} Client Latency: {latency:.4f} seconds")
 
         all_dropped_requests = 0
         # Server metrics
-        for server_ip, queue_data in cls.server_queue_sizes.items():
-            avg_server_queue_size = cls.get_average_queue_size(queue_data)
-            dropped_requests = cls.server_dropped_requests.get(server_ip, 0)
+        for server_ip, queue_stats in self.server_queue_stats.items():
+            avg_server_queue_size = queue_stats.mean
+            dropped_requests = self.server_dropped_requests.get(server_ip, 0)
             print(f"\nServer {server_ip} Metrics:")
             print(f"  - Average Queue Size: {avg_server_queue_size:.2f}")
+            print(f"  - Time-Weighted Queue Size: {self.server_queue_time_averages[server_ip].average(network.env.now):.2f}")
+            print(f"  - Max Queue Size: {queue_stats.max}")
             print(f"  - Total Dropped Requests: {dropped_requests}")
 
             # print utilization
@@ -395,54 +624,113 @@ class Statistics:
             all_dropped_requests += dropped_requests
 
         # Load balancer request queue metrics
-        avg_lb_req_queue_size = cls.get_average_queue_size(cls.load_balancer_req_queue_sizes)
+        avg_lb_req_queue_size = self.load_balancer_req_queue_stats.mean
         print(f"\nLoad Balancer Request Queue Metrics:")
         print(f"  - Average Request Queue Size: {avg_lb_req_queue_size:.2f}")
-        print(f"  - Total Dropped Requests: {cls.load_balancer_req_dropped_requests}")
+        print(f"  - Total Dropped Requests: {self.load_balancer_req_dropped_requests}")
 
         # Load balancer response queue metrics
-        avg_lb_res_queue_size = cls.get_average_queue_size(cls.load_balancer_res_queue_sizes)
+        avg_lb_res_queue_size = self.load_balancer_res_queue_stats.mean
         print(f"\nLoad Balancer Response Queue Metrics:")
         print(f"  - Average Response Queue Size: {avg_lb_res_queue_size:.2f}")
-        print(f"  - Total Dropped Requests: {cls.load_balancer_res_dropped_requests}")
+        print(f"  - Total Dropped Requests: {self.load_balancer_res_dropped_requests}")
+
+        # Load balancer workers
+        load_balancer = network.get_entity_by_ip(self.config.load_balancer_ip)
+        if load_balancer is not None:
+            print(f"\nLoad Balancer Utilization: {load_balancer.get_utilization():.2f}")
+            for worker, utilization in enumerate(load_balancer.get_worker_utilizations()):
+                print(f"  - Worker {worker}: {utilization:.2f}")
 
         # DNS metrics
-        avg_dns_queue_size = cls.get_average_queue_size(cls.dns_queue_sizes)
+        avg_dns_queue_size = self.dns_queue_stats.mean
         print(f"\nDNS Server Metrics:")
         print(f"  - Average Queue Size: {avg_dns_queue_size:.2f}")
-        print(f"  - Total Dropped Requests: {cls.dns_dropped_requests}")
-
-        all_dropped_requests += cls.load_balancer_req_dropped_requests + cls.load_balancer_res_dropped_requests + cls.dns_dropped_requests
+        print(f"  - Requests Received: {self.dns_requests}")
+        print(f"  - Total Dropped Requests: {self.dns_dropped_requests}")
+        if self.config.dns_overload_connections > 0:
+            print(f"  - Shortened TTLs: {self.dns_shortened_ttls}")
+        if self.config.dns_answer_count > 1:
+            print(f"  - Client Failovers: {self.dns_failovers}")
+
+        # Resolver metrics
+        if self.config.resolver_ips:
+            lookups = self.resolver_lookups
+            print(f"\nResolver Metrics ({len(self.config.resolver_ips)} resolvers, "
+                  f"TTL {self.config.resolver_cache_ttl} s):")
+            print(f"  - Hits: {lookups['hit']}, Misses: {lookups['miss']}, Coalesced: {lookups['coalesced']}")
+            print(f"  - Hit Ratio: {self.get_resolver_hit_ratio():.2%}")
+            print(f"  - Total Dropped Requests: {self.resolver_dropped_requests}")
+
+        all_dropped_requests += (self.load_balancer_req_dropped_requests + self.load_balancer_res_dropped_requests
+                                 + self.dns_dropped_requests + self.resolver_dropped_requests)
 
         print(f"\nTotal Dropped Requests: {all_dropped_requests}")
+        print(f"Server Load Imbalance (max / mean requests): {self.get_server_load_imbalance(network):.3f}")
+        received = [network.get_entity_by_ip(server_ip).received_requests for server_ip in self.config.server_ips]
+        if sum(received):
+            shares = ', '.join(f"{server_ip} {count / sum(received):.1%}"
+                               for server_ip, count in zip(self.config.server_ips, received))
+            print(f"Server Request Shares: {shares}")
+        for time, server_count, fraction in self.key_remaps:
+            print(f"Keys Remapped at {time:.1f} s ({server_count} servers): {fraction:.2%}")
+        if load_balancer is not None and load_balancer.edge_cache is not None:
+            edge_cache = load_balancer.edge_cache
+            print(f"\nEdge Cache Metrics ({self.config.edge_cache_policy}, {edge_cache.capacity} keys, "
+                  f"TTL {edge_cache.ttl} s):")
+            print(f"  - Hits: {self.edge_cache_hits}, Misses: {self.edge_cache_misses} "
+                  f"({edge_cache.expirations} expired, {edge_cache.evictions} evictions)")
+            print(f"  - Hit Ratio (origin offload): {self.get_edge_cache_hit_ratio():.2%}")
+            print(f"  - Hit Latency: {self.edge_cache_hit_latency_stats.mean:.4f} seconds")
+            print(f"  - Miss Latency: {self.edge_cache_miss_latency_stats.mean:.4f} seconds")
         print("======================================\n")
 
-    @classmethod
-    def get_average_server_queue_lengths(cls, network):
+    def get_average_server_queue_lengths(self, network=None):
         total = 0
-        for server_ip, queue_data in cls.server_queue_sizes.items():
-            total += cls.get_average_queue_size(queue_data)
-        return total / len(cls.server_queue_sizes)
+        for server_ip, queue_stats in self.server_queue_stats.items():
+            total += queue_stats.mean
+        return total / len(self.server_queue_stats)
     
-    @classmethod
-    def get_dropped_requests(cls):
+    def get_dropped_requests(self):
         all_dropped_requests = 0
-        for server_ip, queue_data in cls.server_dropped_requests.items():
+        for server_ip, queue_data in self.server_dropped_requests.items():
             all_dropped_requests += queue_data
-        return all_dropped_requests + cls.load_balancer_req_dropped_requests + cls.load_balancer_res_dropped_requests + cls.dns_dropped_requests
+        return (all_dropped_requests + self.load_balancer_req_dropped_requests + self.load_balancer_res_dropped_requests
+                + self.dns_dropped_requests + self.resolver_dropped_requests)
     
-    @classmethod
-    def get_avg_client_latencies(cls):
-        total = 0
-        for time, latency in cls.client_latencies:
-            total += latency
-        return total / len(cls.client_latencies)
-
-    @classmethod
-    def get_avg_server_utilization(cls, network):
+    def get_avg_client_latencies(self):
+        return self.client_latency_stats.total / self.client_latency_stats.count
+
+    def get_edge_cache_hit_ratio(self):
+        """Return the fraction of edge cache lookups that were hits - the origin offload - or NaN without lookups."""
+        lookups = self.edge_cache_hits + self.edge_cache_misses
+        if not lookups:
+            return float('nan')
+        return self.edge_cache_hits / lookups
+
+    def get_resolver_hit_ratio(self):
+        """Return the fraction of resolver lookups that did not reach the DNS server, or NaN without lookups."""
+        lookups = sum(self.resolver_lookups.values())
+        if not lookups:
+            return float('nan')
+        return 1 - self.resolver_lookups['miss'] / lookups
+
+    def get_server_load_imbalance(self, network):
+        """Return the most requests any server received divided by the mean per server (1 = balanced)."""
+        received = [network.get_entity_by_ip(server_ip).received_requests for server_ip in self.config.server_ips]
+        return get_load_imbalance(received)
+
+    def get_avg_server_utilization(self, network):
         total = 0
-        for server_ip, queue_data in cls.server_queue_sizes.items():
+        for server_ip in self.server_queue_stats:
             entity = network.get_entity_by_ip(server_ip)
             total += entity.get_utilization()
-        return total / len(cls.server_queue_sizes)
+        return total / len(self.server_queue_stats)
+
 
+def get_load_imbalance(counts):
+    """Return the largest of some per-server counts divided by their mean, or NaN if all are zero."""
+    total = sum(counts)
+    if not total:
+        return float('nan')
+    return max(counts) * len(counts) / total
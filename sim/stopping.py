@@ -0,0 +1,25 @@
+# sim/stopping.py
+
+
+def stop_when_precise(env, context):
+    """
+    SimPy process that ends once the run has reached the configured precision.
+
+    Every `stopping_check_interval` seconds the relative confidence interval
+    half widths of the mean client latency and of the drop rate are computed
+    from the request batch means. The process returns as soon as both are at
+    most `target_relative_precision`, or when `simulation_time` is reached.
+    Run the environment until this process to apply the rule.
+
+    Args:
+        env (simpy.Environment): The simulation environment.
+        context (SimulationContext): The run's configuration and statistics.
+    """
+    config = context.config
+    batches = context.stats.request_batches
+    while env.now + config.stopping_check_interval < config.simulation_time:
+        yield env.timeout(config.stopping_check_interval)
+        half_widths = batches.get_relative_half_widths(config.confidence_level)
+        if max(half_widths) <= config.target_relative_precision:
+            return
+    yield env.timeout(config.simulation_time - env.now)
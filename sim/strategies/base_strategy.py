@@ -1,5 +1,16 @@
 class BaseStrategy:
-    def get_next_server(self):
+    def get_next_server(self, request=None):
+        """
+        Choose the server of a request.
+
+        Args:
+            request (Message): The request being routed - a Request at the gateway load
+                balancer, a DnsRequest at the DNS load balancer - for strategies that route
+                by client; the others ignore it.
+
+        Returns:
+            str: The IP address of the selected server.
+        """
         raise NotImplementedError("This method should be overridden by subclasses.")
 
     def register_server(self, server_ip):
@@ -7,3 +18,12 @@ class BaseStrategy:
 
     def remove_server(self, server_ip):
         raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def observe_response(self, server_ip, response_time):
+        """
+        Learn from a response passing through the load balancer; ignored unless overridden.
+
+        Args:
+            server_ip (str): The server that handled the request.
+            response_time (float): Time from forwarding the request to receiving the response.
+        """
@@ -0,0 +1,196 @@
+import bisect
+import hashlib
+
+from .base_strategy import BaseStrategy
+
+
+def stable_hash(value, salt=''):
+    """Return a 64-bit hash of a value that, unlike hash(), is the same in every process."""
+    digest = hashlib.blake2b(f'{salt}{value}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class HashingStrategy(BaseStrategy):
+    # Number of fixed sample keys whose servers are compared across pool changes
+    REMAP_SAMPLE_SIZE = 10_000
+
+    def __init__(self, server_ips, network, hash_key='client_ip'):
+        """
+        Base class of strategies routing every request of a client to the same server.
+
+        A subclass builds a lookup table of servers with `build_table`, and
+        a request goes to the table entry its hashed key falls on, so a
+        lookup costs one hash and one index whatever the pool size. The table
+        is rebuilt on the first lookup after the pool changes; the fraction
+        of a fixed sample of keys that moved to another server is then
+        recorded with `Statistics.record_key_remap`.
+
+        Args:
+            server_ips (list): List of server IP addresses.
+            network (Network): The network of the run; gives the time and statistics.
+            hash_key (str): Field of the request routed on, 'client_ip' or 'client_id'.
+        """
+        if hash_key not in ('client_ip', 'client_id'):
+            raise ValueError(f"Unsupported hash key: {hash_key}")
+        self.network = network
+        self.hash_key = hash_key
+        self.server_ips = []
+        self.table = None  # Server IP of each table entry; None after the pool changed
+        self.sample_hashes = None  # Hashes of the sample keys, computed with the first table
+        self.sample_servers = None  # Server of each sample key in the last table built
+        for server_ip in server_ips:
+            self.register_server(server_ip)
+
+    def get_next_server(self, request=None):
+        """
+        Get the server a request's client is mapped to.
+
+        Args:
+            request (Message): The request; its `hash_key` field is hashed.
+
+        Returns:
+            str: The IP address of the selected server.
+        """
+        if not self.server_ips:
+            raise ValueError(f"No servers registered with the {self.__class__.__name__}.")
+        if request is None:
+            raise ValueError(f"The {self.__class__.__name__} routes on the request and needs it.")
+        if self.table is None:
+            self.rebuild_table()
+        return self.table[self.get_table_index(stable_hash(getattr(request, self.hash_key)))]
+
+    def rebuild_table(self):
+        """Build the lookup table of the current pool and record the fraction of keys it remaps."""
+        self.table = self.build_table()
+        if self.sample_hashes is None:
+            self.sample_hashes = [stable_hash(i, 'remap-sample') for i in range(self.REMAP_SAMPLE_SIZE)]
+        servers = self.get_key_servers(self.sample_hashes)
+        previous = self.sample_servers
+        if previous is not None:
+            moved = sum(1 for old, new in zip(previous, servers) if old != new)
+            self.network.context.stats.record_key_remap(
+                self.network.env.now, len(self.server_ips), moved / len(servers))
+        self.sample_servers = servers
+
+    def get_key_servers(self, key_hashes):
+        """Return the server each of a list of 64-bit key hashes maps to in the current table."""
+        return [self.table[self.get_table_index(key_hash)] for key_hash in key_hashes]
+
+    def build_table(self):
+        """Return the server IP of every entry of the lookup table."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def get_table_index(self, key_hash):
+        """Return the table entry a 64-bit key hash falls on."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def register_server(self, server_ip):
+        """
+        Register a new server IP address with the strategy.
+
+        Args:
+            server_ip (str): The IP address of the server to add.
+        """
+        self.server_ips.append(server_ip)
+        self.table = None
+
+    def remove_server(self, server_ip):
+        """
+        Remove a server IP address from the strategy.
+
+        Args:
+            server_ip (str): The IP address of the server to remove.
+        """
+        self.server_ips.remove(server_ip)
+        self.table = None
+
+
+class ConsistentHashStrategy(HashingStrategy):
+    # The 64-bit hash space is cut into 2**RING_BITS equal arcs
+    RING_BITS = 16
+
+    def __init__(self, server_ips, network, hash_key='client_ip', virtual_nodes=100):
+        """
+        Initialize the consistent hashing strategy.
+
+        Every server is placed on a ring at `virtual_nodes` hashed points,
+        and a key belongs to the first point clockwise from its hash.
+        Adding or removing a server only moves the keys of the arcs its
+        points cover, about 1/n of them. For O(1) lookups the ring is
+        resolved in advance for the start of each of 2**RING_BITS equal
+        arcs of the hash space, and a key takes the server of its arc.
+
+        Args:
+            server_ips (list): List of server IP addresses.
+            network (Network): The network of the run; gives the time and statistics.
+            hash_key (str): Field of the request routed on, 'client_ip' or 'client_id'.
+            virtual_nodes (int): Points on the ring per server.
+        """
+        if virtual_nodes < 1:
+            raise ValueError("Consistent hashing needs at least one virtual node per server.")
+        self.virtual_nodes = virtual_nodes
+        super().__init__(server_ips, network, hash_key)
+
+    def build_table(self):
+        points = sorted(
+            (stable_hash(f'{server_ip}#{i}'), server_ip)
+            for server_ip in self.server_ips
+            for i in range(self.virtual_nodes)
+        )
+        hashes = [point for point, _ in points]
+        shift = 64 - self.RING_BITS
+        table = []
+        for arc in range(1 << self.RING_BITS):
+            position = bisect.bisect_left(hashes, arc << shift)
+            table.append(points[position % len(points)][1])  # Past the last point, wrap around
+        return table
+
+    def get_table_index(self, key_hash):
+        return key_hash >> (64 - self.RING_BITS)
+
+
+class MaglevStrategy(HashingStrategy):
+    def __init__(self, server_ips, network, hash_key='client_ip', table_size=65537):
+        """
+        Initialize the Maglev hashing strategy.
+
+        Maglev (Eisenbud et al., NSDI 2016) fills a lookup table of prime
+        size M: every server has its own permutation of the entries, given
+        by an offset and a skip hashed from its address, and the servers
+        take turns claiming the next free entry of their permutation. Each
+        server gets M/n entries give or take one, and a pool change moves
+        little more than the changed server's share of the keys.
+
+        Args:
+            server_ips (list): List of server IP addresses.
+            network (Network): The network of the run; gives the time and statistics.
+            hash_key (str): Field of the request routed on, 'client_ip' or 'client_id'.
+            table_size (int): Number of table entries M; a prime well above 100 x the number of servers.
+        """
+        if table_size < 2 or any(table_size % d == 0 for d in range(2, int(table_size ** 0.5) + 1)):
+            raise ValueError("The Maglev table size must be a prime.")
+        self.table_size = table_size
+        super().__init__(server_ips, network, hash_key)
+
+    def build_table(self):
+        size = self.table_size
+        count = len(self.server_ips)
+        offsets = [stable_hash(server_ip, 'offset') % size for server_ip in self.server_ips]
+        skips = [stable_hash(server_ip, 'skip') % (size - 1) + 1 for server_ip in self.server_ips]
+        next_positions = [0] * count
+        entries = [None] * size
+        filled = 0
+        while True:
+            for i in range(count):
+                entry = (offsets[i] + next_positions[i] * skips[i]) % size
+                while entries[entry] is not None:
+                    next_positions[i] += 1
+                    entry = (offsets[i] + next_positions[i] * skips[i]) % size
+                entries[entry] = self.server_ips[i]
+                next_positions[i] += 1
+                filled += 1
+                if filled == size:
+                    return entries
+
+    def get_table_index(self, key_hash):
+        return key_hash % self.table_size
@@ -0,0 +1,95 @@
+def _precedes(entry, other):
+    # Lower priority first, then earlier insertion
+    return entry[0] < other[0] or (entry[0] == other[0] and entry[1] < other[1])
+
+
+class IndexedMinHeap:
+    def __init__(self):
+        """
+        Binary min-heap of keys whose priorities can be changed in place.
+
+        Every key's position in the heap is kept in a dict, so a key can be
+        updated or removed in O(log n) without searching for it, and the
+        key with the lowest priority is read in O(1). Keys with equal
+        priorities come out in the order they were first pushed.
+        """
+        self._heap = []  # [priority, insertion order, key] entries
+        self._positions = {}  # Heap index of each key
+        self._pushed = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def push(self, key, priority):
+        """Add a key with a priority."""
+        if key in self._positions:
+            raise ValueError(f"{key} is already in the heap.")
+        self._heap.append([priority, self._pushed, key])
+        self._pushed += 1
+        self._positions[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def update(self, key, priority):
+        """Change the priority of a key."""
+        index = self._positions[key]
+        entry = self._heap[index]
+        old_priority = entry[0]
+        entry[0] = priority
+        if priority < old_priority:
+            self._sift_up(index)
+        elif priority > old_priority:
+            self._sift_down(index)
+
+    def remove(self, key):
+        """Remove a key."""
+        index = self._positions.pop(key)
+        last = self._heap.pop()
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._positions[last[2]] = index
+            self._sift_up(index)
+            self._sift_down(self._positions[last[2]])
+
+    def peek(self):
+        """Return the key with the lowest priority."""
+        if not self._heap:
+            raise ValueError("The heap is empty.")
+        return self._heap[0][2]
+
+    def get_priority(self, key):
+        """Return the priority of a key."""
+        return self._heap[self._positions[key]][0]
+
+    def _sift_up(self, index):
+        heap = self._heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not _precedes(entry, heap[parent]):
+                break
+            heap[index] = heap[parent]
+            self._positions[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        self._positions[entry[2]] = index
+
+    def _sift_down(self, index):
+        heap = self._heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and _precedes(heap[child + 1], heap[child]):
+                child += 1
+            if not _precedes(heap[child], entry):
+                break
+            heap[index] = heap[child]
+            self._positions[heap[index][2]] = index
+            index = child
+        heap[index] = entry
+        self._positions[entry[2]] = index
@@ -1,36 +1,47 @@
 from .base_strategy import BaseStrategy
-import random
+from .indexed_heap import IndexedMinHeap
 
 class LeastConnectionsStrategy(BaseStrategy):
     def __init__(self, server_ips, network):
         """
-        Initialize the Round Robin strategy.
+        Initialize the Least Connections strategy.
+
+        Registered servers report every change of their connection count,
+        which is kept in an indexed min-heap, so the least loaded server is
+        found in O(1) and a change costs O(log n), whatever the pool size.
 
         Args:
             server_ips (list): List of server IP addresses.
+            network (Network): The network the servers are registered with.
         """
-        self.server_ips = server_ips
+        self.server_ips = []
         self.network = network
+        self.connections = IndexedMinHeap()
+        for server_ip in server_ips:
+            self.register_server(server_ip)
 
-    def get_next_server(self):
+    def get_next_server(self, request=None):
         """
-        Get the next server IP address in round-robin order.
+        Get the server IP address with the fewest connections.
+
+        Ties go to the server registered first.
 
         Returns:
             str: The IP address of the selected server.
         """
         if not self.server_ips:
-            raise ValueError("No servers registered with the RoundRobinStrategy.")
-        
-        # Find the server with the least number of connections
-        min_connections = float('inf')
-        selected_server = None
-        for server_ip in self.server_ips:
-            connections = self.network.get_entity_by_ip(server_ip).get_connections()
-            if connections < min_connections:
-                min_connections = connections
-                selected_server = server_ip
-        return selected_server
+            raise ValueError("No servers registered with the LeastConnectionsStrategy.")
+        return self.connections.peek()
+
+    def update_connections(self, server_ip, connections):
+        """
+        Record a server's new connection count; called by the server.
+
+        Args:
+            server_ip (str): The IP address of the server.
+            connections (int): Requests queued at or being served by the server.
+        """
+        self.connections.update(server_ip, connections)
 
     def register_server(self, server_ip):
         """
@@ -39,7 +50,10 @@ class LeastConnectionsStrategy(BaseStrategy):
         Args:
             server_ip (str): The IP address of the server to add.
         """
+        server = self.network.get_entity_by_ip(server_ip)
         self.server_ips.append(server_ip)
+        self.connections.push(server_ip, server.get_connections())
+        server.add_connection_listener(self.update_connections)
 
     def remove_server(self, server_ip):
         """
@@ -49,5 +63,5 @@ class LeastConnectionsStrategy(BaseStrategy):
             server_ip (str): The IP address of the server to remove.
         """
         self.server_ips.remove(server_ip)
-        # Adjust current_index if necessary
-        self.current_index = self.current_index % len(self.server_ips)
+        self.connections.remove(server_ip)
+        self.network.get_entity_by_ip(server_ip).remove_connection_listener(self.update_connections)
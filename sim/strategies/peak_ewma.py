@@ -0,0 +1,106 @@
+import math
+
+from .base_strategy import BaseStrategy
+
+class PeakEwmaStrategy(BaseStrategy):
+    def __init__(self, server_ips, network, decay_time):
+        """
+        Initialize the Peak-EWMA strategy.
+
+        Each server's response time, as seen by the load balancer, is
+        tracked with an exponentially weighted moving average that jumps up
+        to a slower response at once and decays towards faster ones with
+        time constant `decay_time`. A request goes to the server with the
+        lowest EWMA times (connections + 1), so slow nodes receive less
+        traffic as soon as they slow down.
+
+        A server starts with a prior EWMA: the mean EWMA of the servers
+        already registered, or the configured mean service time for the
+        first ones. Servers without a response yet are thus ranked by their
+        connections like the others, instead of all costing 0 and sending
+        every early request to the server registered first.
+
+        Args:
+            server_ips (list): List of server IP addresses.
+            network (Network): The network the servers are registered with.
+            decay_time (float): Time constant of the EWMA in seconds.
+        """
+        if decay_time <= 0:
+            raise ValueError("The Peak-EWMA decay time must be positive.")
+        self.network = network
+        self.decay_time = decay_time
+        self.server_ips = []
+        self.servers = {}
+        self.ewmas = {}  # Response time EWMA of each server
+        self.observed_at = {}  # Time of each server's last observation
+        for server_ip in server_ips:
+            self.register_server(server_ip)
+
+    def get_next_server(self, request=None):
+        """
+        Get the server IP address with the lowest Peak-EWMA cost.
+
+        Ties go to the server registered first.
+
+        Returns:
+            str: The IP address of the selected server.
+        """
+        if not self.server_ips:
+            raise ValueError("No servers registered with the PeakEwmaStrategy.")
+
+        min_cost = float('inf')
+        selected_server = None
+        for server_ip in self.server_ips:
+            cost = self.ewmas[server_ip] * (self.servers[server_ip].get_connections() + 1)
+            if cost < min_cost:
+                min_cost = cost
+                selected_server = server_ip
+        return selected_server
+
+    def observe_response(self, server_ip, response_time):
+        """
+        Update a server's EWMA with the response time of one of its requests.
+
+        Args:
+            server_ip (str): The server that handled the request.
+            response_time (float): Time from forwarding the request to receiving the response.
+        """
+        if server_ip not in self.ewmas:
+            return  # Removed since the request was forwarded
+        now = self.network.env.now
+        ewma = self.ewmas[server_ip]
+        if response_time > ewma:
+            ewma = response_time  # Peak: follow slower responses immediately
+        else:
+            weight = math.exp(-(now - self.observed_at[server_ip]) / self.decay_time)
+            ewma = ewma * weight + response_time * (1 - weight)
+        self.ewmas[server_ip] = ewma
+        self.observed_at[server_ip] = now
+
+    def register_server(self, server_ip):
+        """
+        Register a new server IP address with the strategy.
+
+        Args:
+            server_ip (str): The IP address of the server to add.
+        """
+        if self.ewmas:
+            prior = sum(self.ewmas.values()) / len(self.ewmas)
+        else:
+            prior = self.network.config.server_service_time_mean
+        self.server_ips.append(server_ip)
+        self.servers[server_ip] = self.network.get_entity_by_ip(server_ip)
+        self.ewmas[server_ip] = prior
+        self.observed_at[server_ip] = self.network.env.now
+
+    def remove_server(self, server_ip):
+        """
+        Remove a server IP address from the strategy.
+
+        Args:
+            server_ip (str): The IP address of the server to remove.
+        """
+        self.server_ips.remove(server_ip)
+        del self.servers[server_ip]
+        del self.ewmas[server_ip]
+        del self.observed_at[server_ip]
@@ -0,0 +1,111 @@
+from .base_strategy import BaseStrategy
+from sim.utils import uniform_sampler
+from sim.variates import VariatePool
+
+class PowerOfDChoicesStrategy(BaseStrategy):
+    def __init__(self, server_ips, network, rng, choices=2, refresh_interval=0, block_size=1024):
+        """
+        Initialize the power-of-d-choices (JSQ(d)) strategy.
+
+        Every decision samples `choices` distinct servers uniformly at random
+        and picks the one with the fewest connections, at O(d) cost whatever
+        the pool size. With d = 2 this is power-of-two choices; with d equal
+        to the pool size it is join-the-shortest-queue.
+
+        With a positive `refresh_interval` the strategy compares the loads
+        of the last snapshot, taken every `refresh_interval` seconds, instead
+        of the live ones, like a load balancer whose backend telemetry lags.
+
+        Args:
+            server_ips (list): List of server IP addresses.
+            network (Network): The network the servers are registered with.
+            rng (numpy.random.Generator): The strategy's own random number stream.
+            choices (int): Number of servers sampled per decision (d).
+            refresh_interval (float): Time in seconds between load snapshots; 0 uses live loads.
+            block_size (int): Number of uniform variates pre-sampled per refill.
+        """
+        if choices < 1:
+            raise ValueError("The power-of-d-choices strategy needs at least one choice.")
+        if refresh_interval < 0:
+            raise ValueError("The load refresh interval must not be negative.")
+        self.network = network
+        self.choices = choices
+        self.refresh_interval = refresh_interval
+        self.draws = VariatePool(uniform_sampler(rng), block_size)
+        self.server_ips = []
+        self.servers = []
+        self.loads = []  # Load snapshot per server, used if refresh_interval > 0
+        self.order = []  # Permutation of the server indexes, shuffled in place by the sampling
+        for server_ip in server_ips:
+            self.register_server(server_ip)
+        if refresh_interval > 0:
+            network.env.process(self.refresh_loads())
+
+    def get_next_server(self, request=None):
+        """
+        Get the least loaded of d servers sampled at random.
+
+        The d servers are drawn with a partial Fisher-Yates shuffle of the
+        index permutation, so each decision takes exactly d draws however
+        close d is to the pool size. If d covers the whole pool every server
+        is compared without drawing. Ties go to the server sampled first,
+        or registered first when the whole pool is compared.
+
+        Returns:
+            str: The IP address of the selected server.
+        """
+        count = len(self.server_ips)
+        if not count:
+            raise ValueError("No servers registered with the PowerOfDChoicesStrategy.")
+
+        stale = self.refresh_interval > 0
+        if self.choices >= count:
+            sampled = range(count)
+        else:
+            # Partial Fisher-Yates: order[:choices] becomes a uniform sample without replacement
+            order = self.order
+            for i in range(self.choices):
+                j = i + int(self.draws.next() * (count - i))
+                order[i], order[j] = order[j], order[i]
+            sampled = order[:self.choices]
+        selected = None
+        min_connections = float('inf')
+        for index in sampled:
+            connections = self.loads[index] if stale else self.servers[index].get_connections()
+            if connections < min_connections:
+                min_connections = connections
+                selected = index
+        return self.server_ips[selected]
+
+    def refresh_loads(self):
+        """Process taking a snapshot of every server's load every refresh interval."""
+        env = self.network.env
+        while True:
+            self.loads = [server.get_connections() for server in self.servers]
+            yield env.timeout(self.refresh_interval)
+
+    def register_server(self, server_ip):
+        """
+        Register a new server IP address with the strategy.
+
+        Args:
+            server_ip (str): The IP address of the server to add.
+        """
+        server = self.network.get_entity_by_ip(server_ip)
+        self.server_ips.append(server_ip)
+        self.servers.append(server)
+        self.loads.append(server.get_connections())
+        self.order = list(range(len(self.server_ips)))
+
+    def remove_server(self, server_ip):
+        """
+        Remove a server IP address from the strategy.
+
+        Args:
+            server_ip (str): The IP address of the server to remove.
+        """
+        index = self.server_ips.index(server_ip)
+        del self.server_ips[index]
+        del self.servers[index]
+        del self.loads[index]
+        self.order = list(range(len(self.server_ips)))
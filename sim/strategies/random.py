@@ -1,19 +1,23 @@
 from .base_strategy import BaseStrategy
-import random
+from sim.utils import uniform_sampler
+from sim.variates import VariatePool
 
 class RandomStrategy(BaseStrategy):
-    def __init__(self, server_ips):
+    def __init__(self, server_ips, rng, block_size=1024):
         """
-        Initialize the Round Robin strategy.
+        Initialize the Random strategy.
 
         Args:
             server_ips (list): List of server IP addresses.
+            rng (numpy.random.Generator): The strategy's own random number stream.
+            block_size (int): Number of uniform variates pre-sampled per refill.
         """
         self.server_ips = server_ips
+        self.choices = VariatePool(uniform_sampler(rng), block_size)
 
-    def get_next_server(self):
+    def get_next_server(self, request=None):
         """
-        Get the next server IP address in round-robin order.
+        Get a server IP address chosen uniformly at random.
 
         Returns:
             str: The IP address of the selected server.
@@ -21,7 +25,7 @@ class RandomStrategy(BaseStrategy):
         if not self.server_ips:
             raise ValueError("No servers registered with the RoundRobinStrategy.")
         
-        random_idx = random.randint(0, len(self.server_ips) - 1)
+        random_idx = int(self.choices.next() * len(self.server_ips))
         return self.server_ips[random_idx]
 
     def register_server(self, server_ip):
@@ -41,5 +45,3 @@ class RandomStrategy(BaseStrategy):
             server_ip (str): The IP address of the server to remove.
         """
         self.server_ips.remove(server_ip)
-        # Adjust current_index if necessary
-        self.current_index = self.current_index % len(self.server_ips)
@@ -11,7 +11,7 @@ class RoundRobinStrategy(BaseStrategy):
         self.server_ips = server_ips
         self.current_index = 0  # Start from the first server
 
-    def get_next_server(self):
+    def get_next_server(self, request=None):
         """
         Get the next server IP address in round-robin order.
 
@@ -0,0 +1,72 @@
+from .base_strategy import BaseStrategy
+
+class WeightedRoundRobinStrategy(BaseStrategy):
+    def __init__(self, server_ips, weights):
+        """
+        Initialize the smooth weighted round robin strategy.
+
+        This is the nginx algorithm: on every request each server's current
+        weight grows by its weight, the server with the largest current
+        weight is chosen, and the total of all weights is taken off it.
+        Over a cycle of total-weight requests each server is chosen as many
+        times as its weight, and the choices of a heavy server are spread
+        through the cycle instead of coming in a burst.
+
+        Args:
+            server_ips (list): List of server IP addresses.
+            weights (dict): Weight of each server IP address; servers not listed get 1.
+        """
+        self.weights = weights
+        self.server_ips = []
+        self.current_weights = []
+        self.server_weights = []
+        self.total_weight = 0
+        for server_ip in server_ips:
+            self.register_server(server_ip)
+
+    def get_next_server(self, request=None):
+        """
+        Get the next server IP address in smooth weighted round-robin order.
+
+        Returns:
+            str: The IP address of the selected server.
+        """
+        if not self.server_ips:
+            raise ValueError("No servers registered with the WeightedRoundRobinStrategy.")
+
+        current_weights = self.current_weights
+        selected = 0
+        for i, weight in enumerate(self.server_weights):
+            current_weights[i] += weight
+            if current_weights[i] > current_weights[selected]:
+                selected = i
+        current_weights[selected] -= self.total_weight
+        return self.server_ips[selected]
+
+    def register_server(self, server_ip):
+        """
+        Register a new server IP address with the strategy.
+
+        Args:
+            server_ip (str): The IP address of the server to add.
+        """
+        weight = self.weights.get(server_ip, 1)
+        if weight <= 0:
+            raise ValueError(f"Server {server_ip} must have a positive weight.")
+        self.server_ips.append(server_ip)
+        self.server_weights.append(weight)
+        self.current_weights.append(0)
+        self.total_weight = sum(self.server_weights)
+
+    def remove_server(self, server_ip):
+        """
+        Remove a server IP address from the strategy.
+
+        Args:
+            server_ip (str): The IP address of the server to remove.
+        """
+        index = self.server_ips.index(server_ip)
+        del self.server_ips[index]
+        del self.server_weights[index]
+        del self.current_weights[index]
+        self.total_weight = sum(self.server_weights)
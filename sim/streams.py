@@ -0,0 +1,72 @@
+# sim/streams.py
+
+import ipaddress
+
+import numpy as np
+
+
+class RandomStreams:
+    # Purposes with their own family of streams. The position of a purpose
+    # determines its seed, so new purposes must be appended at the end.
+    PURPOSES = (
+        'client_arrival',
+        'client_request_interval',
+        'client_termination',
+        'server_service',
+        'load_balancer_processing',
+        'load_balancer_response_processing',
+        'dns_service',
+        'strategy',
+        'request_service',
+        'request_key',
+        'resolver_service',
+        'dns_selection',
+    )
+
+    def __init__(self, seed, replication=0):
+        """
+        Independent, reproducible random number streams for one simulation run.
+
+        The root `SeedSequence` is spawned once per purpose, and every entity
+        gets its own child of its purpose's sequence, keyed by a stable
+        integer (client id, IP address) rather than by creation order. Adding
+        a server or switching the strategy therefore leaves every other
+        entity's variates untouched.
+
+        Args:
+            seed (int): Root seed of the run.
+            replication (int): Index of the replication; each one is an independent
+                child of the seed.
+        """
+        self.seed = seed
+        self.replication = replication
+        root = np.random.SeedSequence(seed, spawn_key=(replication,))
+        self._purpose_seeds = dict(zip(self.PURPOSES, root.spawn(len(self.PURPOSES))))
+
+    def get_generator(self, purpose, key=0):
+        """
+        Return the generator of one entity for one purpose.
+
+        The child sequence is the one `spawn` would return as child number
+        `key`, built directly so that it does not depend on how many other
+        streams were requested before.
+
+        Args:
+            purpose (str): One of `PURPOSES`.
+            key (int): Non-negative integer identifying the entity.
+
+        Returns:
+            numpy.random.Generator: A generator private to (purpose, key).
+        """
+        parent = self._purpose_seeds[purpose]
+        child = np.random.SeedSequence(
+            parent.entropy,
+            spawn_key=parent.spawn_key + (key,),
+            pool_size=parent.pool_size,
+        )
+        return np.random.default_rng(child)
+
+
+def get_address_key(ip_address):
+    """Return the stream key of a network entity, derived from its IP address."""
+    return int(ipaddress.ip_address(ip_address))
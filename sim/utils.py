@@ -1,50 +1,87 @@
 # sim/utils.py
 
+import functools
+
 import numpy as np
-from config import settings
-import random
-def get_client_request_interval():
 
-    dist_name = random.choice(list(settings.Q_DISTRIBUTIONS.keys()))
+# Each *_sampler function returns a `draw(size)` callable producing an array
+# of variates, meant to be wrapped in a sim.variates.VariatePool.
 
-    params = settings.Q_DISTRIBUTIONS[dist_name]
-    
+def _draw_q_distribution(rng, dist_name, params, size):
     if dist_name == 'normal':
-        return max(0, np.random.normal(params['mean'], params['std']))
+        return np.maximum(0, rng.normal(params['mean'], params['std'], size))
     elif dist_name == 'exponential':
-        return np.random.exponential(params['scale'])
+        return rng.exponential(params['scale'], size)
     elif dist_name == 'uniform':
-        return np.random.uniform(params['low'], params['high'])
+        return rng.uniform(params['low'], params['high'], size)
     elif dist_name == 'gamma':
-        return np.random.gamma(params['shape'], params['scale'])
+        return rng.gamma(params['shape'], params['scale'], size)
     elif dist_name == 'chi_squared':
-        return np.random.chisquare(params['df'])
+        return rng.chisquare(params['df'], size)
     elif dist_name == 'burst':
-        return params
+        return np.full(size, params, dtype=np.float64)
     else:
         raise ValueError('Unsupported distribution')
 
+def client_request_interval_sampler(config, rng):
+    # q is an equal-weight mixture of the configured distributions
+    distributions = list(config.q_distributions.items())
+
+    def draw(size):
+        components = rng.integers(len(distributions), size=size)
+        intervals = np.empty(size, dtype=np.float64)
+        for k, (dist_name, params) in enumerate(distributions):
+            mask = components == k
+            intervals[mask] = _draw_q_distribution(rng, dist_name, params, np.count_nonzero(mask))
+        return intervals
+
+    return draw
+
+def client_arrival_interval_sampler(config, rng):
+    return lambda size: rng.exponential(config.client_arrival_interval, size)
+
+def uniform_sampler(rng):
+    return lambda size: rng.random(size)
+
+@functools.lru_cache(maxsize=None)
+def _get_zipf_cdf(count, exponent):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+def request_key_sampler(config, rng):
+    # Zipf over keys 1 to REQUEST_KEY_COUNT, drawn by inverting the CDF; the CDF is shared by all clients
+    if config.request_key_count < 1:
+        raise ValueError("There must be at least one request key.")
+    cdf = _get_zipf_cdf(config.request_key_count, config.request_key_zipf_exponent)
+    return lambda size: np.searchsorted(cdf, rng.random(size), side='right') + 1
+
 def get_current_time(env):
     """Utility function to get the current simulation time."""
     return env.now
 
-def get_lb_strategy_processing_time():
-    return np.random.exponential(settings.LOAD_BALANCING_STRATEGY_PROCESSING_TIME[settings.LOAD_BALANCING_STRATEGY]['mean'])
+def lb_strategy_processing_time_sampler(config, rng):
+    mean = config.load_balancing_strategy_processing_time[config.load_balancing_strategy]['mean']
+    return lambda size: rng.exponential(mean, size)
+
+def load_balancer_processing_time_sampler(config, rng):
+    strategy_time = lb_strategy_processing_time_sampler(config, rng)
+    return lambda size: strategy_time(size) + rng.exponential(config.load_balancer_processing_time_mean, size)
 
-def get_load_balancer_processing_time():
-    return get_lb_strategy_processing_time() + max(0, np.random.exponential(settings.LOAD_BALANCER_PROCESSING_TIME_MEAN))
+def load_balancer_response_processing_time_sampler(config, rng):
+    return lambda size: rng.exponential(config.load_balancer_processing_time_mean, size)
 
-def get_load_balancer_response_processing_time():
-    return max(0, np.random.exponential(settings.LOAD_BALANCER_PROCESSING_TIME_MEAN))
+def server_service_time_sampler(config, rng):
+    return lambda size: rng.exponential(config.server_service_time_mean, size)
 
-def get_server_service_time():
-    return np.random.exponential(settings.SERVER_SERVICE_TIME_MEAN)
+def resolver_service_time_sampler(config, rng):
+    return lambda size: rng.exponential(config.resolver_service_time_mean, size)
 
-def get_dns_service_time():
+def dns_service_time_sampler(config, rng):
     # DNS service time may include load balancer processing time if DNS load balancer
-    base_service_time = max(0, np.random.exponential(settings.DNS_SERVICE_TIME_MEAN))
-    if settings.LOAD_BALANCER_TYPE == 'dns':
-        lb_service_time = get_lb_strategy_processing_time()
-        return max(0, base_service_time + lb_service_time)
+    base_service_time = lambda size: rng.exponential(config.dns_service_time_mean, size)
+    if config.load_balancer_type == 'dns':
+        strategy_time = lb_strategy_processing_time_sampler(config, rng)
+        return lambda size: base_service_time(size) + strategy_time(size)
     else:
-        return max(0, base_service_time)
\ No newline at end of file
+        return base_service_time
@@ -0,0 +1,94 @@
+# sim/variates.py
+
+import numpy as np
+
+
+class VariatePool:
+    def __init__(self, draw, block_size):
+        """
+        Hand out random variates one at a time from pre-sampled blocks.
+
+        `draw(size)` is called once per block, so the cost of a NumPy call
+        is paid once per `block_size` variates instead of once per variate.
+        Blocks are converted to Python numbers, which are cheaper to do
+        arithmetic with than NumPy scalars.
+
+        Args:
+            draw (callable): Function returning an array of `size` variates.
+            block_size (int): Number of variates drawn per refill.
+        """
+        self._draw = draw
+        self.block_size = block_size
+        self._values = iter(())
+
+    def next(self):
+        """Return the next variate, drawing a new block when the current one runs out."""
+        try:
+            return next(self._values)
+        except StopIteration:
+            self._values = iter(self._draw(self.block_size).tolist())
+            return next(self._values)
+
+
+class VariateStream:
+    def __init__(self, draw, block_size):
+        """
+        Random variates of one stream, addressed by their position in the stream.
+
+        The vectorized counterpart of `VariatePool`: blocks are drawn with
+        `draw(block_size)` exactly as `VariatePool` draws them, so variate k
+        is the k-th value a pool over the same generator would hand out.
+
+        Args:
+            draw (callable): Function returning an array of `size` variates.
+            block_size (int): Number of variates drawn per refill.
+        """
+        self._draw = draw
+        self.block_size = block_size
+        self._values = np.empty(0)
+        self._offset = 0  # Position of self._values[0] in the stream
+
+    def take(self, start, count):
+        """Return variates `start` to `start + count` (exclusive) as an array."""
+        end = start - self._offset + count
+        if end > len(self._values):
+            blocks = -(-(end - len(self._values)) // self.block_size)
+            self._values = np.concatenate(
+                [self._values] + [self._draw(self.block_size) for _ in range(blocks)])
+        return self._values[start - self._offset:end]
+
+    def discard(self, before):
+        """Release the variates before position `before`; they cannot be taken any more."""
+        drop = before - self._offset
+        if drop > 0:
+            self._values = self._values[drop:]
+            self._offset = before
+
+
+class VariateMatrix:
+    def __init__(self, draws, block_size):
+        """
+        One `VariateStream`-like stream per row, for the per-client streams.
+
+        Row r holds the variates of `draws[r]`, drawn in blocks of
+        `block_size` like a `VariatePool`, so that many (row, position)
+        pairs can be looked up with one indexing operation.
+
+        Args:
+            draws (list): One `draw(size)` callable per row.
+            block_size (int): Number of variates drawn per refill.
+        """
+        self._draws = draws
+        self.block_size = block_size
+        self._values = np.empty((len(draws), 0))
+
+    def take(self, rows, positions):
+        """Return the variates at `positions` of the streams `rows` (arrays of equal length)."""
+        if len(positions) and positions.max() >= self._values.shape[1]:
+            blocks = (positions.max() - self._values.shape[1]) // self.block_size + 1
+            new_columns = [
+                np.concatenate([draw(self.block_size) for _ in range(blocks)])
+                for draw in self._draws
+            ]
+            self._values = np.concatenate([self._values, np.array(new_columns)], axis=1)
+        return self._values[rows, positions]
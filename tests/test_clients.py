@@ -0,0 +1,99 @@
+import ipaddress
+from collections import defaultdict
+
+import pytest
+import simpy
+
+from main import RESULT_COLUMNS, build_simulation, point_config, run_simulation
+from sim.client import get_client_ip
+from sim.context import SimulationContext
+from sim.server import Server
+
+
+class FixedIntervals:
+    def __init__(self, *intervals):
+        self.intervals = list(intervals)
+
+    def next(self):
+        return self.intervals.pop(0)
+
+
+def test_client_ips_are_valid_and_unique_past_254_clients():
+    ips = [get_client_ip('10.0.0.0/8', client_id) for client_id in range(1, 1001)]
+    assert len(set(ips)) == len(ips)
+    assert ips[253:257] == ['10.0.0.254', '10.0.0.255', '10.0.1.0', '10.0.1.1']
+    assert all(ipaddress.ip_address(ip) in ipaddress.ip_network('10.0.0.0/8') for ip in ips)
+    with pytest.raises(ValueError):
+        get_client_ip('10.0.0.0/24', 255)
+
+
+@pytest.mark.parametrize('number_of_clients, overrides', [
+    (100, {}),
+    (600, {}),
+    (400, {'server_buffer_size': 3}),
+])
+def test_population_matches_individual_clients(number_of_clients, overrides):
+    results = {}
+    for client_model in ('individual', 'population'):
+        config = point_config(number_of_clients, 'round_robin', 'gateway', 'low', 'high', simulation_time=1000,
+                              client_model=client_model, **overrides)
+        results[client_model] = dict(zip(RESULT_COLUMNS, run_simulation(config)))
+
+    individual, population = results['individual'], results['population']
+    for column in ('server_utilization', 'client_latency', 'server_queue_length'):
+        assert population[column] == pytest.approx(individual[column], rel=0.01), column
+    assert population['dropped_requests'] == pytest.approx(individual['dropped_requests'], rel=0.1, abs=5)
+    if overrides:
+        assert individual['dropped_requests'] > 0
+
+
+def test_finish_request_interrupts_sleep_for_earlier_request(monkeypatch):
+    config = point_config(2, 'round_robin', 'gateway', 'low', 'high', client_model='population')
+    env = simpy.Environment()
+    network = build_simulation(env, SimulationContext(config))
+    population = network.get_entity_by_ip(config.client_subnet)
+    started = []
+    monkeypatch.setattr(population, 'start_request', lambda client_id: started.append((env.now, client_id)))
+
+    env.run(until=population.arrival_times[1] + 1)
+    assert [client_id for _, client_id in started] == [1, 2]
+    assert population.wakeup_time == float('inf')  # Nothing left to do, so the process sleeps indefinitely
+
+    now = env.now
+    population.client_variates[0].request_intervals = FixedIntervals(50)
+    population.finish_request(1, dropped=True)
+    assert population.wakeup_time == now + 50
+    env.run(until=now + 10)
+    # Client 2's next request is due before the one the process sleeps until
+    population.client_variates[1].request_intervals = FixedIntervals(5)
+    population.finish_request(2, dropped=True)
+    env.run(until=now + 100)
+    assert started[2:] == [(now + 15, 2), (now + 50, 1)]
+
+
+def test_population_gives_each_client_its_own_service_times_under_crn(monkeypatch):
+    def record_service_times(strategy):
+        service_times = defaultdict(list)
+        receive_message = Server.receive_message
+
+        def recording_receive_message(self, src_entity, message):
+            service_times[message.client_id].append(message.service_time)
+            receive_message(self, src_entity, message)
+
+        monkeypatch.setattr(Server, 'receive_message', recording_receive_message)
+        config = point_config(50, strategy, 'gateway', 'low', 'high', simulation_time=300,
+                              client_model='population', common_random_numbers=True)
+        env = simpy.Environment()
+        build_simulation(env, SimulationContext(config))
+        env.run(until=config.simulation_time)
+        monkeypatch.undo()
+        return service_times
+
+    round_robin = record_service_times('round_robin')
+    least_connections = record_service_times('least_connections')
+    assert set(round_robin) == set(least_connections)
+    for client_id, times in round_robin.items():
+        other = least_connections[client_id]
+        common = min(len(times), len(other))
+        assert common > 0
+        assert times[:common] == other[:common]
@@ -0,0 +1,36 @@
+import copy
+import pickle
+
+import pytest
+
+from sim.context import FrozenDict, SimulationConfig
+from sim.result_cache import get_result_key
+
+
+def test_mapping_and_list_fields_are_frozen():
+    config = SimulationConfig.from_settings(server_weights={'192.168.1.2': 2}, resolver_ips=['10.0.0.1'])
+    assert isinstance(config.server_weights, FrozenDict)
+    assert isinstance(config.q_distributions['normal'], FrozenDict)
+    assert config.resolver_ips == ('10.0.0.1',)
+    with pytest.raises(TypeError):
+        config.transport_delays['client_to_server'] = 0
+    with pytest.raises(TypeError):
+        config.server_weights.update({'192.168.1.3': 1})
+
+
+def test_frozen_config_pickles_copies_and_hashes():
+    config = SimulationConfig.from_settings()
+    for clone in (pickle.loads(pickle.dumps(config)), copy.deepcopy(config)):
+        assert clone == config
+        assert hash(clone) == hash(config)
+        assert isinstance(clone.transport_delays, FrozenDict)
+        assert get_result_key(clone) == get_result_key(config)
+
+
+def test_replace_freezes_new_values():
+    config = SimulationConfig.from_settings()
+    weights = {'192.168.1.2': 3}
+    changed = config.replace(server_weights=weights)
+    weights['192.168.1.2'] = 1
+    assert changed.server_weights == {'192.168.1.2': 3}
+    assert isinstance(changed.server_weights, FrozenDict)
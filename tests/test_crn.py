@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+import simpy
+
+from main import RESULT_COLUMNS, build_simulation, point_config, run_simulation
+from sim.analysis import get_paired_difference
+from sim.context import SimulationContext
+from sim.server import Server
+
+CLIENT_LATENCY = RESULT_COLUMNS.index('client_latency')
+
+
+def record_service_times(monkeypatch, strategy):
+    service_times = defaultdict(list)  # Client id -> service time of each of its requests, in order
+    receive_message = Server.receive_message
+
+    def recording_receive_message(self, src_entity, message):
+        service_times[message.client_id].append(message.service_time)
+        receive_message(self, src_entity, message)
+
+    monkeypatch.setattr(Server, 'receive_message', recording_receive_message)
+    config = point_config(30, strategy, 'gateway', 'low', 'high', simulation_time=300,
+                          common_random_numbers=True, logging_enabled=False)
+    env = simpy.Environment()
+    build_simulation(env, SimulationContext(config))
+    env.run(until=config.simulation_time)
+    monkeypatch.undo()
+    return service_times
+
+
+def test_strategies_see_identical_service_times_per_request(monkeypatch):
+    round_robin = record_service_times(monkeypatch, 'round_robin')
+    least_connections = record_service_times(monkeypatch, 'least_connections')
+
+    assert set(round_robin) == set(least_connections)
+    for client_id, times in round_robin.items():
+        other = least_connections[client_id]
+        common = min(len(times), len(other))
+        assert common > 0
+        assert None not in times
+        assert times[:common] == other[:common]
+
+
+def test_paired_interval_is_narrower_than_independent_one():
+    def latency(strategy, replication, crn):
+        config = point_config(60, strategy, 'gateway', 'low', 'high', simulation_time=300, engine='fast',
+                              common_random_numbers=crn, replication=replication)
+        return run_simulation(config)[CLIENT_LATENCY]
+
+    replications = range(5)
+    paired = get_paired_difference(
+        [latency('round_robin', r, True) for r in replications],
+        [latency('random', r, True) for r in replications])
+    # Without common random numbers, and with independent replications for the second strategy
+    independent = get_paired_difference(
+        [latency('round_robin', r, False) for r in replications],
+        [latency('random', r + len(replications), False) for r in replications])
+
+    assert paired[1] < 0.5 * independent[1]
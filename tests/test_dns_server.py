@@ -0,0 +1,237 @@
+import math
+
+import pytest
+import simpy
+
+from main import build_simulation, point_config
+from sim.client import Client, get_client_ip
+from sim.dns_answer import DnsAnswer, order_addresses, update_rtt
+from sim.context import SimulationConfig, SimulationContext
+from sim.messages import DnsDrop, DnsRequest, DnsResponse, ServerDrop
+from sim.network import Network
+from sim.resolver import Resolver
+
+RESOLVER_IP = '10.1.0.1'
+CLIENT_IPS = ('10.0.0.1', '10.0.0.2', '10.0.0.3')
+
+
+class Endpoint:
+    def __init__(self, network, ip_address, entity_type, peer_types):
+        self.type = entity_type
+        self.peer_types = peer_types
+        self.env = network.env
+        self.received = []
+        network.register_entity(ip_address, self)
+
+    def receive_message(self, src_entity, message):
+        self.received.append((self.env.now, message))
+
+
+class ConstantTimes:
+    def __init__(self, value):
+        self.value = value
+
+    def next(self):
+        return self.value
+
+
+def build_resolver(**overrides):
+    env = simpy.Environment()
+    config = SimulationConfig.from_settings(
+        logging_enabled=False, resolver_ips=(RESOLVER_IP,), resolver_cache_ttl=100, **overrides)
+    network = Network(env, SimulationContext(config))
+    dns_server = Endpoint(network, config.dns_server_ip, 'dns_server', ('resolver',))
+    clients = [Endpoint(network, ip, 'client', ('resolver',)) for ip in CLIENT_IPS]
+    resolver = Resolver(env, network, RESOLVER_IP, network.context)
+    resolver.service_times = ConstantTimes(1)
+    return env, network, resolver, dns_server, clients
+
+
+def ask(env, network, client, client_id):
+    """Send a DNS request from a client to the resolver."""
+    network.send(client, RESOLVER_IP, DnsRequest('example.com', client_id, CLIENT_IPS[client_id - 1], env.now))
+
+
+def answer(env, network, dns_server, ttls=(500,)):
+    """Answer the resolver's last query from the DNS server."""
+    _, query = dns_server.received[-1]
+    ips = ('192.168.1.3', '192.168.1.4')[:len(ttls)]
+    network.send(dns_server, RESOLVER_IP, DnsResponse(ips, ttls, query.client_id, env.now))
+
+
+def test_resolver_answers_from_cache_within_ttl():
+    env, network, resolver, dns_server, clients = build_resolver()
+    ask(env, network, clients[0], 1)
+    env.run(until=2)
+    assert len(dns_server.received) == 1
+    answer(env, network, dns_server, ttls=(500, 500))
+    env.run(until=10)
+    (_, response), = clients[0].received
+    assert response.ips == ('192.168.1.3', '192.168.1.4')
+
+    ask(env, network, clients[1], 2)
+    env.run(until=20)
+    assert len(dns_server.received) == 1
+    (time, response), = clients[1].received
+    assert response.ips == ('192.168.1.3', '192.168.1.4')
+    # Passed on with the TTLs reduced by the answer's age in the cache
+    age = time - network.get_transport_delay(resolver, clients[1]) - 2 - network.get_transport_delay(
+        dns_server, resolver)
+    assert response.ttls == pytest.approx((500 - age, 500 - age))
+    assert network.context.stats.resolver_lookups == {'hit': 1, 'miss': 1, 'coalesced': 0}
+
+
+@pytest.mark.parametrize('ttls', [(500,), (30,)])
+def test_resolver_asks_again_after_cached_answer_expires(ttls):
+    env, network, resolver, dns_server, clients = build_resolver()
+    ask(env, network, clients[0], 1)
+    env.run(until=2)
+    answer(env, network, dns_server, ttls=ttls)
+    env.run(until=10)
+
+    # The answer expires after the resolver TTL of 100 s, or sooner with a shorter address TTL
+    expiry = 2 + network.get_transport_delay(dns_server, resolver) + min(100, ttls[0])
+    env.run(until=expiry - 2)
+    ask(env, network, clients[1], 2)
+    env.run(until=expiry + 1)
+    assert len(dns_server.received) == 1
+    ask(env, network, clients[2], 3)
+    env.run(until=expiry + 5)
+    assert len(dns_server.received) == 2
+    assert network.context.stats.resolver_lookups == {'hit': 1, 'miss': 2, 'coalesced': 0}
+
+
+def test_resolver_coalesces_concurrent_misses():
+    env, network, resolver, dns_server, clients = build_resolver()
+    for client_id, client in enumerate(clients, start=1):
+        ask(env, network, client, client_id)
+    env.run(until=5)
+    assert len(dns_server.received) == 1
+    answer(env, network, dns_server)
+    env.run(until=10)
+
+    assert all(len(client.received) == 1 for client in clients)
+    assert [client.received[0][1].client_id for client in clients] == [1, 2, 3]
+    assert network.context.stats.resolver_lookups == {'hit': 0, 'miss': 1, 'coalesced': 2}
+
+
+def test_dropped_upstream_query_reaches_every_waiting_client():
+    env, network, resolver, dns_server, clients = build_resolver()
+    for client_id, client in enumerate(clients[:2], start=1):
+        ask(env, network, client, client_id)
+    env.run(until=5)
+    _, query = dns_server.received[0]
+    network.send(dns_server, RESOLVER_IP, DnsDrop('queue full', query.client_id, env.now))
+    env.run(until=10)
+
+    for client_id, client in enumerate(clients[:2], start=1):
+        (_, message), = client.received
+        assert (message.type, message.client_id, message.reason) == ('drop_dns', client_id, 'queue full')
+    assert not clients[2].received
+    assert not resolver.waiting_clients and not resolver.pending_queries
+
+    # The next request asks the DNS server again
+    ask(env, network, clients[2], 3)
+    env.run(until=15)
+    assert len(dns_server.received) == 2
+
+
+def test_resolvers_reduce_dns_server_requests():
+    dns_requests = {}
+    for resolver_ips in ((), ('10.1.0.1', '10.1.0.2')):
+        config = point_config(100, 'round_robin', 'dns', 'low', 'low', resolver_ips=resolver_ips)
+        context = SimulationContext(config)
+        env = simpy.Environment()
+        build_simulation(env, context)
+        env.run(until=1000)
+        dns_requests[resolver_ips] = context.stats.dns_requests
+    assert dns_requests[()] > 100
+    assert dns_requests[('10.1.0.1', '10.1.0.2')] < dns_requests[()] / 5
+
+
+def build_dns_simulation(**overrides):
+    config = point_config(0, 'round_robin', 'dns', 'low', 'low', **overrides)
+    context = SimulationContext(config)
+    env = simpy.Environment()
+    network = build_simulation(env, context)
+    return env, network, network.get_entity_by_ip(config.dns_server_ip)
+
+
+def test_answer_carries_configured_number_of_addresses_and_ttls():
+    env, network, dns_server = build_dns_simulation(dns_answer_count=3, dns_ttl=60)
+    server_ips = network.config.server_ips
+    answers = [dns_server.get_server_answer(None) for _ in range(2)]
+    assert answers == [server_ips[0:3], server_ips[1:4]]
+    assert [dns_server.get_server_ttl(ip) for ip in answers[0]] == [60, 60, 60]
+
+    env, network, dns_server = build_dns_simulation(dns_answer_count=10, dns_ttl=None)
+    assert len(dns_server.get_server_answer(None)) == len(network.config.server_ips)
+    assert dns_server.get_server_ttl(network.config.server_ips[0]) == math.inf
+
+
+def test_ttl_is_shortened_for_overloaded_servers():
+    env, network, dns_server = build_dns_simulation(
+        dns_answer_count=2, dns_ttl=60, dns_overload_connections=3, dns_overload_ttl=5)
+    busy_ip, idle_ip = network.config.server_ips[:2]
+    network.get_entity_by_ip(busy_ip).set_connections(3)
+    network.get_entity_by_ip(idle_ip).set_connections(2)
+
+    assert dns_server.get_server_ttl(busy_ip) == 5
+    assert dns_server.get_server_ttl(idle_ip) == 60
+    assert network.context.stats.dns_shortened_ttls == 1
+
+
+def test_cached_addresses_expire_with_their_ttls():
+    answer = DnsAnswer(('a', 'b', 'c'), (10, 50, math.inf), timestamp=100, max_ttl=30)
+    assert answer.get_fresh_ips(105) == ['a', 'b', 'c']
+    assert answer.get_fresh_ips(110) == ['b', 'c']
+    # Every address is kept at most max_ttl, the client's cache invalidation time
+    assert answer.get_fresh_ips(130) == []
+
+
+def test_lowest_rtt_orders_measured_addresses():
+    rtts = {}
+    update_rtt(rtts, 'a', 4.0)
+    update_rtt(rtts, 'b', 2.0)
+    assert order_addresses(['a', 'b'], 'lowest_rtt', rtts=rtts) == ['b', 'a']
+    # An unmeasured address counts as 0 and is tried first
+    assert order_addresses(['a', 'b', 'c'], 'lowest_rtt', rtts=rtts) == ['c', 'a', 'b']
+    # Samples are smoothed: b needs several slow responses before it falls behind a
+    update_rtt(rtts, 'b', 10.0)
+    assert rtts['b'] == pytest.approx(2.0 + (10.0 - 2.0) / 8)
+    assert order_addresses(['a', 'b'], 'lowest_rtt', rtts=rtts) == ['b', 'a']
+    for _ in range(5):
+        update_rtt(rtts, 'b', 10.0)
+    assert order_addresses(['a', 'b'], 'lowest_rtt', rtts=rtts) == ['a', 'b']
+
+
+def test_random_selection_keeps_the_others_in_answer_order():
+    assert order_addresses(['a', 'b', 'c'], 'random', draw=lambda: 0.5) == ['b', 'a', 'c']
+    assert order_addresses(['a', 'b', 'c'], 'random', draw=lambda: 0.99) == ['c', 'a', 'b']
+    assert order_addresses(['a', 'b', 'c'], 'first') == ['a', 'b', 'c']
+    with pytest.raises(ValueError):
+        order_addresses(['a', 'b'], 'closest')
+
+
+def test_client_fails_over_to_next_address_after_server_drop():
+    env, network, dns_server = build_dns_simulation(dns_answer_count=2)
+    dropping_ip, next_ip = network.config.server_ips[:2]
+    dropping_server = network.get_entity_by_ip(dropping_ip)
+    drops = []
+
+    def drop_request(src_entity, message):
+        drops.append(env.now)
+        drop = ServerDrop('queue full', message.client_id, dropping_ip, env.now)
+        network.send(dropping_server, message.client_ip, drop)
+
+    dropping_server.receive_message = drop_request
+    context = network.context
+    Client(env, network, get_client_ip(network.config.client_subnet, 1), 1, context)
+    env.run(until=30)
+
+    stats = context.stats
+    assert drops
+    assert stats.dns_failovers == len(drops)
+    assert network.get_entity_by_ip(next_ip).received_requests == len(drops)
+    assert stats.total_requests_processed >= len(drops) - 1
+    assert stats.dns_requests == 1
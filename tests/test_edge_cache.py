@@ -0,0 +1,83 @@
+import math
+import random
+
+import pytest
+
+from sim.context import SimulationConfig
+from sim.edge_cache import LfuCache, LruCache, create_edge_cache
+from sim.statistics import Statistics
+
+
+def test_lru_evicts_least_recently_used_key():
+    cache = LruCache(capacity=3, ttl=100)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, 0)
+    assert cache.get('a', 1)
+    cache.put('d', 2)
+    assert not cache.get('b', 3)
+    assert all(cache.get(key, 3) for key in ('a', 'c', 'd'))
+    assert cache.evictions == 1
+
+
+def test_lfu_evicts_lowest_frequency_key_then_least_recent():
+    cache = LfuCache(capacity=3, ttl=100)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, 0)
+    cache.get('a', 1)
+    cache.get('a', 1)
+    cache.get('c', 1)
+    cache.get('b', 2)
+    # b and c have both been looked up once; c less recently, so it goes first
+    cache.put('d', 3)
+    assert 'c' not in cache.expiry_times
+    cache.put('e', 4)
+    assert 'd' not in cache.expiry_times
+    assert set(cache.expiry_times) == {'a', 'b', 'e'}
+    assert cache.evictions == 2
+
+
+def test_expired_entry_misses_and_is_refreshed_in_place():
+    cache = LruCache(capacity=2, ttl=10)
+    cache.put('a', 0)
+    assert cache.get('a', 9.5)
+    assert not cache.get('a', 10)
+    assert cache.expirations == 1
+    cache.put('a', 10)
+    assert cache.get('a', 19)
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize('policy', ['lru', 'lfu'])
+def test_capacity_bound_holds(policy):
+    rng = random.Random(1)
+    cache = create_edge_cache(policy, capacity=20, ttl=5)
+    for now in range(5000):
+        key = int(rng.paretovariate(1.2)) % 200
+        if not cache.get(key, now):
+            cache.put(key, now)
+        assert len(cache) <= 20
+    assert len(cache) == 20
+    assert cache.evictions > 0
+
+
+def test_invalid_cache_parameters_are_rejected():
+    with pytest.raises(ValueError):
+        create_edge_cache('fifo', 10, 1)
+    with pytest.raises(ValueError):
+        create_edge_cache('lru', 0, 1)
+    with pytest.raises(ValueError):
+        create_edge_cache('lru', 10, 0)
+
+
+def test_hit_ratio_is_recorded():
+    stats = Statistics(SimulationConfig.from_settings())
+    assert math.isnan(stats.get_edge_cache_hit_ratio())
+    cache = LruCache(capacity=2, ttl=100)
+    for key in ('a', 'a', 'b', 'a', 'c', 'b'):
+        hit = cache.get(key, 0)
+        stats.record_edge_cache_lookup(hit)
+        if not hit:
+            cache.put(key, 0)
+    # Misses: a, b, c, then b again after c evicted it
+    assert (stats.edge_cache_hits, stats.edge_cache_misses) == (2, 4)
+    assert stats.get_edge_cache_hit_ratio() == pytest.approx(2 / 6)
@@ -0,0 +1,31 @@
+import pytest
+
+from main import RESULT_COLUMNS, point_config, run_simulation
+from sim.fast_engine import get_fast_engine_support
+
+SIMULATED_TIME = RESULT_COLUMNS.index('simulated_time')
+
+
+@pytest.mark.parametrize('strategy, overrides', [
+    ('round_robin', {}),
+    ('random', {}),
+    ('round_robin', {'common_random_numbers': True}),
+    ('random', {'common_random_numbers': True}),
+    ('round_robin', {'number_of_clients': 400, 'server_buffer_size': 2}),
+])
+def test_fast_engine_matches_simpy(strategy, overrides):
+    overrides = {'number_of_clients': 100, 'simulation_time': 300, **overrides}
+    number_of_clients = overrides.pop('number_of_clients')
+    results = {}
+    for engine in ('simpy', 'fast'):
+        config = point_config(number_of_clients, strategy, 'gateway', 'low', 'high', engine=engine, **overrides)
+        assert get_fast_engine_support(config) is None
+        results[engine] = run_simulation(config)
+
+    simpy_results, fast_results = results['simpy'], results['fast']
+    assert len(simpy_results) == len(fast_results) == len(RESULT_COLUMNS)
+    for column, simpy_value, fast_value in zip(RESULT_COLUMNS, simpy_results, fast_results):
+        assert fast_value == pytest.approx(simpy_value, rel=1e-9, abs=1e-9, nan_ok=True), column
+    assert type(simpy_results[SIMULATED_TIME]) is type(fast_results[SIMULATED_TIME]) is float
+    if overrides.get('server_buffer_size') == 2:
+        assert simpy_results[RESULT_COLUMNS.index('dropped_requests')] > 0
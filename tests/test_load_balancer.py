@@ -0,0 +1,312 @@
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import simpy
+
+from main import build_simulation
+from sim.context import SimulationConfig, SimulationContext
+from sim.load_balancer import LoadBalancer
+from sim.messages import Request, Response
+from sim.network import Network
+from sim.server import Server
+from sim.strategies.hashing import ConsistentHashStrategy, MaglevStrategy
+from sim.strategies.indexed_heap import IndexedMinHeap
+from sim.strategies.least_connections import LeastConnectionsStrategy
+from sim.strategies.peak_ewma import PeakEwmaStrategy
+from sim.strategies.power_of_d import PowerOfDChoicesStrategy
+from sim.strategies.round_robin import RoundRobinStrategy
+
+SERVER_IPS = ('192.168.1.2', '192.168.1.3', '192.168.1.4')
+POOL_IPS = tuple(f'192.168.2.{i}' for i in range(1, 9))
+CLIENT_IP = '10.0.0.1'
+
+
+class Client:
+    def __init__(self, network):
+        self.type = 'client'
+        self.peer_types = ('server',)
+        self.responses = []
+        network.register_entity(CLIENT_IP, self)
+
+    def receive_message(self, src_entity, message):
+        self.responses.append(message)
+
+
+def build_servers(server_ips=SERVER_IPS):
+    env = simpy.Environment()
+    context = SimulationContext(SimulationConfig.from_settings(logging_enabled=False, server_ips=server_ips))
+    network = Network(env, context)
+    client = Client(network)
+    servers = [Server(env, network, ip, context) for ip in server_ips]
+    return env, network, client, servers
+
+
+def send_request(env, client, server, service_time):
+    server.receive_message(client, Request(1, CLIENT_IP, env.now, service_time))
+
+
+def test_indexed_heap_matches_brute_force_minimum():
+    rng = random.Random(1)
+    heap = IndexedMinHeap()
+    priorities = {}
+    for _ in range(5000):
+        operation = rng.random()
+        key = rng.randrange(50)
+        if key not in priorities and operation < 0.5:
+            priorities[key] = rng.randrange(10)
+            heap.push(key, priorities[key])
+        elif key in priorities and operation < 0.8:
+            priorities[key] = rng.randrange(10)
+            heap.update(key, priorities[key])
+        elif key in priorities:
+            del priorities[key]
+            heap.remove(key)
+        assert len(heap) == len(priorities)
+        if priorities:
+            lowest = min(priorities.values())
+            assert heap.get_priority(heap.peek()) == lowest
+            assert priorities[heap.peek()] == lowest
+
+
+def test_indexed_heap_breaks_ties_by_insertion_order():
+    heap = IndexedMinHeap()
+    for key in ('c', 'a', 'b'):
+        heap.push(key, 1)
+    assert heap.peek() == 'c'
+    heap.update('c', 2)
+    assert heap.peek() == 'a'
+    heap.update('c', 1)
+    assert heap.peek() == 'c'
+    with pytest.raises(ValueError):
+        heap.push('a', 0)
+
+
+def test_least_connections_ties_go_to_first_registered_server():
+    env, network, client, servers = build_servers()
+    strategy = LeastConnectionsStrategy(list(reversed(SERVER_IPS)), network)
+    assert strategy.get_next_server() == SERVER_IPS[-1]
+
+
+def test_request_in_service_counts_as_connection():
+    env, network, client, servers = build_servers()
+    strategy = LeastConnectionsStrategy(list(SERVER_IPS), network)
+
+    send_request(env, client, servers[0], service_time=10)
+    env.run(until=1)
+    # The request has left the queue and is being served
+    assert len(servers[0].queue.items) == 0
+    assert servers[0].get_connections() == 1
+    assert strategy.get_next_server() == SERVER_IPS[1]
+
+    send_request(env, client, servers[1], service_time=20)
+    send_request(env, client, servers[2], service_time=20)
+    send_request(env, client, servers[2], service_time=20)
+    env.run(until=2)
+    assert [server.get_connections() for server in servers] == [1, 1, 2]
+    assert strategy.get_next_server() == SERVER_IPS[0]
+
+    env.run(until=15)
+    assert len(client.responses) == 1
+    assert [server.get_connections() for server in servers] == [0, 1, 2]
+    assert strategy.get_next_server() == SERVER_IPS[0]
+
+
+def test_remove_server_unsubscribes_listener():
+    env, network, client, servers = build_servers()
+    strategy = LeastConnectionsStrategy(list(SERVER_IPS), network)
+    assert strategy.update_connections in servers[0].connection_listeners
+
+    strategy.remove_server(SERVER_IPS[0])
+    assert strategy.update_connections not in servers[0].connection_listeners
+    assert SERVER_IPS[0] not in strategy.connections
+
+    # The removed server's changes no longer reach the strategy
+    send_request(env, client, servers[0], service_time=10)
+    env.run(until=1)
+    assert strategy.get_next_server() == SERVER_IPS[1]
+
+
+def test_power_of_d_with_every_server_picks_global_minimum():
+    env, network, client, servers = build_servers(POOL_IPS)
+    strategy = PowerOfDChoicesStrategy(list(POOL_IPS), network, np.random.default_rng(1), choices=len(POOL_IPS))
+    rng = random.Random(2)
+    for _ in range(200):
+        loads = [rng.randrange(5) for _ in servers]
+        for server, load in zip(servers, loads):
+            server.set_connections(load)
+        assert strategy.get_next_server() == POOL_IPS[loads.index(min(loads))]
+
+
+@pytest.mark.parametrize('choices', [2, 7])
+def test_power_of_d_samples_distinct_servers_uniformly(choices):
+    env, network, client, servers = build_servers(POOL_IPS)
+    strategy = PowerOfDChoicesStrategy(list(POOL_IPS), network, np.random.default_rng(3), choices=choices)
+    # With d >= 2 an idle server is always sampled, and the first idle one sampled wins,
+    # so uniform sampling without replacement spreads the picks evenly over the idle servers
+    servers[0].set_connections(1)
+    picks = Counter(strategy.get_next_server() for _ in range(14000))
+    assert POOL_IPS[0] not in picks
+    expected = 14000 / (len(POOL_IPS) - 1)
+    assert all(abs(picks[ip] - expected) < 0.1 * expected for ip in POOL_IPS[1:])
+
+
+def test_peak_ewma_spreads_requests_over_cold_servers():
+    env, network, client, servers = build_servers()
+    strategy = PeakEwmaStrategy(list(SERVER_IPS), network, decay_time=10)
+    assert all(ewma == network.config.server_service_time_mean for ewma in strategy.ewmas.values())
+
+    picked = []
+    for _ in SERVER_IPS:
+        server_ip = strategy.get_next_server()
+        picked.append(server_ip)
+        server = network.get_entity_by_ip(server_ip)
+        server.set_connections(server.get_connections() + 1)
+    assert picked == list(SERVER_IPS)
+
+
+def test_peak_ewma_seeds_new_server_with_mean_ewma():
+    env, network, client, servers = build_servers()
+    strategy = PeakEwmaStrategy(list(SERVER_IPS[:2]), network, decay_time=10)
+    strategy.observe_response(SERVER_IPS[0], 3.0)
+    strategy.observe_response(SERVER_IPS[1], 5.0)
+
+    strategy.register_server(SERVER_IPS[2])
+    assert strategy.ewmas[SERVER_IPS[2]] == 4.0
+    assert strategy.get_next_server() == SERVER_IPS[0]
+    servers[0].set_connections(1)
+    assert strategy.get_next_server() == SERVER_IPS[2]
+
+
+@pytest.mark.parametrize('strategy_class', [ConsistentHashStrategy, MaglevStrategy])
+def test_hashing_moves_about_one_nth_of_keys_when_a_server_leaves(strategy_class):
+    env, network, client, servers = build_servers(POOL_IPS)
+    strategy = strategy_class(list(POOL_IPS), network)
+    requests = [SimpleNamespace(client_ip=f'10.{i // 250}.{i % 250}.1') for i in range(5000)]
+    before = [strategy.get_next_server(request) for request in requests]
+
+    strategy.remove_server(POOL_IPS[3])
+    after = [strategy.get_next_server(request) for request in requests]
+
+    moved = [old != new for old, new in zip(before, after)]
+    on_removed = [old == POOL_IPS[3] for old in before]
+    # Every key of the removed server moves, and few others do
+    assert all(was_moved for was_moved, removed in zip(moved, on_removed) if removed)
+    assert sum(moved) - sum(on_removed) <= 0.02 * len(requests)
+    assert 0.6 / len(POOL_IPS) <= sum(moved) / len(requests) <= 1.5 / len(POOL_IPS)
+
+    (time, server_count, fraction), = network.context.stats.key_remaps
+    assert server_count == len(POOL_IPS) - 1
+    assert 0.6 / len(POOL_IPS) <= fraction <= 1.5 / len(POOL_IPS)
+
+
+def test_server_pool_changes_remove_and_restore_a_server():
+    config = SimulationConfig.from_settings(
+        logging_enabled=False, number_of_clients=50, load_balancing_strategy='consistent_hash',
+        load_balancer_type='gateway', server_pool_changes=((200, 'remove', '192.168.1.3'), (400, 'add', '192.168.1.3')))
+    context = SimulationContext(config)
+    env = simpy.Environment()
+    network = build_simulation(env, context)
+
+    env.run(until=200)
+    removed = network.get_entity_by_ip('192.168.1.3')
+    env.run(until=201)  # Let the requests forwarded before the change arrive
+    received = removed.received_requests
+    env.run(until=400)
+    assert removed.received_requests == received
+    env.run(until=600)
+    assert removed.received_requests > received
+
+    remaps = context.stats.key_remaps
+    assert [server_count for _, server_count, _ in remaps] == [len(config.server_ips) - 1, len(config.server_ips)]
+    assert all(0 < fraction < 1 for _, _, fraction in remaps)
+
+
+def test_server_pool_changes_are_validated():
+    config = SimulationConfig.from_settings(logging_enabled=False, server_pool_changes=((10, 'add', '192.168.1.3'),))
+    with pytest.raises(ValueError):
+        build_simulation(simpy.Environment(), SimulationContext(config))
+
+
+class Endpoint:
+    def __init__(self, network, ip_address, entity_type):
+        self.type = entity_type
+        self.peer_types = ('load_balancer',)
+        self.env = network.env
+        self.received = []
+        network.register_entity(ip_address, self)
+
+    def receive_message(self, src_entity, message):
+        self.received.append((self.env.now, message.type))
+
+
+class ConstantTimes:
+    def __init__(self, value):
+        self.value = value
+
+    def next(self):
+        return self.value
+
+
+def build_load_balancer(workers, worker_pool):
+    env = simpy.Environment()
+    config = SimulationConfig.from_settings(
+        logging_enabled=False, load_balancer_workers=workers, load_balancer_worker_pool=worker_pool)
+    network = Network(env, SimulationContext(config))
+    client = Endpoint(network, CLIENT_IP, 'client')
+    server = Endpoint(network, SERVER_IPS[0], 'server')
+    load_balancer = LoadBalancer(
+        env, network, config.load_balancer_ip, RoundRobinStrategy([SERVER_IPS[0]]), network.context)
+    load_balancer.processing_times = ConstantTimes(10)
+    load_balancer.response_processing_times = ConstantTimes(10)
+    return env, network, load_balancer, client, server
+
+
+def send_to_load_balancer(env, load_balancer, client, server, message_types):
+    for client_id, message_type in enumerate(message_types, start=1):
+        if message_type == 'request':
+            load_balancer.receive_message(client, Request(client_id, CLIENT_IP, env.now))
+        else:
+            load_balancer.receive_message(server, Response(SERVER_IPS[0], client_id, CLIENT_IP, env.now, env.now))
+
+
+@pytest.mark.parametrize('worker_pool', ['separate', 'shared'])
+def test_load_balancer_workers_process_requests_in_parallel(worker_pool):
+    env, network, load_balancer, client, server = build_load_balancer(3, worker_pool)
+    send_to_load_balancer(env, load_balancer, client, server, ['request'] * 4)
+    env.run()
+
+    delay = network.get_transport_delay(load_balancer, server)
+    assert [time - delay for time, _ in server.received] == pytest.approx([10, 10, 10, 20])
+
+
+@pytest.mark.parametrize('worker_pool, response_time', [('separate', 10), ('shared', 20)])
+def test_shared_pool_serves_requests_and_responses_from_one_queue(worker_pool, response_time):
+    env, network, load_balancer, client, server = build_load_balancer(1, worker_pool)
+    send_to_load_balancer(env, load_balancer, client, server, ['request', 'response'])
+    env.run(until=5)
+    if worker_pool == 'shared':
+        # The response waits behind the request in the single queue
+        assert load_balancer.get_queue_size('response') == 1
+        assert load_balancer.get_queue_size('request') == 0
+    env.run()
+
+    client_delay = network.get_transport_delay(load_balancer, client)
+    server_delay = network.get_transport_delay(load_balancer, server)
+    assert [(time - client_delay, message_type) for time, message_type in client.received] == [
+        pytest.approx((response_time, 'response'))]
+    assert [time - server_delay for time, _ in server.received] == pytest.approx([10])
+
+
+@pytest.mark.parametrize('worker_pool', ['separate', 'shared'])
+def test_worker_busy_times_add_up_to_utilization(worker_pool):
+    env, network, load_balancer, client, server = build_load_balancer(2, worker_pool)
+    send_to_load_balancer(env, load_balancer, client, server, ['request', 'request', 'request', 'response'])
+    env.run(until=40)
+
+    busy_times = load_balancer.worker_busy_times
+    assert sum(busy_times) == pytest.approx(40)
+    assert load_balancer.get_worker_utilizations() == pytest.approx([busy / 40 * 100 for busy in busy_times])
+    assert load_balancer.get_utilization() == pytest.approx(sum(busy_times) / (40 * len(busy_times)) * 100)
@@ -0,0 +1,46 @@
+import math
+
+import pytest
+import simpy
+
+from main import build_simulation, point_config, run_simulation
+from sim.context import SimulationContext
+
+CONFIGS = {
+    'gateway': ('round_robin', 'gateway', {}),
+    'gateway_drops': ('least_connections', 'gateway', {'number_of_clients': 300, 'server_buffer_size': 2}),
+    'dns_failover': ('random', 'dns', {
+        'number_of_clients': 300, 'server_buffer_size': 2, 'dns_answer_count': 3, 'dns_client_selection': 'random'}),
+    'resolvers': ('round_robin', 'dns', {'resolver_ips': ('10.1.0.1', '10.1.0.2')}),
+    'edge_cache': ('round_robin', 'gateway', {'edge_cache_capacity': 50}),
+    'shared_pool': ('round_robin', 'gateway', {'load_balancer_workers': 2, 'load_balancer_worker_pool': 'shared'}),
+    'population': ('round_robin', 'gateway', {'client_model': 'population'}),
+}
+
+
+def run(strategy, lb_type, overrides, message_pooling):
+    overrides = {'number_of_clients': 100, **overrides}
+    number_of_clients = overrides.pop('number_of_clients')
+    config = point_config(number_of_clients, strategy, lb_type, 'low', 'low', simulation_time=300,
+                          message_pooling=message_pooling, **overrides)
+    return run_simulation(config)
+
+
+@pytest.mark.parametrize('name', CONFIGS)
+def test_message_pooling_does_not_change_results(name):
+    pooled = run(*CONFIGS[name], message_pooling=True)
+    allocated = run(*CONFIGS[name], message_pooling=False)
+    assert len(pooled) == len(allocated)
+    for pooled_value, allocated_value in zip(pooled, allocated):
+        assert pooled_value == allocated_value or (math.isnan(pooled_value) and math.isnan(allocated_value))
+
+
+def test_pooled_messages_are_recycled():
+    config = point_config(50, 'round_robin', 'gateway', 'low', 'low', simulation_time=300, message_pooling=True)
+    env = simpy.Environment()
+    network = build_simulation(env, SimulationContext(config))
+    env.run(until=config.simulation_time)
+    pools = network.messages
+    assert pools.requests._free and pools.responses._free and pools.envelopes._free
+    # Fewer requests are in flight than were sent, so the pool reused instances
+    assert len(pools.requests._free) < network.context.stats.total_requests_processed
@@ -0,0 +1,80 @@
+import pytest
+import simpy
+
+from sim.context import SimulationConfig, SimulationContext
+from sim.network import Network
+
+
+class Endpoint:
+    def __init__(self, network, ip_address, entity_type, peer_types):
+        self.type = entity_type
+        self.peer_types = peer_types
+        self.received = []
+        self.env = network.env
+        network.register_entity(ip_address, self)
+
+    def receive_message(self, src_entity, message):
+        self.received.append((self.env.now, message))
+
+
+def build_network(**overrides):
+    env = simpy.Environment()
+    network = Network(env, SimulationContext(SimulationConfig.from_settings(logging_enabled=False, **overrides)))
+    return env, network
+
+
+def test_messages_with_equal_delivery_times_keep_send_order():
+    env, network = build_network()
+    load_balancer = Endpoint(network, '10.0.0.1', 'load_balancer', ('client',))
+    clients = [Endpoint(network, f'10.0.1.{i}', 'client', ('load_balancer',)) for i in range(1, 4)]
+
+    def send_burst():
+        for i in range(30):
+            network.send(clients[i % 3], '10.0.0.1', i)
+        yield env.timeout(0)
+        for i in range(30, 40):
+            network.send(clients[i % 3], '10.0.0.1', i)
+
+    env.process(send_burst())
+    env.run()
+
+    delay = network.get_transport_delay(clients[0], load_balancer)
+    assert [message for _, message in load_balancer.received] == list(range(40))
+    assert all(time == delay for time, _ in load_balancer.received)
+
+
+def test_messages_are_delivered_in_delivery_time_order():
+    env, network = build_network(transport_delays={
+        'client_to_load_balancer': 0.05, 'load_balancer_to_client': 0.05,
+        'client_to_server': 0.02, 'server_to_client': 0.02,
+    })
+    load_balancer = Endpoint(network, '10.0.0.1', 'load_balancer', ('client',))
+    server = Endpoint(network, '10.0.0.2', 'server', ('client',))
+    client = Endpoint(network, '10.0.1.1', 'client', ('load_balancer', 'server'))
+
+    network.send(load_balancer, '10.0.1.1', 'slow')
+    network.send(server, '10.0.1.1', 'fast')
+    env.run()
+
+    assert client.received == [(0.02, 'fast'), (0.05, 'slow')]
+
+
+def test_registration_rejects_peer_types_without_transport_delays():
+    env, network = build_network(transport_delays={
+        'client_to_load_balancer': 0.05, 'load_balancer_to_client': 0.05, 'client_to_server': 0.06,
+    })
+    Endpoint(network, '10.0.0.1', 'load_balancer', ('client',))
+    with pytest.raises(ValueError, match='between client and server'):
+        Endpoint(network, '10.0.1.1', 'client', ('load_balancer', 'server'))
+    with pytest.raises(ValueError, match='between client and dns_server'):
+        Endpoint(network, '10.0.1.2', 'client', ('dns_server',))
+    with pytest.raises(ValueError, match="Unknown entity type"):
+        Endpoint(network, '10.0.1.3', 'proxy', ('client',))
+    with pytest.raises(ValueError, match='between client and proxy'):
+        Endpoint(network, '10.0.1.4', 'client', ('proxy',))
+    assert network.get_entity_by_ip('10.0.1.1') is None
+
+
+def test_unknown_entity_type_in_transport_delays_is_rejected():
+    with pytest.raises(ValueError, match='unknown entity type'):
+        build_network(transport_delays={'client_to_proxy': 0.01})
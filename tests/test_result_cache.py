@@ -0,0 +1,70 @@
+import main
+import sim.result_cache as result_cache
+from sim.context import SimulationConfig
+from sim.result_cache import ResultCache, get_result_key
+
+
+def test_put_then_get_hits_and_other_configs_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    config = SimulationConfig.from_settings(number_of_clients=10)
+    assert cache.get(config) is None
+
+    cache.put(config, (1.5, 2, float('nan')))
+    result = cache.get(config)
+    assert result[:2] == (1.5, 2)
+    assert result[2] != result[2]  # NaN survives the round trip
+    assert cache.get(config.replace(number_of_clients=11)) is None
+    assert cache.get(config.replace(replication=1)) is None
+
+
+def test_key_changes_with_config_fields_and_code_version(monkeypatch):
+    config = SimulationConfig.from_settings()
+    key = get_result_key(config)
+    assert get_result_key(SimulationConfig.from_settings()) == key
+    assert get_result_key(config.replace(random_seed=config.random_seed + 1)) != key
+    assert get_result_key(config.replace(transport_delays={**config.transport_delays, 'client_to_server': 1})) != key
+
+    monkeypatch.setattr(result_cache, 'get_code_version', lambda: 'edited')
+    assert get_result_key(config) != key
+
+
+def test_code_change_invalidates_stored_results(monkeypatch, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    config = SimulationConfig.from_settings()
+    cache.put(config, (1.0,))
+    monkeypatch.setattr(result_cache, 'get_code_version', lambda: 'edited')
+    assert cache.get(config) is None
+
+
+def test_partial_entry_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    config = SimulationConfig.from_settings()
+    cache.put(config, (1.0,))
+    path = cache._get_path(get_result_key(config))
+    with open(path, 'w') as f:
+        f.write('{"result": [1.')
+    assert cache.get(config) is None
+
+
+def test_run_cached_resumes_a_partial_sweep(monkeypatch, tmp_path):
+    simulated = []
+
+    def fake_run_sweep(configs, workers=None, progress=False):
+        for i, config in enumerate(configs):
+            simulated.append(config.number_of_clients)
+            yield i, (float(config.number_of_clients),)
+
+    monkeypatch.setattr(main, 'run_sweep', fake_run_sweep)
+    cache = ResultCache(str(tmp_path))
+    configs = [SimulationConfig.from_settings(number_of_clients=n) for n in (10, 20, 30, 40)]
+
+    # A sweep that stopped after its first two runs
+    dict(main.run_cached(configs[:2], cache=cache))
+    assert simulated == [10, 20]
+
+    results = dict(main.run_cached(configs, cache=cache))
+    assert simulated == [10, 20, 30, 40]
+    assert results == {0: (10.0,), 1: (20.0,), 2: (30.0,), 3: (40.0,)}
+
+    dict(main.run_cached(configs, cache=cache))
+    assert simulated == [10, 20, 30, 40]
@@ -0,0 +1,88 @@
+import pytest
+import simpy
+
+from sim.context import SimulationConfig, SimulationContext
+from sim.messages import Request
+from sim.network import Network
+from sim.server import Server
+
+SERVER_IP = '192.168.1.2'
+CLIENT_IP = '10.0.0.1'
+
+
+class Client:
+    def __init__(self, network):
+        self.type = 'client'
+        self.peer_types = ('server',)
+        self.env = network.env
+        self.responses = []
+        network.register_entity(CLIENT_IP, self)
+
+    def receive_message(self, src_entity, message):
+        self.responses.append((self.env.now, message))
+
+
+def build_server(server_ip=SERVER_IP, **overrides):
+    env = simpy.Environment()
+    config = SimulationConfig.from_settings(logging_enabled=False, server_ips=(server_ip,), **overrides)
+    network = Network(env, SimulationContext(config))
+    client = Client(network)
+    server = Server(env, network, server_ip, network.context)
+    return env, client, server
+
+
+def send_requests(env, client, server, service_times):
+    for client_id, service_time in enumerate(service_times, start=1):
+        server.receive_message(client, Request(client_id, CLIENT_IP, env.now, service_time))
+
+
+def test_workers_serve_requests_concurrently():
+    env, client, server = build_server(server_workers=3)
+    send_requests(env, client, server, [10, 10, 10, 10])
+    env.run()
+
+    delay = server.network.get_transport_delay(server, client)
+    finish_times = sorted(time - delay for time, _ in client.responses)
+    assert finish_times == pytest.approx([10, 10, 10, 20])
+
+
+def test_connections_count_queued_and_in_service_requests():
+    env, client, server = build_server(server_workers=2)
+    counts = []
+    server.add_connection_listener(lambda server_ip, connections: counts.append((env.now, connections)))
+
+    send_requests(env, client, server, [10, 10, 10])
+    env.run(until=1)
+    assert len(server.queue.items) == 1
+    assert server.get_connections() == 3
+    env.run(until=15)
+    assert server.get_connections() == 1
+    env.run()
+    assert server.get_connections() == 0
+    assert counts == [(0, 1), (0, 2), (0, 3), (10, 2), (10, 1), (20, 0)]
+
+
+def test_utilization_is_divided_by_worker_count():
+    env, client, server = build_server(server_workers=4)
+    send_requests(env, client, server, [10, 10])
+    env.run(until=20)
+    # Two of four workers busy for half the time
+    assert server.get_utilization() == pytest.approx(25)
+
+
+def test_per_server_worker_counts_override_default():
+    env, client, server = build_server(server_workers=1, server_worker_counts={SERVER_IP: 2})
+    assert server.workers == 2
+    env, client, server = build_server('192.168.1.9', server_workers=3, server_worker_counts={SERVER_IP: 2})
+    assert server.workers == 3
+    with pytest.raises(ValueError):
+        build_server(server_worker_counts={SERVER_IP: 0})
+
+
+def test_speed_factor_scales_service_time():
+    env, client, server = build_server(server_speed_factors={SERVER_IP: 2})
+    send_requests(env, client, server, [10])
+    env.run()
+    delay = server.network.get_transport_delay(server, client)
+    assert client.responses[0][0] - delay == pytest.approx(5)
+    assert server.busy_time == pytest.approx(5)
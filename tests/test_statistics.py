@@ -0,0 +1,41 @@
+import numpy as np
+
+from sim.aggregators import P2Quantile, RunningStats, TimeWeightedAverage
+
+
+def test_running_stats_merge_matches_numpy():
+    values = np.random.default_rng(1).normal(10, 3, 1000)
+    stats = RunningStats()
+    for value in values[:137]:
+        stats.update(value)
+    stats.update_many(values[137:600])
+    stats.update_many(values[600:600])
+    for value in values[600:601]:
+        stats.update(value)
+    stats.update_many(values[601:])
+
+    assert stats.count == len(values)
+    assert np.isclose(stats.mean, values.mean())
+    assert np.isclose(stats.variance, values.var(ddof=1))
+    assert stats.min == values.min()
+    assert stats.max == values.max()
+
+
+def test_time_weighted_average_of_step_function():
+    # 0 on [0, 2), 3 on [2, 5), 1 on [5, 6), 4 on [6, 10]
+    average = TimeWeightedAverage()
+    average.update(2, 3)
+    average.update_many(np.array([5.0, 6.0]), np.array([1, 4]))
+
+    assert np.isclose(average.average(), (3 * 3 + 1 * 1) / 6)
+    assert np.isclose(average.average(until=10), (3 * 3 + 1 * 1 + 4 * 4) / 10)
+
+
+def test_p2_quantile_tracks_percentile():
+    values = np.random.default_rng(2).exponential(1.0, 100_000)
+    for p in (0.5, 0.95, 0.99):
+        estimate = P2Quantile(p)
+        for value in values:
+            estimate.update(value)
+        exact = np.percentile(values, 100 * p)
+        assert abs(estimate.value - exact) <= 0.02 * exact
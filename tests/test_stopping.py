@@ -0,0 +1,41 @@
+import numpy as np
+import simpy
+
+from sim.aggregators import RequestBatchMeans
+from sim.context import SimulationConfig, SimulationContext
+from sim.stopping import stop_when_precise
+
+
+def run_stopping_rule(latency_std, target):
+    config = SimulationConfig.from_settings(
+        stopping_rule='batch_means', simulation_time=10_000, stopping_check_interval=100,
+        stopping_batch_count=20, target_relative_precision=target, confidence_level=0.95)
+    context = SimulationContext(config)
+    context.stats.request_batches = RequestBatchMeans(config.stopping_batch_count, batch_size=8)
+    env = simpy.Environment()
+    rng = np.random.default_rng(4)
+
+    def complete_requests():
+        while True:
+            yield env.timeout(1)
+            context.stats.request_batches.add_completion(max(0.0, rng.normal(1.0, latency_std)))
+
+    env.process(complete_requests())
+    env.run(until=env.process(stop_when_precise(env, context)))
+    return env.now, context.stats.request_batches
+
+
+def test_batch_means_rule_stops_once_precise():
+    stop_time, batches = run_stopping_rule(latency_std=0.5, target=0.05)
+
+    assert stop_time < 10_000
+    assert max(batches.get_relative_half_widths(0.95)) <= 0.05
+    # Too few batches are complete at the first checks, so the rule waits for them
+    assert stop_time >= 20 * 8
+
+
+def test_batch_means_rule_runs_to_simulation_time_without_precision():
+    stop_time, batches = run_stopping_rule(latency_std=0.5, target=1e-6)
+
+    assert stop_time == 10_000
+    assert max(batches.get_relative_half_widths(0.95)) > 1e-6
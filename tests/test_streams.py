@@ -0,0 +1,42 @@
+import simpy
+
+from main import build_simulation
+from sim.client import Client, get_client_ip
+from sim.context import SimulationConfig, SimulationContext
+from sim.streams import RandomStreams
+
+
+def draw(pool, count=20):
+    return [pool.next() for _ in range(count)]
+
+
+def test_generators_do_not_depend_on_request_order():
+    streams = RandomStreams(42)
+    first = streams.get_generator('server_service', 7).random(5)
+    streams.get_generator('server_service', 8).random(5)
+    streams.get_generator('client_arrival').random(5)
+    assert (RandomStreams(42).get_generator('server_service', 7).random(5) == first).all()
+    assert not (streams.get_generator('server_service', 8).random(5) == first).all()
+    assert not (RandomStreams(42, replication=1).get_generator('server_service', 7).random(5) == first).all()
+
+
+def test_adding_a_server_leaves_other_servers_streams_unchanged():
+    service_times = []
+    for server_ips in (('192.168.1.3', '192.168.1.4'), ('192.168.1.3', '192.168.1.9', '192.168.1.4')):
+        config = SimulationConfig.from_settings(logging_enabled=False, server_ips=server_ips)
+        network = build_simulation(simpy.Environment(), SimulationContext(config))
+        service_times.append({ip: draw(network.get_entity_by_ip(ip).service_times) for ip in server_ips})
+    for ip in ('192.168.1.3', '192.168.1.4'):
+        assert service_times[0][ip] == service_times[1][ip]
+
+
+def test_adding_clients_leaves_other_clients_streams_unchanged():
+    intervals = []
+    for client_ids in ((5,), (1, 2, 3, 4, 5, 6)):
+        config = SimulationConfig.from_settings(logging_enabled=False, number_of_clients=0)
+        context = SimulationContext(config)
+        env = simpy.Environment()
+        network = build_simulation(env, context)
+        clients = {i: Client(env, network, get_client_ip(config.client_subnet, i), i, context) for i in client_ids}
+        intervals.append(draw(clients[5].request_intervals))
+    assert intervals[0] == intervals[1]
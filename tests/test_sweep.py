@@ -0,0 +1,23 @@
+import main
+
+
+def write_small_sweep(monkeypatch, directory, workers):
+    monkeypatch.chdir(directory)
+    main.write_sweep_output(workers=workers, simulation_time=100)
+    with open(directory / 'output.csv') as f:
+        return f.read().splitlines()
+
+
+def test_parallel_sweep_writes_serial_rows_in_grid_order(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'SWEEP_VALUES', (
+        [20, 60], ['round_robin', 'random', 'least_connections'], ['gateway', 'dns'], ['low'], ['high']))
+    (tmp_path / 'serial').mkdir()
+    (tmp_path / 'parallel').mkdir()
+
+    serial = write_small_sweep(monkeypatch, tmp_path / 'serial', workers=1)
+    parallel = write_small_sweep(monkeypatch, tmp_path / 'parallel', workers=2)
+
+    assert len(serial) == 1 + 12
+    assert parallel == serial
+    points = [tuple(line.split(',')[:5]) for line in serial[1:]]
+    assert points == [tuple(str(value) for value in point) for point in main.sweep_points()]
@@ -0,0 +1,44 @@
+import numpy as np
+
+from sim.aggregators import WarmupDetector
+from sim.context import SimulationConfig
+from sim.statistics import Statistics
+
+
+def test_mser5_truncates_initial_transient():
+    rng = np.random.default_rng(3)
+    steady = rng.normal(1.0, 0.1, 5000)
+    transient = 10 * np.exp(-np.arange(500) / 100)
+    values = np.concatenate([steady[:500] + transient, steady[500:]])
+    times = np.arange(len(values), dtype=np.float64)
+
+    detector = WarmupDetector(batch_size=5)
+    detector.update_many(times, values)
+    batches, start_time = detector.get_truncation()
+
+    # The transient decays below the noise level after about 300 observations
+    assert 40 <= batches <= 120
+    assert start_time == 5 * batches
+    assert abs(detector.get_steady_state_mean() - 1.0) < 0.02
+
+
+def test_warmup_time_is_zero_without_truncation():
+    stats = Statistics(SimulationConfig.from_settings())
+    assert stats.get_warmup_time() == 0.0
+
+    # A stationary series whose first batch starts well after time 0
+    values = np.random.default_rng(5).normal(1.0, 0.1, 2000)
+    for time, value in zip(np.arange(80.0, 2080.0), values):
+        stats.client_latency_warmup.update(time, value)
+    assert stats.client_latency_warmup.get_truncation() == (0, 80.0)
+    assert stats.get_warmup_time() == 0.0
+
+
+def test_warmup_time_is_start_of_first_kept_batch():
+    stats = Statistics(SimulationConfig.from_settings())
+    values = np.concatenate([np.full(500, 10.0), np.random.default_rng(6).normal(1.0, 0.1, 4500)])
+    for time, value in enumerate(values):
+        stats.client_latency_warmup.update(float(time), value)
+    batches, start_time = stats.client_latency_warmup.get_truncation()
+    assert 100 <= batches <= 120
+    assert stats.get_warmup_time() == start_time == 5 * batches